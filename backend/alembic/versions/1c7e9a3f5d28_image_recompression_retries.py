@@ -0,0 +1,30 @@
+"""image recompression retries
+
+Revision ID: 1c7e9a3f5d28
+Revises: 6e1b3f8d2a54
+Create Date: 2026-10-20 14:22:37.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c7e9a3f5d28'
+down_revision: Union[str, Sequence[str], None] = '6e1b3f8d2a54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('images', sa.Column('recompress_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('images', sa.Column('superseded_file_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('images', 'superseded_file_path')
+    op.drop_column('images', 'recompress_attempts')
@@ -0,0 +1,34 @@
+"""media access
+
+Revision ID: 4f8c1a7e2b90
+Revises: 9d2f6b8e4a17
+Create Date: 2026-10-19 13:37:08.662104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8c1a7e2b90'
+down_revision: Union[str, Sequence[str], None] = '9d2f6b8e4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_access',
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('last_accessed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('storage_key')
+    )
+    op.create_index(op.f('ix_media_access_last_accessed_at'), 'media_access', ['last_accessed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_media_access_last_accessed_at'), table_name='media_access')
+    op.drop_table('media_access')
@@ -0,0 +1,28 @@
+"""index verifications signature_uuid
+
+Revision ID: 5b36161fc90f
+Revises: a55bc8a07288
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b36161fc90f'
+down_revision: Union[str, Sequence[str], None] = 'a55bc8a07288'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_verifications_signature_uuid'), 'verifications', ['signature_uuid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_verifications_signature_uuid'), table_name='verifications')
@@ -0,0 +1,30 @@
+"""image last uploaded at
+
+Revision ID: 6e1b3f8d2a54
+Revises: b8e2d5c4f1a6
+Create Date: 2026-10-20 10:04:51.226310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b3f8d2a54'
+down_revision: Union[str, Sequence[str], None] = 'b8e2d5c4f1a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('images', sa.Column('last_uploaded_at', sa.DateTime(timezone=True),
+                                      server_default=sa.text('now()'), nullable=True))
+    op.execute("UPDATE images SET last_uploaded_at = upload_date")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('images', 'last_uploaded_at')
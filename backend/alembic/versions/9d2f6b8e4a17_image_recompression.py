@@ -0,0 +1,30 @@
+"""image recompression
+
+Revision ID: 9d2f6b8e4a17
+Revises: e7a4d2c19f03
+Create Date: 2026-10-19 12:41:55.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2f6b8e4a17'
+down_revision: Union[str, Sequence[str], None] = 'e7a4d2c19f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('images', sa.Column('file_size', sa.BigInteger(), nullable=True))
+    op.add_column('images', sa.Column('recompressed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('images', 'recompressed_at')
+    op.drop_column('images', 'file_size')
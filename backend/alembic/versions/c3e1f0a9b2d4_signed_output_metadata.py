@@ -0,0 +1,40 @@
+"""signed output metadata
+
+Revision ID: c3e1f0a9b2d4
+Revises: 5b36161fc90f
+Create Date: 2026-10-19 10:03:17.583920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1f0a9b2d4'
+down_revision: Union[str, Sequence[str], None] = '5b36161fc90f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('signatures', sa.Column('output_storage_key', sa.String(), nullable=True))
+    op.add_column('signatures', sa.Column('output_format', sa.String(length=16), nullable=True))
+    op.add_column('signatures', sa.Column('output_size', sa.BigInteger(), nullable=True))
+    op.add_column('signatures', sa.Column('output_sha256', sa.String(length=64), nullable=True))
+    op.add_column('signatures', sa.Column('engine', sa.String(length=16), nullable=True))
+    op.add_column('signatures', sa.Column('engine_params', sa.JSON(), nullable=True))
+    op.create_index(op.f('ix_signatures_output_sha256'), 'signatures', ['output_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_signatures_output_sha256'), table_name='signatures')
+    op.drop_column('signatures', 'engine_params')
+    op.drop_column('signatures', 'engine')
+    op.drop_column('signatures', 'output_sha256')
+    op.drop_column('signatures', 'output_size')
+    op.drop_column('signatures', 'output_format')
+    op.drop_column('signatures', 'output_storage_key')
@@ -0,0 +1,31 @@
+"""signed blobs
+
+Revision ID: e7a4d2c19f03
+Revises: c3e1f0a9b2d4
+Create Date: 2026-10-19 11:26:02.418733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4d2c19f03'
+down_revision: Union[str, Sequence[str], None] = 'c3e1f0a9b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Révision conservée pour la chaîne : la table signed_blobs (dédoublonnage des images signées) a été
+    # abandonnée avant publication, chaque signature intégrant son propre UUID référence directement sa
+    # sortie (signatures.output_storage_key).
+    pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    pass
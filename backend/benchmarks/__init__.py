@@ -0,0 +1,15 @@
+"""
+Bancs d'essai des moteurs de stéganographie (DCT, LSB, stego_utils).
+
+Depuis backend/, avec les variables d'environnement de l'application :
+
+    python -m benchmarks run --preset quick --output benchmarks/results/quick.json
+    python -m benchmarks compare benchmarks/baselines/quick.json benchmarks/results/quick.json
+    python -m benchmarks robustness --strengths 12,24,48 --redundancies 15,30,60 --min-psnr 38
+
+Les résultats de référence à partager entre machines se versionnent dans benchmarks/baselines/.
+
+Voir benchmarks.corpus (images synthétiques), benchmarks.cases (moteurs et jeux de paramètres),
+benchmarks.runner (mesures), benchmarks.compare (détection des régressions) et
+benchmarks.robustness (robustesse aux attaques de benchmarks.attacks contre coût CPU, front de Pareto).
+"""
@@ -0,0 +1,172 @@
+"""
+    python -m benchmarks run [--preset quick|full] [--engines dct,lsb] [--output results.json]
+    python -m benchmarks compare BASELINE CURRENT [--threshold 0.10]
+    python -m benchmarks robustness [--strengths 12,24,48 --redundancies 15,30,60] [--min-psnr 38]
+
+`compare` sort avec le code 1 si une régression est détectée (utilisable en CI).
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+
+from src.core.hermetic import apply_hermetic_env
+
+# Moteurs importés sans PostgreSQL, SMTP ni Google ; les variables déjà définies restent prioritaires
+apply_hermetic_env()
+
+from benchmarks import compare as comparison  # noqa: E402
+from benchmarks.corpus import DEFAULT_CACHE_DIR, DEFAULT_SEED, FORMATS, SIZES_MEGAPIXELS, TEXTURES  # noqa: E402
+
+PRESETS = {
+    # Quelques minutes : à lancer avant chaque modification d'un moteur
+    "quick": {"sizes": (0.3, 2.0), "textures": ("photo", "flat"), "repeat": 3},
+    # Corpus complet (jusqu'à 50 Mpx) : plusieurs heures, à lancer sur une machine dédiée
+    "full": {"sizes": SIZES_MEGAPIXELS, "textures": TEXTURES, "repeat": 3},
+}
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _run(args) -> int:
+    from benchmarks.cases import select_cases
+    from benchmarks.corpus import iter_corpus
+    from benchmarks.runner import run_suite
+
+    preset = PRESETS[args.preset]
+    sizes = [float(size) for size in _csv(args.sizes)] if args.sizes else preset["sizes"]
+    textures = _csv(args.textures) if args.textures else preset["textures"]
+    formats = _csv(args.formats) if args.formats else FORMATS
+    repeat = args.repeat or preset["repeat"]
+    cases = select_cases(set(_csv(args.engines or "")), set(_csv(args.labels or "")))
+    if not cases:
+        print("No benchmark case matches the selection.", file=sys.stderr)
+        return 2
+
+    document = run_suite(
+        cases,
+        iter_corpus(sizes, textures, formats, args.seed, None if args.no_cache else args.cache_dir),
+        repeat=repeat,
+        memory=not args.no_memory,
+        settings={"preset": args.preset, "sizes": list(sizes), "textures": list(textures),
+                  "formats": list(formats), "repeat": repeat, "seed": args.seed},
+    )
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{args.preset}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    failed = sum(not result["ok"] for result in document["results"])
+    print(f"{len(document['results'])} cases, {failed} failed extraction(s) -> {output}")
+    return 0
+
+
+def _compare(args) -> int:
+    comparisons = comparison.compare(
+        comparison.load(args.baseline), comparison.load(args.current),
+        threshold=args.threshold, min_seconds=args.min_seconds, memory_threshold=args.memory_threshold,
+    )
+    print(comparison.render(comparisons, only_regressions=args.only_regressions))
+    return 1 if any(c.regression for c in comparisons) else 0
+
+
+def _robustness(args) -> int:
+    from benchmarks import robustness
+    from benchmarks.attacks import ATTACKS, ATTACKS_BY_NAME
+    from benchmarks.cases import dct_grid, select_cases
+    from benchmarks.corpus import iter_corpus
+
+    engines = set(_csv(args.engines or ""))
+    cases = select_cases(engines, set(_csv(args.labels or "")))
+    if args.strengths or args.redundancies:
+        # Grille DCT à la place des jeux de paramètres DCT prédéfinis
+        cases = [case for case in cases if case.engine != "dct"]
+        if not engines or "dct" in engines:
+            cases += dct_grid(
+                [float(value) for value in _csv(args.strengths or "24")],
+                [int(value) for value in _csv(args.redundancies or "30")],
+            )
+    attacks = [ATTACKS_BY_NAME[name] for name in _csv(args.attacks)] if args.attacks else list(ATTACKS)
+    sizes = [float(size) for size in _csv(args.sizes)]
+    textures, formats = _csv(args.textures), _csv(args.formats)
+    if not cases:
+        print("No benchmark case matches the selection.", file=sys.stderr)
+        return 2
+
+    document = robustness.run_robustness(
+        cases, iter_corpus(sizes, textures, formats, args.seed, args.cache_dir), attacks, workers=args.workers,
+        settings={"sizes": sizes, "textures": textures, "formats": formats, "seed": args.seed,
+                  "attacks": [attack.name for attack in attacks], "min_psnr": args.min_psnr},
+    )
+    rows = robustness.summarize(document, args.min_psnr)
+    front = robustness.pareto_front(rows)
+    document["summary"], document["pareto_front"] = rows, front
+    print(robustness.render(rows, front))
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"robustness-{datetime.datetime.now():%Y%m%d-%H%M%S}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"-> {output}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Steganography engine benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="measure embed/extract and write a JSON results file")
+    run.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    run.add_argument("--sizes", help="megapixels, comma-separated (overrides the preset)")
+    run.add_argument("--textures", help=f"comma-separated among {','.join(TEXTURES)}")
+    run.add_argument("--formats", help=f"comma-separated among {','.join(FORMATS)}")
+    run.add_argument("--engines", help="comma-separated: dct, lsb, stego_utils")
+    run.add_argument("--labels", help="parameter sets, comma-separated (e.g. prod)")
+    run.add_argument("--repeat", type=int, help="timed runs per case (median is reported)")
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    run.add_argument("--no-cache", action="store_true", help="do not read or write the corpus cache")
+    run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak run")
+    run.add_argument("--output", help="results file (default: benchmarks/results/<preset>-<date>.json)")
+    run.set_defaults(handler=_run)
+
+    diff = commands.add_parser("compare", help="flag regressions between two results files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.10, help="relative time increase (default 0.10)")
+    diff.add_argument("--min-seconds", type=float, default=0.005, help="ignore smaller absolute increases")
+    diff.add_argument("--memory-threshold", type=float, default=0.10)
+    diff.add_argument("--only-regressions", action="store_true")
+    diff.set_defaults(handler=_compare)
+
+    robust = commands.add_parser("robustness", help="extraction success under attacks versus CPU cost")
+    robust.add_argument("--engines", help="comma-separated: dct, lsb, stego_utils")
+    robust.add_argument("--labels", help="parameter sets, comma-separated (e.g. prod)")
+    robust.add_argument("--strengths", help="DCT strengths grid (replaces the predefined DCT sets)")
+    robust.add_argument("--redundancies", help="DCT redundancies grid (replaces the predefined DCT sets)")
+    robust.add_argument("--attacks", help="comma-separated attack names (default: all)")
+    robust.add_argument("--sizes", default="2", help="megapixels, comma-separated (default: 2)")
+    robust.add_argument("--textures", default="photo,flat,gradient")
+    robust.add_argument("--formats", default=",".join(FORMATS))
+    robust.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    robust.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    robust.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    robust.add_argument("--min-psnr", type=float, help="exclude visibly degrading cases from the Pareto front")
+    robust.add_argument("--output", help="results file (default: benchmarks/results/robustness-<date>.json)")
+    robust.set_defaults(handler=_robustness)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
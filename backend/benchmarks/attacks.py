@@ -0,0 +1,72 @@
+"""
+Altérations subies par une image signée entre sa publication et sa vérification : recompression
+JPEG, redimensionnement, recadrage, flou et bruit. Chaque attaque reçoit l'image encodée et
+retourne l'image altérée encodée (PNG sans perte, sauf pour les attaques JPEG).
+"""
+import zlib
+from functools import partial
+from typing import Callable, NamedTuple
+
+import cv2
+import numpy as np
+
+
+class Attack(NamedTuple):
+    name: str
+    func: Callable[[np.ndarray], np.ndarray]
+    # Extension d'encodage du résultat
+    extension: str = ".png"
+    jpeg_quality: int = 0
+
+    def apply(self, data: bytes) -> bytes:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Cannot decode signed image")
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality] if self.jpeg_quality else []
+        ok, encoded = cv2.imencode(self.extension, self.func(image), params)
+        if not ok:
+            raise ValueError(f"Cannot encode attacked image ({self.name})")
+        return encoded.tobytes()
+
+
+def _identity(image: np.ndarray) -> np.ndarray:
+    return image
+
+
+def _resize(image: np.ndarray, factor: float) -> np.ndarray:
+    # Réduction puis retour à la taille d'origine : seule la perte d'information est simulée
+    height, width = image.shape[:2]
+    small = cv2.resize(image, (max(1, round(width * factor)), max(1, round(height * factor))),
+                       interpolation=cv2.INTER_AREA)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+def _crop(image: np.ndarray, fraction: float) -> np.ndarray:
+    # Bords droit et bas retirés : la grille des blocs 8x8 reste alignée, la taille change
+    height, width = image.shape[:2]
+    return image[:round(height * (1 - fraction)), :round(width * (1 - fraction))]
+
+
+def _blur(image: np.ndarray, kernel: int) -> np.ndarray:
+    return cv2.GaussianBlur(image, (kernel, kernel), 0)
+
+
+def _noise(image: np.ndarray, sigma: float) -> np.ndarray:
+    rng = np.random.default_rng(zlib.crc32(f"noise:{sigma}".encode()))
+    noisy = image.astype(np.float32) + rng.normal(0.0, sigma, image.shape).astype(np.float32)
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+# functools.partial plutôt que des fermetures : les attaques sont envoyées aux processus du pool
+ATTACKS = (
+    Attack("none", _identity),
+    *(Attack(f"jpeg{quality}", _identity, ".jpg", quality) for quality in (95, 85, 75, 50)),
+    Attack("resize75", partial(_resize, factor=0.75)),
+    Attack("resize50", partial(_resize, factor=0.5)),
+    Attack("crop10", partial(_crop, fraction=0.10)),
+    Attack("blur3", partial(_blur, kernel=3)),
+    Attack("blur5", partial(_blur, kernel=5)),
+    Attack("noise2", partial(_noise, sigma=2.0)),
+    Attack("noise5", partial(_noise, sigma=5.0)),
+)
+ATTACKS_BY_NAME = {attack.name: attack for attack in ATTACKS}
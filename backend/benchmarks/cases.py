@@ -0,0 +1,146 @@
+"""
+Moteurs et jeux de paramètres mesurés.
+
+Un EngineCase associe un moteur, un jeu de paramètres nommé, les formats d'entrée que le service
+lui confie en production (voir StegoService._embed) et une taille maximale au-delà de laquelle le
+moteur n'est pas mesuré : LSB et stego_utils parcourent les pixels en Python et ne sont pas
+utilisables sur les plus grandes images du corpus.
+"""
+import uuid
+from typing import Callable, NamedTuple, Optional
+
+from src.services.stegano_dct_service import SteganoDCTService
+from src.services.stego_service import DCT_SIGN_PARAMS, LSB_SIGN_PARAMS, SteganoLSBService, stegano_lsb_module
+from src.utils import stego_utils
+
+MESSAGE = "Signed by author 42 - benchmark payload"
+SIGNATURE_UUID = str(uuid.UUID(int=0x5EED, version=4))
+PASSWORD = "_42_"
+KEY_POSITIONS_SECRET = "_42_"
+FERNET_KEY = b"MDEyMzQ1Njc4OWFiY2RlZjAxMjM0NTY3ODlhYmNkZWY="
+
+# Les moteurs n'utilisent pas la session : db=None
+_dct = SteganoDCTService(None)
+_lsb = SteganoLSBService(None)
+
+
+def _dct_embed(data: bytes, extension: str, params: dict) -> bytes:
+    return bytes(_dct.embed_message_aes_buffer(
+        image_data=data, message=MESSAGE, password=PASSWORD, key_positions_secret=KEY_POSITIONS_SECRET,
+        image_format=extension, signature_uuid=SIGNATURE_UUID, **params,
+    ))
+
+
+def _dct_extract(data: bytes, params: dict) -> str:
+    _, message = _dct.extract_signed_message_aes_buffer(
+        image_data=data, password=PASSWORD, key_positions_secret=KEY_POSITIONS_SECRET,
+        redundancy=params["redundancy"], channel_choice=params["channel_choice"],
+    )
+    return message
+
+
+def _dct_read_bits(data: bytes, params: dict, bit_count: int) -> str:
+    bits = _dct.read_bits_buffer(data, KEY_POSITIONS_SECRET, bit_count, params["redundancy"], params["channel_choice"])
+    return "".join(map(str, bits))
+
+
+# Flux intégré : longueur (4) + [sel (16) + nonce (12) + message chiffré + tag (16)] + CRC (4)
+DCT_PAYLOAD_BITS = (4 + 16 + 12 + len(MESSAGE.encode()) + 16 + 4) * 8
+
+# Même message qu'en production : UUID de signature en préfixe
+LSB_MESSAGE = stego_utils.pack_signed_message(SIGNATURE_UUID, MESSAGE)
+LSB_PAYLOAD_BITS = len(SteganoLSBService.compress_message(LSB_MESSAGE)) * 8 + len(stegano_lsb_module.END_MARKER)
+
+
+def _lsb_embed(data: bytes, extension: str, params: dict) -> bytes:
+    return bytes(_lsb.hide_message_buffer(
+        image_data=data, message=LSB_MESSAGE, image_format=_lsb.image_format_for(extension), **params,
+    ))
+
+
+def _lsb_extract(data: bytes, params: dict) -> str:
+    return stego_utils.unpack_signed_message(_lsb.extract_message_buffer(data, **params))[1]
+
+
+def _lsb_read_bits(data: bytes, params: dict, bit_count: int) -> str:
+    return _lsb.read_bits_buffer(data, bit_count, **params)
+
+
+def _utils_embed(data: bytes, extension: str, params: dict) -> bytes:
+    signed, _ = stego_utils.embed_data_into_image(
+        data, author_id=42, message=MESSAGE, signature_uuid=SIGNATURE_UUID, **params,
+    )
+    return signed.getvalue()
+
+
+def _utils_extract(data: bytes, params: dict) -> str:
+    return stego_utils.extract_data_from_image(data, fernet_key=params.get("fernet_key"))["message"]
+
+
+class EngineCase(NamedTuple):
+    engine: str
+    label: str
+    params: dict
+    formats: tuple
+    max_megapixels: float
+    embed_func: Callable[[bytes, str, dict], bytes]
+    extract_func: Callable[[bytes, dict], str]
+    # Lecture brute du flux intégré (taux d'erreur binaire), si le moteur la permet
+    bits_func: Optional[Callable[[bytes, dict, int], str]] = None
+    payload_bits: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.engine}/{self.label}"
+
+    def embed(self, data: bytes, extension: str) -> bytes:
+        return self.embed_func(data, extension, self.params)
+
+    def extract(self, data: bytes) -> str:
+        return self.extract_func(data, self.params)
+
+    def read_bits(self, data: bytes) -> Optional[str]:
+        return self.bits_func(data, self.params, self.payload_bits) if self.bits_func else None
+
+    def accepts(self, megapixels: float, image_format: str) -> bool:
+        return image_format in self.formats and megapixels <= self.max_megapixels
+
+    def public_params(self) -> dict:
+        """Paramètres enregistrés dans les résultats (sans clé secrète)."""
+        return {key: value for key, value in self.params.items() if key != "fernet_key"}
+
+
+def _dct_case(label: str, max_megapixels: float = 50.0, **overrides) -> EngineCase:
+    return EngineCase("dct", label, {**DCT_SIGN_PARAMS, **overrides}, ("png", "jpeg"),
+                      max_megapixels, _dct_embed, _dct_extract, _dct_read_bits, DCT_PAYLOAD_BITS)
+
+
+def _lsb_case(label: str, **params) -> EngineCase:
+    return EngineCase("lsb", label, params, ("bmp", "png"), 12.0, _lsb_embed, _lsb_extract,
+                      _lsb_read_bits, LSB_PAYLOAD_BITS)
+
+
+CASES = (
+    # Production (create_signature), puis variantes de coût et de robustesse
+    _dct_case("prod"),
+    _dct_case("s12-r15", strength=12.0, redundancy=15),
+    _dct_case("s48-r60", strength=48.0, redundancy=60),
+    _dct_case("q85", jpeg_quality=85),
+    _lsb_case("prod", **LSB_SIGN_PARAMS),
+    _lsb_case("r5", repeat=5),
+    _lsb_case("r20", repeat=20),
+    EngineCase("stego_utils", "none", {"mode": "none"}, ("bmp", "png"), 2.0, _utils_embed, _utils_extract),
+    EngineCase("stego_utils", "aes", {"mode": "aes", "fernet_key": FERNET_KEY}, ("bmp", "png"), 2.0,
+               _utils_embed, _utils_extract),
+)
+
+
+def dct_grid(strengths, redundancies) -> list[EngineCase]:
+    """Cas DCT pour chaque couple (strength, redundancy), autres paramètres de production."""
+    return [_dct_case(f"s{strength:g}-r{redundancy}", strength=float(strength), redundancy=int(redundancy))
+            for strength in strengths for redundancy in redundancies]
+
+
+def select_cases(engines: Optional[set] = None, labels: Optional[set] = None) -> list[EngineCase]:
+    return [case for case in CASES
+            if (not engines or case.engine in engines) and (not labels or case.label in labels)]
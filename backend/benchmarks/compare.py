@@ -0,0 +1,89 @@
+"""
+Comparaison de deux fichiers de résultats : un cas régresse quand une mesure dépasse la
+référence de plus de `threshold` (relatif) ET de plus de `min_seconds` (absolu, pour ignorer
+le bruit des mesures très courtes), ou quand une extraction réussie dans la référence échoue.
+"""
+import json
+from typing import NamedTuple, Optional
+
+TIME_METRICS = ("wall_median", "cpu_median")
+MEMORY_METRIC = "peak_traced_bytes"
+
+
+class Comparison(NamedTuple):
+    key: str
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    regression: bool
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline
+
+
+def result_key(result: dict) -> str:
+    return f"{result['case']}|{result['image']['name']}"
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _changed(baseline: float, current: float, threshold: float, minimum: float) -> bool:
+    return current > baseline * (1 + threshold) and current - baseline > minimum
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10, min_seconds: float = 0.005,
+            memory_threshold: float = 0.10) -> list[Comparison]:
+    """Compare les cas présents dans les deux documents (les autres sont ignorés)."""
+    reference = {result_key(result): result for result in baseline["results"]}
+    comparisons = []
+    for result in current["results"]:
+        key = result_key(result)
+        before = reference.get(key)
+        if before is None:
+            continue
+        if before.get("ok") and not result.get("ok"):
+            comparisons.append(Comparison(key, "ok", 1, 0, True))
+        for operation in ("embed", "extract"):
+            old, new = before.get(operation), result.get(operation)
+            if not old or not new:
+                continue
+            for metric in TIME_METRICS:
+                comparisons.append(Comparison(
+                    key, f"{operation}.{metric}", old[metric], new[metric],
+                    _changed(old[metric], new[metric], threshold, min_seconds),
+                ))
+            if MEMORY_METRIC in old and MEMORY_METRIC in new:
+                comparisons.append(Comparison(
+                    key, f"{operation}.{MEMORY_METRIC}", old[MEMORY_METRIC], new[MEMORY_METRIC],
+                    _changed(old[MEMORY_METRIC], new[MEMORY_METRIC], memory_threshold, 0),
+                ))
+    return comparisons
+
+
+def _format_value(metric: str, value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if metric.endswith("bytes"):
+        return f"{value / 2 ** 20:.1f} MiB"
+    if metric == "ok":
+        return "ok" if value else "FAILED"
+    return f"{value * 1000:.1f} ms"
+
+
+def render(comparisons: list[Comparison], only_regressions: bool = False) -> str:
+    rows = [c for c in comparisons if c.regression or not only_regressions]
+    lines = [f"{'case':<48} {'metric':<28} {'baseline':>12} {'current':>12} {'ratio':>7}"]
+    for c in rows:
+        ratio = "-" if c.ratio is None else f"{c.ratio:.2f}x"
+        flag = "  REGRESSION" if c.regression else ""
+        lines.append(f"{c.key:<48} {c.metric:<28} {_format_value(c.metric, c.baseline):>12} "
+                     f"{_format_value(c.metric, c.current):>12} {ratio:>7}{flag}")
+    regressions = sum(c.regression for c in comparisons)
+    lines.append(f"{len(comparisons)} measurements compared, {regressions} regression(s)")
+    return "\n".join(lines)
@@ -0,0 +1,149 @@
+"""
+Corpus d'images synthétiques reproductible : même graine, mêmes octets.
+
+Chaque image est définie par sa taille (mégapixels, format 4:3), sa texture et son format de
+fichier. Les textures couvrent les cas qui font varier le coût et la robustesse des moteurs :
+dégradés lisses, bruit blanc (pire cas pour la compression), image « photo » (basses fréquences
+et grain) et aplats à bords francs (captures d'écran). Les images encodées sont mises en cache
+sur disque, l'encodage PNG d'une image de 50 Mpx prenant plusieurs secondes.
+"""
+import math
+import os
+import zlib
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+# À incrémenter quand la génération change : invalide le cache disque
+CORPUS_VERSION = 1
+DEFAULT_SEED = 1337
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".corpus")
+
+SIZES_MEGAPIXELS = (0.3, 2.0, 12.0, 50.0)
+TEXTURES = ("gradient", "noise", "photo", "flat")
+FORMATS = ("bmp", "png", "jpeg")
+JPEG_QUALITY = 90
+
+_EXTENSIONS = {"bmp": ".bmp", "png": ".png", "jpeg": ".jpg"}
+
+
+class CorpusImage(NamedTuple):
+    megapixels: float
+    texture: str
+    image_format: str
+    width: int
+    height: int
+    data: bytes
+
+    @property
+    def name(self) -> str:
+        return image_name(self.megapixels, self.texture, self.image_format)
+
+    @property
+    def extension(self) -> str:
+        return _EXTENSIONS[self.image_format]
+
+
+def image_name(megapixels: float, texture: str, image_format: str) -> str:
+    return f"{megapixels:g}mp-{texture}-{image_format}"
+
+
+def dimensions(megapixels: float) -> tuple[int, int]:
+    """Largeur et hauteur d'une image 4:3 d'environ `megapixels` millions de pixels."""
+    width = max(8, round(math.sqrt(megapixels * 1_000_000 * 4 / 3)))
+    return width, max(8, round(width * 3 / 4))
+
+
+def _rng(seed: int, megapixels: float, texture: str) -> np.random.Generator:
+    # Graine dérivée du nom : une image ne dépend pas de l'ordre ni du contenu du corpus
+    return np.random.default_rng([seed, zlib.crc32(f"{megapixels:g}:{texture}".encode())])
+
+
+def _gradient(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    channels = []
+    for _ in range(3):
+        a, b, c = rng.uniform(-1.0, 1.0, 3)
+        channels.append(128 + 100 * np.tanh(a * x + b * y + c))
+    image = np.stack(channels, axis=-1)
+    image += rng.normal(0.0, 1.5, image.shape).astype(np.float32)
+    return image
+
+
+def _noise(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _photo(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    # Somme d'octaves de bruit basse résolution agrandi, puis grain fin
+    image = np.zeros((height, width, 3), dtype=np.float32)
+    for octave, weight in ((8, 70.0), (32, 35.0), (128, 15.0)):
+        small = rng.normal(0.0, 1.0, (max(2, height * octave // max(width, height)), octave, 3)).astype(np.float32)
+        image += weight * cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    image += 128 + rng.normal(0.0, 4.0, image.shape).astype(np.float32)
+    return image
+
+
+def _flat(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    image = np.full((height, width, 3), 240, dtype=np.uint8)
+    for _ in range(40):
+        x0, x1 = sorted(rng.integers(0, width, 2))
+        y0, y1 = sorted(rng.integers(0, height, 2))
+        image[y0:y1 + 1, x0:x1 + 1] = rng.integers(0, 256, 3)
+    return image
+
+
+_GENERATORS = {"gradient": _gradient, "noise": _noise, "photo": _photo, "flat": _flat}
+
+
+def generate(megapixels: float, texture: str, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """Image BGR uint8 déterministe pour (taille, texture, graine)."""
+    if texture not in _GENERATORS:
+        raise ValueError(f"Unknown texture: {texture}")
+    width, height = dimensions(megapixels)
+    image = _GENERATORS[texture](_rng(seed, megapixels, texture), width, height)
+    return np.clip(image, 0, 255).astype(np.uint8) if image.dtype != np.uint8 else image
+
+
+def encode(image: np.ndarray, image_format: str) -> bytes:
+    params = [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY] if image_format == "jpeg" else []
+    ok, encoded = cv2.imencode(_EXTENSIONS[image_format], image, params)
+    if not ok:
+        raise ValueError(f"Cannot encode {image_format}")
+    return encoded.tobytes()
+
+
+def load_image(megapixels: float, texture: str, image_format: str, seed: int = DEFAULT_SEED,
+               cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> CorpusImage:
+    """Image encodée du corpus, lue depuis le cache disque ou générée (cache_dir=None : sans cache)."""
+    if image_format not in _EXTENSIONS:
+        raise ValueError(f"Unknown format: {image_format}")
+    width, height = dimensions(megapixels)
+    path = None
+    if cache_dir is not None:
+        name = f"v{CORPUS_VERSION}-s{seed}-{image_name(megapixels, texture, image_format)}{_EXTENSIONS[image_format]}"
+        path = os.path.join(cache_dir, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return CorpusImage(megapixels, texture, image_format, width, height, f.read())
+
+    data = encode(generate(megapixels, texture, seed), image_format)
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    return CorpusImage(megapixels, texture, image_format, width, height, data)
+
+
+def iter_corpus(sizes: Iterable[float] = SIZES_MEGAPIXELS, textures: Iterable[str] = TEXTURES,
+                formats: Iterable[str] = FORMATS, seed: int = DEFAULT_SEED,
+                cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Iterator[CorpusImage]:
+    """Images du corpus une à une (les plus grandes ne tiennent pas toutes en mémoire)."""
+    for megapixels in sizes:
+        for texture in textures:
+            for image_format in formats:
+                yield load_image(megapixels, texture, image_format, seed, cache_dir)
@@ -0,0 +1,34 @@
+"""Description de la machine et de la révision mesurées, jointe à chaque fichier de résultats."""
+import os
+import platform
+import subprocess
+import sys
+from typing import Optional
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    import cv2
+    import numpy
+    import PIL
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+        "pillow": PIL.__version__,
+        "git_revision": git_revision(),
+    }
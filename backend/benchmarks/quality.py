@@ -0,0 +1,45 @@
+"""Distorsion introduite par la signature : PSNR et SSIM entre l'image d'origine et l'image signée."""
+import math
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+def decode(data: bytes) -> np.ndarray:
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Cannot decode image")
+    return image
+
+
+def psnr(reference: np.ndarray, image: np.ndarray) -> Optional[float]:
+    """PSNR en dB sur les trois canaux ; None pour des images identiques (PSNR infini)."""
+    mse = float(np.mean((reference.astype(np.float64) - image.astype(np.float64)) ** 2))
+    if mse == 0:
+        return None
+    return 10 * math.log10(255.0 ** 2 / mse)
+
+
+def ssim(reference: np.ndarray, image: np.ndarray) -> float:
+    """SSIM moyen sur la luminance (fenêtre gaussienne 11x11, sigma 1.5, constantes de Wang et al.)."""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    x = cv2.cvtColor(reference, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    y = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY).astype(np.float64)
+
+    def window(values: np.ndarray) -> np.ndarray:
+        return cv2.GaussianBlur(values, (11, 11), 1.5)
+
+    mu_x, mu_y = window(x), window(y)
+    sigma_x = window(x * x) - mu_x ** 2
+    sigma_y = window(y * y) - mu_y ** 2
+    sigma_xy = window(x * y) - mu_x * mu_y
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * sigma_xy + c2)) / ((mu_x ** 2 + mu_y ** 2 + c1) * (sigma_x + sigma_y + c2))
+    return float(ssim_map.mean())
+
+
+def bit_error_rate(reference: str, bits: str) -> float:
+    if not reference:
+        raise ValueError("Empty reference bit string")
+    errors = sum(a != b for a, b in zip(reference, bits)) + abs(len(reference) - len(bits))
+    return errors / len(reference)
@@ -0,0 +1,171 @@
+"""
+Robustesse contre coût : chaque cas (moteur, paramètres) signe le corpus, puis chaque image
+signée subit chaque attaque ; on mesure le succès de l'extraction, le taux d'erreur binaire
+(bits lus sur l'image attaquée contre bits lus sur l'image signée intacte), la distorsion de la
+signature (PSNR, SSIM) et le temps CPU de l'intégration et de l'extraction.
+
+Les signatures puis les attaques sont réparties sur un pool de processus. Le coût retenu est le
+temps CPU (par mégapixel), que le parallélisme ne fausse pas, contrairement au temps réel.
+"""
+import datetime
+import logging
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from benchmarks import quality
+from benchmarks.attacks import Attack
+from benchmarks.cases import MESSAGE, EngineCase
+from benchmarks.corpus import CorpusImage
+from benchmarks.environment import environment
+from benchmarks.runner import attempt
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(func, *args) -> tuple[object, Optional[Exception], float, float]:
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    value, error = attempt(func, *args)
+    return value, error, time.process_time() - cpu_started, time.perf_counter() - wall_started
+
+
+def _sign(case: EngineCase, image: CorpusImage) -> dict:
+    """Signature d'une image : coût, distorsion et bits de référence pour le taux d'erreur."""
+    signed, error, cpu, wall = _timed(case.embed, image.data, image.extension)
+    result = {"case": case.name, "image": image.name, "megapixels": image.width * image.height / 1e6,
+              "embed_cpu": cpu, "embed_wall": wall, "signed": signed, "reference_bits": None}
+    if error is not None:
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+    original, marked = quality.decode(image.data), quality.decode(signed)
+    result["psnr"] = quality.psnr(original, marked)
+    result["ssim"] = quality.ssim(original, marked)
+    # Les bits intacts ne servent de référence que si l'extraction intacte réussit (CRC vérifié)
+    extracted, _ = attempt(case.extract, signed)
+    if extracted == MESSAGE:
+        result["reference_bits"], _ = attempt(case.read_bits, signed)
+    return result
+
+
+def _attack(case: EngineCase, signed: bytes, attack: Attack, reference_bits: Optional[str]) -> dict:
+    attacked = attack.apply(signed)
+    extracted, error, cpu, wall = _timed(case.extract, attacked)
+    result = {"attack": attack.name, "ok": error is None and extracted == MESSAGE,
+              "extract_cpu": cpu, "extract_wall": wall, "ber": None}
+    if reference_bits:
+        bits, read_error = attempt(case.read_bits, attacked)
+        # Flux illisible (image trop petite...) : autant qu'un tirage aléatoire
+        result["ber"] = 0.5 if read_error is not None else quality.bit_error_rate(reference_bits, bits)
+    if error is not None:
+        result["error"] = type(error).__name__
+    return result
+
+
+def run_robustness(cases: Iterable[EngineCase], images: Iterable[CorpusImage], attacks: Iterable[Attack],
+                   workers: Optional[int] = None, settings: Optional[dict] = None) -> dict:
+    cases, images, attacks = list(cases), list(images), list(attacks)
+    jobs = [(case, image) for case in cases for image in images if case.accepts(image.megapixels, image.image_format)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        signatures = list(pool.map(_sign, *zip(*jobs))) if jobs else []
+        logger.info("%d image(s) signed, applying %d attack(s)", len(signatures), len(attacks))
+        pending = [
+            (signature, pool.submit(_attack, case, signature["signed"], attack, signature["reference_bits"]))
+            for (case, _), signature in zip(jobs, signatures) if "error" not in signature
+            for attack in attacks
+        ]
+        runs = []
+        for signature, future in pending:
+            runs.append({
+                "case": signature["case"], "image": signature["image"], "megapixels": signature["megapixels"],
+                **future.result(),
+            })
+
+    embeds = [{key: value for key, value in signature.items() if key not in ("signed", "reference_bits")}
+              for signature in signatures]
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": settings or {},
+        "cases": {case.name: {"engine": case.engine, "params": case.public_params()} for case in cases},
+        "embeds": embeds,
+        "runs": runs,
+    }
+
+
+def _mean(values: list) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return statistics.fmean(values) if values else None
+
+
+def summarize(document: dict, min_psnr: Optional[float] = None) -> list[dict]:
+    """
+    Une ligne par cas : coût CPU par mégapixel, distorsion, taux de succès par attaque et score de
+    robustesse (succès sur l'ensemble des attaques hors « none »). Une signature invisible (PSNR None,
+    image inchangée) compte comme la meilleure qualité.
+    """
+    rows = []
+    for name, description in document["cases"].items():
+        embeds = [embed for embed in document["embeds"] if embed["case"] == name]
+        runs = [run for run in document["runs"] if run["case"] == name]
+        if not embeds:
+            continue
+        attacked = [run for run in runs if run["attack"] != "none"]
+        per_attack = {}
+        for run in runs:
+            per_attack.setdefault(run["attack"], []).append(run["ok"])
+        psnr_values = [embed.get("psnr") for embed in embeds if "error" not in embed]
+        row = {
+            "case": name,
+            "engine": description["engine"],
+            "params": description["params"],
+            "images": len(embeds),
+            "embed_errors": sum("error" in embed for embed in embeds),
+            "embed_cpu_per_mp": _mean([embed["embed_cpu"] / embed["megapixels"] for embed in embeds]),
+            "extract_cpu_per_mp": _mean([run["extract_cpu"] / run["megapixels"] for run in runs]),
+            "psnr": _mean(psnr_values),
+            "ssim": _mean([embed.get("ssim") for embed in embeds]),
+            "robustness": sum(run["ok"] for run in attacked) / len(attacked) if attacked else 0.0,
+            "ber": _mean([run["ber"] for run in attacked]),
+            "success": {attack: sum(oks) / len(oks) for attack, oks in per_attack.items()},
+        }
+        row["cost_per_mp"] = (row["embed_cpu_per_mp"] or 0.0) + (row["extract_cpu_per_mp"] or 0.0)
+        row["eligible"] = min_psnr is None or row["psnr"] is None or row["psnr"] >= min_psnr
+        rows.append(row)
+    return rows
+
+
+def pareto_front(rows: list[dict]) -> list[str]:
+    """Cas éligibles non dominés : aucun autre n'est à la fois moins coûteux et plus robuste."""
+    eligible = [row for row in rows if row["eligible"]]
+    front = []
+    for row in eligible:
+        dominated = any(
+            other["cost_per_mp"] <= row["cost_per_mp"] and other["robustness"] >= row["robustness"]
+            and (other["cost_per_mp"] < row["cost_per_mp"] or other["robustness"] > row["robustness"])
+            for other in eligible
+        )
+        if not dominated:
+            front.append(row["case"])
+    return sorted(front, key=lambda name: next(row["cost_per_mp"] for row in rows if row["case"] == name))
+
+
+def _format(value: Optional[float], pattern: str) -> str:
+    return "-" if value is None else pattern.format(value)
+
+
+def render(rows: list[dict], front: list[str]) -> str:
+    attacks = sorted({attack for row in rows for attack in row["success"]}, key=lambda name: (name != "none", name))
+    header = (f"{'case':<22} {'cpu s/MP':>9} {'psnr':>6} {'ssim':>6} {'robust':>7} {'ber':>6}  "
+              + " ".join(f"{attack:>8}" for attack in attacks))
+    lines = [header]
+    for row in sorted(rows, key=lambda row: row["cost_per_mp"]):
+        marker = "*" if row["case"] in front else (" " if row["eligible"] else "x")
+        lines.append(
+            f"{marker}{row['case']:<21} {row['cost_per_mp']:>9.3f} {_format(row['psnr'], '{:.1f}'):>6} "
+            f"{_format(row['ssim'], '{:.3f}'):>6} {row['robustness'] * 100:>6.1f}% {_format(row['ber'], '{:.3f}'):>6}  "
+            + " ".join(f"{row['success'].get(attack, 0.0) * 100:>7.0f}%" for attack in attacks)
+        )
+    lines.append("* Pareto front (CPU cost vs robustness), x excluded by --min-psnr; "
+                 "robust = extraction success over all attacks except 'none'")
+    return "\n".join(lines)
@@ -0,0 +1,121 @@
+"""
+Mesure d'un cas (moteur, paramètres, image) : temps réel et temps CPU sur plusieurs répétitions,
+puis une exécution supplémentaire sous tracemalloc pour le pic d'allocations.
+
+Le pic est mesuré à part car tracemalloc ralentit fortement le code Python (LSB) : il fausserait
+les temps. Il couvre les allocations Python et numpy, pas les tampons natifs internes d'OpenCV
+et de Pillow. Le temps CPU est celui du processus : il inclut les threads d'OpenCV.
+"""
+import datetime
+import gc
+import logging
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Iterable, Optional
+
+from benchmarks.cases import MESSAGE, EngineCase
+from benchmarks.corpus import CorpusImage
+from benchmarks.environment import environment
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+
+
+def _timed(func: Callable, repeat: int) -> tuple[dict, object]:
+    walls, cpus = [], []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        result = func()
+        cpus.append(time.process_time() - cpu_started)
+        walls.append(time.perf_counter() - wall_started)
+    return {
+        "wall_median": statistics.median(walls),
+        "wall_min": min(walls),
+        "cpu_median": statistics.median(cpus),
+        "runs": repeat,
+    }, result
+
+
+def _peak_bytes(func: Callable) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _measure(func: Callable, repeat: int, memory: bool) -> tuple[dict, object]:
+    timings, result = _timed(func, repeat)
+    if memory:
+        timings["peak_traced_bytes"] = _peak_bytes(func)
+    return timings, result
+
+
+def attempt(func: Callable, *args) -> tuple[object, Optional[Exception]]:
+    try:
+        return func(*args), None
+    except Exception as error:
+        return None, error
+
+
+def run_case(case: EngineCase, image: CorpusImage, repeat: int = 3, memory: bool = True) -> dict:
+    """Mesure l'intégration puis l'extraction ; les erreurs du moteur sont consignées, pas propagées."""
+    result = {
+        "case": case.name,
+        "engine": case.engine,
+        "params": case.public_params(),
+        "image": {
+            "name": image.name,
+            "megapixels": image.megapixels,
+            "texture": image.texture,
+            "format": image.image_format,
+            "width": image.width,
+            "height": image.height,
+            "bytes": len(image.data),
+        },
+    }
+    try:
+        result["embed"], signed = _measure(lambda: case.embed(image.data, image.extension), repeat, memory)
+    except Exception as error:
+        result.update(ok=False, error=f"{type(error).__name__}: {error}")
+        return result
+    result["signed_bytes"] = len(signed)
+    # Une extraction qui échoue (capacité, bits corrompus) a un coût : elle est mesurée aussi
+    result["extract"], (extracted, error) = _measure(lambda: attempt(case.extract, signed), repeat, memory)
+    result["ok"] = error is None and extracted == MESSAGE
+    if error is not None:
+        result["error"] = f"{type(error).__name__}: {error}"
+    return result
+
+
+def run_suite(cases: Iterable[EngineCase], images: Iterable[CorpusImage], repeat: int = 3,
+              memory: bool = True, settings: Optional[dict] = None) -> dict:
+    """Exécute chaque cas sur chaque image qu'il accepte et retourne le document de résultats."""
+    cases = list(cases)
+    results = []
+    for image in images:
+        for case in cases:
+            if not case.accepts(image.megapixels, image.image_format):
+                continue
+            result = run_case(case, image, repeat, memory)
+            logger.info("%s %s: embed %s, extract %s%s", case.name, image.name,
+                        _format_seconds(result.get("embed")), _format_seconds(result.get("extract")),
+                        "" if result["ok"] else f" FAILED {result.get('error', 'wrong message')}")
+            results.append(result)
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": settings or {},
+        "results": results,
+    }
+
+
+def _format_seconds(timings: Optional[dict]) -> str:
+    return "-" if timings is None else f"{timings['wall_median'] * 1000:.1f} ms"
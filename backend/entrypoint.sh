@@ -17,5 +17,9 @@ fi
 echo "Applying migrations..."
 alembic upgrade head
 
+# Import legacy media (flat folders, absolute paths) into the configured storage
+echo "Importing legacy media..."
+python -m src.storage.reshard
+
 # Start the application
 exec uvicorn src.main:app --host 0.0.0.0 --port 8000 --reload
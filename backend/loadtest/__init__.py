@@ -0,0 +1,13 @@
+"""
+Tests de charge de l'API de stéganographie (signature, vérification, téléchargement, listes).
+
+Depuis backend/ :
+
+    python -m loadtest run smoke
+    python -m loadtest run mixed --workers 4
+    python -m loadtest compare loadtest/results/mixed-w1-<date>.json loadtest/results/mixed-w4-<date>.json
+
+Les scénarios (loadtest/scenarios/*.toml) fixent la concurrence, le débit d'arrivée, le mélange
+d'opérations et d'images (corpus de benchmarks.corpus) : un même scénario rejoué sur deux révisions
+ou deux configurations de workers donne des résultats comparables.
+"""
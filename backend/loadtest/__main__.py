@@ -0,0 +1,110 @@
+"""
+    python -m loadtest run SCENARIO [--workers N] [--output results.json]
+    python -m loadtest run SCENARIO --base-url URL --email EMAIL --password PASSWORD
+    python -m loadtest compare BASELINE CURRENT
+
+SCENARIO est un nom de loadtest/scenarios/ (ex: mixed) ou un chemin de fichier TOML.
+Sans --base-url, une instance locale est démarrée (loadtest.server).
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import sys
+
+from benchmarks.environment import git_revision
+from loadtest import report
+from loadtest.scenario import load_scenario
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _run(args) -> int:
+    from loadtest.runner import LoadRunner
+    from loadtest.server import USER_PASSWORD, LocalServer, user_email
+
+    scenario = load_scenario(args.scenario)
+    if args.duration:
+        scenario = scenario._replace(duration_seconds=args.duration)
+    workers = args.workers or scenario.server_workers
+    server = None
+    if args.base_url:
+        if not (args.email and args.password):
+            print("--base-url requires --email and --password of an active account.", file=sys.stderr)
+            return 2
+        base_url, credentials = args.base_url, [(args.email, args.password)]
+    else:
+        server = LocalServer(workers=workers, users=scenario.users, env=scenario.server_env, keep_dir=args.keep_data)
+        server.start()
+        base_url = server.base_url
+        credentials = [(user_email(index), USER_PASSWORD) for index in range(scenario.users)]
+
+    try:
+        runner = LoadRunner(scenario, base_url, credentials)
+        duration = asyncio.run(runner.run())
+    finally:
+        if server is not None:
+            server.stop()
+
+    summary = report.summarize(runner.samples, duration)
+    print(report.render(summary))
+    document = {
+        "scenario": scenario.to_dict(),
+        "target": {"base_url": base_url, "local": server is not None, "workers": workers if server else None},
+        "git_revision": git_revision(),
+        "cpu_count": os.cpu_count(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "summary": summary,
+    }
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{scenario.name}-w{workers}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"-> {output}")
+    return 0
+
+
+def _compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["scenario"]["name"] != current["scenario"]["name"]:
+        print("warning: results come from different scenarios", file=sys.stderr)
+    print(report.render_comparison(baseline, current))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Load tests of the stego API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run a scenario and write a JSON results file")
+    run.add_argument("scenario", help="scenario name (loadtest/scenarios) or TOML path")
+    run.add_argument("--workers", type=int, help="uvicorn workers of the local server (overrides the scenario)")
+    run.add_argument("--duration", type=float, help="measured duration in seconds (overrides the scenario)")
+    run.add_argument("--base-url", help="target an already running server instead of a local one")
+    run.add_argument("--email", help="account used against --base-url")
+    run.add_argument("--password", help="account password used against --base-url")
+    run.add_argument("--keep-data", action="store_true", help="keep the local server directory (database, logs)")
+    run.add_argument("--output", help="results file (default: loadtest/results/<scenario>-w<workers>-<date>.json)")
+    run.set_defaults(handler=_run)
+
+    diff = commands.add_parser("compare", help="compare two results files of the same scenario")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Une ligne par requête : illisible sous charge
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Agrégation des échantillons : débit, taux d'erreur et percentiles de latence par opération."""
+import math
+from collections import Counter
+from typing import Iterable
+
+from loadtest.runner import Sample
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    """Percentile au rang le plus proche (valeur réellement observée, sans interpolation)."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _latency_summary(values: list[float]) -> dict:
+    values = sorted(values)
+    summary = {f"p{rank}": round(percentile(values, rank) * 1000, 2) for rank in PERCENTILES}
+    summary["max"] = round(values[-1] * 1000, 2) if values else 0.0
+    summary["mean"] = round(sum(values) / len(values) * 1000, 2) if values else 0.0
+    return summary
+
+
+def summarize_samples(samples: Iterable[Sample], duration_seconds: float) -> dict:
+    samples = list(samples)
+    errors = [sample for sample in samples if sample.error]
+    succeeded = [sample for sample in samples if not sample.error]
+    return {
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / duration_seconds, 2) if duration_seconds else 0.0,
+        # Latences des requêtes réussies : un échec rapide ne doit pas améliorer les percentiles
+        "latency_ms": _latency_summary([sample.latency for sample in succeeded]),
+        "service_ms": _latency_summary([sample.service for sample in succeeded]),
+        "statuses": {str(status): count for status, count in sorted(Counter(s.status for s in samples).items())},
+        "error_kinds": dict(Counter(sample.error for sample in errors).most_common()),
+    }
+
+
+def summarize(samples: list[Sample], duration_seconds: float) -> dict:
+    operations = sorted({sample.operation for sample in samples})
+    return {
+        "duration_seconds": round(duration_seconds, 3),
+        "total": summarize_samples(samples, duration_seconds),
+        "operations": {
+            operation: summarize_samples([s for s in samples if s.operation == operation], duration_seconds)
+            for operation in operations
+        },
+    }
+
+
+def render(summary: dict) -> str:
+    lines = [f"{'operation':<20} {'req':>7} {'rps':>8} {'err%':>6} "
+             + " ".join(f"{f'p{rank}':>9}" for rank in PERCENTILES) + f" {'max':>9}"]
+    rows = list(summary["operations"].items()) + [("TOTAL", summary["total"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        lines.append(f"{name:<20} {stats['requests']:>7} {stats['throughput_rps']:>8.2f} "
+                     f"{stats['error_rate'] * 100:>6.2f} "
+                     + " ".join(f"{latency[f'p{rank}']:>9.1f}" for rank in PERCENTILES)
+                     + f" {latency['max']:>9.1f}")
+    lines.append("latencies in ms, measured from the scheduled arrival time")
+    errors = summary["total"]["error_kinds"]
+    if errors:
+        lines.append("errors: " + ", ".join(f"{kind} x{count}" for kind, count in errors.items()))
+    return "\n".join(lines)
+
+
+def render_comparison(baseline: dict, current: dict) -> str:
+    """Deux résultats du même scénario côte à côte (révisions ou nombres de workers différents)."""
+    lines = [f"{'operation':<20} {'metric':<16} {'baseline':>10} {'current':>10} {'ratio':>7}"]
+    metrics = (
+        ("throughput_rps", lambda stats: stats["throughput_rps"]),
+        ("error_rate", lambda stats: stats["error_rate"]),
+        *((f"p{rank}_ms", lambda stats, rank=rank: stats["latency_ms"][f"p{rank}"]) for rank in (50, 95, 99)),
+    )
+    for name in list(current["summary"]["operations"]) + ["TOTAL"]:
+        before = baseline["summary"]["total"] if name == "TOTAL" else baseline["summary"]["operations"].get(name)
+        after = current["summary"]["total"] if name == "TOTAL" else current["summary"]["operations"][name]
+        if before is None:
+            continue
+        for metric, value in metrics:
+            old, new = value(before), value(after)
+            ratio = f"{new / old:.2f}x" if old else "-"
+            lines.append(f"{name:<20} {metric:<16} {old:>10.2f} {new:>10.2f} {ratio:>7}")
+    return "\n".join(lines)
@@ -0,0 +1,217 @@
+"""
+Générateur de charge asynchrone (httpx) : utilisateurs virtuels authentifiés, choix pondéré des
+opérations et des images, arrivées de Poisson (modèle ouvert) ou clients en boucle (modèle fermé).
+
+En modèle ouvert, la latence est mesurée depuis l'instant d'arrivée prévu : l'attente d'une place
+parmi les `concurrency` requêtes simultanées en fait partie, ce qui évite de masquer la saturation
+du serveur (omission coordonnée). Le temps de service seul est aussi enregistré.
+"""
+import asyncio
+import base64
+import logging
+import random
+import time
+from typing import NamedTuple, Optional
+
+import httpx
+
+from benchmarks.corpus import load_image
+from loadtest.scenario import Scenario
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {"bmp": "image/bmp", "png": "image/png", "jpeg": "image/jpeg"}
+MAX_SIGNED_PER_USER = 16
+# Arrivées en attente au-delà desquelles le générateur lui-même est saturé : elles sont comptées en erreur
+MAX_BACKLOG_FACTOR = 10
+
+
+class Sample(NamedTuple):
+    operation: str
+    started: float
+    latency: float
+    service: float
+    status: int
+    error: Optional[str] = None
+
+
+class SignedImage(NamedTuple):
+    signature_uuid: str
+    filename: str
+    content_type: str
+    etag: Optional[str] = None
+
+
+class VirtualUser:
+    """Compte de test connecté : jetons, signatures créées et images signées téléchargées."""
+
+    def __init__(self, client: httpx.AsyncClient, email: str, password: str, rng: random.Random):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.headers: dict = {}
+        self.signed: list[SignedImage] = []
+        # (nom de fichier, type, contenu) des images signées, soumises à /verify
+        self.downloaded: list[tuple[str, str, bytes]] = []
+
+    async def login(self):
+        response = await self.client.post("/api/auth/login", json={"email": self.email, "password": self.password})
+        response.raise_for_status()
+        # Cookie « secure » : httpx ne le renverrait pas en http, il est transmis explicitement
+        refresh_token = response.cookies.get("refresh_token")
+        self.client.cookies.clear()
+        self.headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}",
+            "Cookie": f"refresh_token={refresh_token}",
+        }
+
+    @staticmethod
+    def _bounded_append(items: list, item):
+        items.append(item)
+        del items[:-MAX_SIGNED_PER_USER]
+
+    # ---------- opérations ----------
+    async def sign(self, image) -> httpx.Response:
+        filename = f"loadtest{image.extension}"
+        content_type = CONTENT_TYPES[image.image_format]
+        response = await self.client.post(
+            "/api/stego/upload-signature", headers=self.headers,
+            data={"message": f"load test {self.email}"},
+            files={"file": (filename, image.data, content_type)},
+        )
+        if response.status_code == 201:
+            self._bounded_append(self.signed, SignedImage(response.json()["signature_uuid"], filename, content_type))
+        return response
+
+    async def download(self, conditional: bool) -> httpx.Response:
+        index = self.rng.randrange(len(self.signed))
+        target = self.signed[index]
+        headers = dict(self.headers)
+        if conditional and target.etag:
+            headers["If-None-Match"] = target.etag
+        response = await self.client.get(f"/api/stego/download/{target.signature_uuid}", headers=headers)
+        if response.status_code == 200:
+            data = base64.b64decode(response.json()["base64_data"])
+            self._bounded_append(self.downloaded, (target.filename, target.content_type, data))
+            if index < len(self.signed) and self.signed[index] is target:
+                self.signed[index] = target._replace(etag=response.headers.get("etag"))
+        return response
+
+    async def verify(self) -> httpx.Response:
+        filename, content_type, data = self.rng.choice(self.downloaded)
+        return await self.client.post(
+            "/api/stego/verify", headers=self.headers, files={"file": (filename, data, content_type)},
+        )
+
+    async def list_signatures(self) -> httpx.Response:
+        return await self.client.get("/api/stego/signatures", headers=self.headers)
+
+    async def list_verifications(self) -> httpx.Response:
+        return await self.client.get("/api/stego/verifications", headers=self.headers)
+
+
+class LoadRunner:
+    def __init__(self, scenario: Scenario, base_url: str, credentials: list[tuple[str, str]],
+                 request_timeout: float = 120.0):
+        self.scenario = scenario
+        self.base_url = base_url
+        self.credentials = credentials
+        self.request_timeout = request_timeout
+        self.rng = random.Random(scenario.seed)
+        self.samples: list[Sample] = []
+        self.images = [load_image(image.megapixels, image.texture, image.image_format) for image in scenario.images]
+        self.image_weights = [image.weight for image in scenario.images]
+        self.operations = [name for name, weight in scenario.operations.items() if weight > 0]
+        self.operation_weights = [scenario.operations[name] for name in self.operations]
+        self.users: list[VirtualUser] = []
+        self.measure_from = 0.0
+
+    def _pick_image(self):
+        return self.rng.choices(self.images, self.image_weights)[0]
+
+    async def _call(self, user: VirtualUser, operation: str) -> httpx.Response:
+        if operation == "sign":
+            return await user.sign(self._pick_image())
+        if operation == "download":
+            return await user.download(self.rng.random() < self.scenario.conditional_download_ratio)
+        return await getattr(user, operation)()
+
+    async def _execute(self, operation: str, scheduled: float, semaphore: asyncio.Semaphore):
+        user = self.rng.choice(self.users)
+        async with semaphore:
+            started = time.perf_counter()
+            status, error = 0, None
+            try:
+                response = await self._call(user, operation)
+                status = response.status_code
+                if status >= 400:
+                    error = f"HTTP {status}"
+            except httpx.HTTPError as exc:
+                error = type(exc).__name__
+            finished = time.perf_counter()
+        if scheduled >= self.measure_from:
+            self.samples.append(Sample(operation, scheduled, finished - scheduled, finished - started, status, error))
+
+    def _next_operation(self) -> str:
+        return self.rng.choices(self.operations, self.operation_weights)[0]
+
+    async def _open_loop(self, semaphore: asyncio.Semaphore, deadline: float):
+        pending: set = set()
+        scheduled = time.perf_counter()
+        while True:
+            scheduled += self.rng.expovariate(self.scenario.arrival_rate)
+            if scheduled >= deadline:
+                break
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            operation = self._next_operation()
+            if len(pending) >= self.scenario.concurrency * MAX_BACKLOG_FACTOR:
+                if scheduled >= self.measure_from:
+                    self.samples.append(Sample(operation, scheduled, 0.0, 0.0, 0, "client_backlog_full"))
+                continue
+            task = asyncio.create_task(self._execute(operation, scheduled, semaphore))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending)
+
+    async def _closed_loop(self, semaphore: asyncio.Semaphore, deadline: float):
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                await self._execute(self._next_operation(), time.perf_counter(), semaphore)
+
+        await asyncio.gather(*(client_loop() for _ in range(self.scenario.concurrency)))
+
+    async def _setup(self, client: httpx.AsyncClient):
+        self.users = [VirtualUser(client, email, password, random.Random(self.rng.random()))
+                      for email, password in self.credentials]
+        for user in self.users:
+            await user.login()
+        # Chaque utilisateur dispose d'images signées à télécharger et vérifier dès le début
+        for user in self.users:
+            for _ in range(self.scenario.prefill_signatures):
+                (await user.sign(self._pick_image())).raise_for_status()
+            for _ in range(self.scenario.prefill_signatures):
+                (await user.download(conditional=False)).raise_for_status()
+
+    async def run(self) -> float:
+        """Exécute le scénario ; retourne la durée de la fenêtre mesurée (hors préchauffage)."""
+        limits = httpx.Limits(max_connections=self.scenario.concurrency,
+                              max_keepalive_connections=self.scenario.concurrency,
+                              # Sous le délai keep-alive d'uvicorn (5 s) : pas de réutilisation d'une connexion fermée
+                              keepalive_expiry=2.0)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits,
+                                     timeout=httpx.Timeout(self.request_timeout, connect=10.0)) as client:
+            await self._setup(client)
+            logger.info("%d user(s) logged in, %d signature(s) each; running %s for %ss",
+                        len(self.users), self.scenario.prefill_signatures, self.scenario.name,
+                        self.scenario.duration_seconds)
+            semaphore = asyncio.Semaphore(self.scenario.concurrency)
+            started = time.perf_counter()
+            self.measure_from = started + self.scenario.warmup_seconds
+            deadline = self.measure_from + self.scenario.duration_seconds
+            if self.scenario.arrival_rate > 0:
+                await self._open_loop(semaphore, deadline)
+            else:
+                await self._closed_loop(semaphore, deadline)
+            return max(time.perf_counter(), deadline) - self.measure_from
@@ -0,0 +1,95 @@
+"""
+Scénarios de charge, décrits en TOML dans loadtest/scenarios/ : versionnés avec le code, ils
+rendent les résultats comparables d'une révision ou d'une configuration de workers à l'autre.
+"""
+import os
+import tomllib
+from typing import NamedTuple
+
+from benchmarks.corpus import FORMATS, TEXTURES
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(__file__), "scenarios")
+OPERATIONS = ("sign", "verify", "download", "list_signatures", "list_verifications")
+
+
+class ImageMix(NamedTuple):
+    megapixels: float
+    texture: str
+    image_format: str
+    weight: float
+
+
+class Scenario(NamedTuple):
+    name: str
+    description: str
+    duration_seconds: float
+    warmup_seconds: float
+    # Requêtes simultanées au plus ; arrival_rate > 0 : arrivées de Poisson (modèle ouvert),
+    # arrival_rate = 0 : `concurrency` clients enchaînent les requêtes (modèle fermé)
+    concurrency: int
+    arrival_rate: float
+    users: int
+    prefill_signatures: int
+    conditional_download_ratio: float
+    operations: dict
+    images: tuple
+    seed: int
+    server_workers: int
+    server_env: dict
+
+    def to_dict(self) -> dict:
+        document = self._asdict()
+        document["images"] = [image._asdict() for image in self.images]
+        return document
+
+
+def resolve_path(name_or_path: str) -> str:
+    """Chemin d'un fichier de scénario, ou nom d'un scénario de loadtest/scenarios/."""
+    if os.path.isfile(name_or_path):
+        return name_or_path
+    return os.path.join(SCENARIOS_DIR, f"{name_or_path}.toml")
+
+
+def _positive(document: dict, key: str, default=None, minimum: float = 0):
+    value = document.get(key, default)
+    if value is None or not isinstance(value, (int, float)) or value < minimum:
+        raise ValueError(f"Scenario field '{key}' must be a number >= {minimum}")
+    return value
+
+
+def load_scenario(name_or_path: str) -> Scenario:
+    path = resolve_path(name_or_path)
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+
+    operations = {name: float(weight) for name, weight in document.get("operations", {}).items()}
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown or not any(weight > 0 for weight in operations.values()):
+        raise ValueError(f"Scenario operations must weight some of {', '.join(OPERATIONS)}")
+
+    images = []
+    for entry in document.get("images", []):
+        if entry.get("texture") not in TEXTURES or entry.get("format") not in FORMATS:
+            raise ValueError(f"Invalid image entry: {entry}")
+        images.append(ImageMix(float(entry["megapixels"]), entry["texture"], entry["format"],
+                               float(entry.get("weight", 1))))
+    if not images:
+        raise ValueError("Scenario must define at least one [[images]] entry")
+
+    server = document.get("server", {})
+    return Scenario(
+        name=document.get("name", os.path.splitext(os.path.basename(path))[0]),
+        description=document.get("description", ""),
+        duration_seconds=_positive(document, "duration_seconds", 60, 1),
+        warmup_seconds=_positive(document, "warmup_seconds", 5),
+        concurrency=int(_positive(document, "concurrency", 8, 1)),
+        arrival_rate=_positive(document, "arrival_rate", 0),
+        users=int(_positive(document, "users", 4, 1)),
+        prefill_signatures=int(_positive(document, "prefill_signatures", 2, 1)),
+        conditional_download_ratio=_positive(document, "conditional_download_ratio", 0.0),
+        operations=operations,
+        images=tuple(images),
+        seed=int(document.get("seed", 1)),
+        server_workers=int(_positive(server, "workers", 1, 1)),
+        server_env={key: str(value) for key, value in server.get("env", {}).items()},
+    )
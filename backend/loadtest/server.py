@@ -0,0 +1,164 @@
+"""
+Instance locale de l'API pour les tests de charge : uvicorn dans un sous-processus, base SQLite
+(fichier, mode WAL) à la place de PostgreSQL, médias et profils dans un répertoire temporaire.
+
+Les comptes de test sont créés directement en base (actifs, rôle end_user) avant le démarrage :
+l'inscription enverrait un email de confirmation. La connexion passe ensuite par l'API.
+"""
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import httpx
+
+from src.core.hermetic import HERMETIC_ENV
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_PASSWORD = "Loadtest@123"
+
+# Mode autonome (src.core.hermetic) sur une base fichier, surchargeable par [server.env]
+_SERVER_DEFAULTS = {
+    **HERMETIC_ENV,
+    "ENV": "loadtest",
+    "SECRET_KEY": "loadtest-secret-key",
+    # Les emails d'inscription sont journalisés : la mémoire d'un worker n'est pas consultable
+    "MAIL_BACKEND": "console",
+    "LOG_FORMAT": "text",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "240",
+}
+
+
+def user_email(index: int) -> str:
+    return f"loadtest-{index}@example.com"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """
+        with LocalServer(workers=2, users=8) as server:
+            ... server.base_url ...
+    """
+
+    def __init__(self, workers: int = 1, users: int = 4, env: Optional[dict] = None,
+                 startup_timeout: float = 60.0, keep_dir: bool = False):
+        self.workers = workers
+        self.users = users
+        self.startup_timeout = startup_timeout
+        self.keep_dir = keep_dir
+        self.root = tempfile.mkdtemp(prefix="stego-loadtest-")
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = {
+            **_SERVER_DEFAULTS,
+            # Attente du verrou d'écriture SQLite (5 s par défaut) : les transactions de signature sont longues
+            "DATABASE_URL": f"sqlite:///{os.path.join(self.root, 'loadtest.db')}?timeout=30",
+            "MEDIA_ROOT": os.path.join(self.root, "media"),
+            "TIERING_COLD_ROOT": os.path.join(self.root, "media-cold"),
+            "TIERING_CACHE_DIR": os.path.join(self.root, "media-cache"),
+            "PROFILING_DIR": os.path.join(self.root, "profiles"),
+            **(env or {}),
+        }
+        self._process: Optional[subprocess.Popen] = None
+        self._log = None
+
+    def prepare_database(self):
+        """Crée le schéma et les comptes de test dans un sous-processus (configuration du serveur)."""
+        subprocess.run(
+            [sys.executable, "-m", "loadtest.server", "prepare", str(self.users)],
+            cwd=BACKEND_DIR, env={**os.environ, **self.env}, check=True,
+        )
+
+    def start(self):
+        self.prepare_database()
+        self._log = open(os.path.join(self.root, "server.log"), "wb")
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--no-access-log"],
+            cwd=BACKEND_DIR, env={**os.environ, **self.env}, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Server exited during startup, see {self._log.name}")
+            try:
+                if httpx.get(f"{self.base_url}/openapi.json", timeout=1.0).status_code == 200:
+                    logger.info("local server ready on %s (%d worker(s), data in %s)", self.base_url, self.workers, self.root)
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"Server not ready after {self.startup_timeout}s")
+
+    def stop(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        if self._log is not None:
+            self._log.close()
+        if not self.keep_dir:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "LocalServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _prepare(users: int):
+    # Importé ici : la configuration de l'application est lue à l'import (variables du serveur)
+    from sqlalchemy import text
+
+    from src.db.migrations import run_migrations
+    from src.db.session import SessionLocal, engine
+    from src.schemas.role_schema import RoleEnum
+    from src.schemas.status_schema import StatusEnum
+    from src.seeds.base import seed_all
+    from src.seeds.user import seed_users
+
+    with engine.connect() as connection:
+        # Persistant dans le fichier : lectures concurrentes pendant les écritures
+        connection.execute(text("PRAGMA journal_mode=WAL"))
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        seed_all(db)
+        seed_users(db, [
+            {
+                "firstname": "Load",
+                "lastname": f"Test {index}",
+                "username": f"loadtest{index}",
+                "email": user_email(index),
+                "password": USER_PASSWORD,
+                "roles": [RoleEnum.END_USER],
+                "status_history": [StatusEnum.ACTIVE],
+            }
+            for index in range(users)
+        ])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["prepare"]:
+        _prepare(int(sys.argv[2]))
+    else:
+        sys.exit("usage: python -m loadtest.server prepare USERS")
@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+from src.cache.base import Cache, CacheBackend, CacheUnavailable
+from src.cache.memory import MemoryCacheBackend
+from src.core.config import settings
+
+
+def build_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(maxsize=settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_BACKEND == "redis":
+        from src.cache.redis import RedisCacheBackend
+        return RedisCacheBackend(url=settings.CACHE_URL, prefix=settings.CACHE_KEY_PREFIX,
+                                 socket_timeout=settings.CACHE_SOCKET_TIMEOUT_SECONDS)
+    raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> Cache:
+    return Cache(build_backend(), default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+                 lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS)
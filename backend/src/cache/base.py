@@ -0,0 +1,195 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from src.core import instrumentation
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CacheUnavailable(Exception):
+    """Backend injoignable : le cache se comporte alors comme vide, sans faire échouer la requête."""
+
+
+class CacheBackend(ABC):
+    """
+    Stockage des entrées du cache : valeurs binaires avec durée de vie, et index des étiquettes
+    (tag -> clés) pour l'invalidation groupée. Les clés reçues sont déjà préfixées par l'espace de noms.
+    """
+
+    name = ""
+    # Partagé entre processus : la signature unique (single-flight) prend aussi un verrou dans le backend
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float, tags: Sequence[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Écrit seulement si la clé est absente ; retourne True si l'écriture a eu lieu."""
+
+    @abstractmethod
+    def delete(self, keys: Sequence[str]) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Sequence[str]) -> None:
+        """Supprime toutes les entrées portant l'une des étiquettes."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class Cache:
+    """
+    Cache applicatif, partagé par les services via l'injection de dépendances (get_cache_service) :
+
+        principal = cache.get_or_set(f"user:{user_id}", load, ttl=30, tags=[f"user:{user_id}"])
+        cache.invalidate_tags(f"user:{user_id}")
+
+    Les valeurs sont sérialisées en JSON : identiques quel que soit le backend, lisibles par tous les
+    workers. get_or_set() ne lance qu'un seul chargement par clé manquante (single-flight) : entre threads
+    du processus par un verrou local, entre processus par un verrou posé dans un backend partagé.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str = "", default_ttl: float = 60.0,
+                 lock_timeout: float = 5.0):
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self._flights: dict[str, list] = {}
+        self._flights_lock = threading.Lock()
+
+    def namespaced(self, namespace: str) -> "Cache":
+        """Vue du même backend dont les clés et étiquettes sont préfixées par namespace."""
+        return Cache(self.backend, f"{self.namespace}{namespace}:", self.default_ttl, self.lock_timeout)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}{key}"
+
+    def _tags(self, tags: Iterable[str]) -> list[str]:
+        return [f"{self.namespace}{tag}" for tag in tags]
+
+    def _call(self, operation: str, func: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if instrumentation.enabled():
+                instrumentation.CACHE_SECONDS.observe(time.perf_counter() - started,
+                                                      backend=self.backend.name, operation=operation)
+
+    def _count(self, result: str):
+        if instrumentation.enabled():
+            instrumentation.CACHE_REQUESTS.inc(namespace=self.namespace.rstrip(":"), result=result)
+
+    def _lookup(self, key: str) -> Any:
+        try:
+            raw = self._call("get", self.backend.get, self._key(key))
+        except CacheUnavailable as e:
+            logger.warning("cache unavailable", extra={"operation": "get", "error": str(e)})
+            self._count("error")
+            return _MISSING
+        if raw is None:
+            self._count("miss")
+            return _MISSING
+        self._count("hit")
+        return json.loads(raw)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        data = json.dumps(value, separators=(",", ":")).encode()
+        try:
+            self._call("set", self.backend.set, self._key(key), data, ttl or self.default_ttl, self._tags(tags))
+        except CacheUnavailable as e:
+            logger.warning("cache unavailable", extra={"operation": "set", "error": str(e)})
+
+    def delete(self, *keys: str) -> None:
+        try:
+            self._call("delete", self.backend.delete, [self._key(key) for key in keys])
+        except CacheUnavailable as e:
+            logger.warning("cache unavailable", extra={"operation": "delete", "error": str(e)})
+
+    def invalidate_tags(self, *tags: str) -> None:
+        try:
+            self._call("invalidate", self.backend.invalidate_tags, self._tags(tags))
+        except CacheUnavailable as e:
+            logger.warning("cache unavailable", extra={"operation": "invalidate", "error": str(e)})
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None,
+                   tags: Iterable[str] = ()) -> Any:
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        with self._single_flight(key):
+            # Chargé par un autre thread pendant l'attente du verrou
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            with self._shared_lock(key) as value:
+                if value is not _MISSING:
+                    return value
+                value = loader()
+                self.set(key, value, ttl, tags)
+                return value
+
+    @contextmanager
+    def _single_flight(self, key: str) -> Iterator[None]:
+        with self._flights_lock:
+            flight = self._flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._flights_lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+    @contextmanager
+    def _shared_lock(self, key: str) -> Iterator[Any]:
+        """
+        Verrou de chargement entre processus. Produit la valeur si un autre processus l'a écrite
+        pendant l'attente ; à l'expiration de lock_timeout, le chargement a lieu malgré tout.
+        """
+        if not self.backend.shared:
+            yield _MISSING
+            return
+        lock_key = self._key(f"{key}:loading")
+        try:
+            acquired = self.backend.add(lock_key, b"1", self.lock_timeout)
+        except CacheUnavailable:
+            acquired = False
+        deadline = time.monotonic() + self.lock_timeout
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.02)
+            try:
+                raw = self.backend.get(self._key(key))
+            except CacheUnavailable:
+                break
+            if raw is not None:
+                self._count("coalesced")
+                yield json.loads(raw)
+                return
+        try:
+            yield _MISSING
+        finally:
+            if acquired:
+                self.delete(f"{key}:loading")
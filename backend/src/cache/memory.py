@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Sequence
+
+from src.cache.base import CacheBackend
+
+
+class _Entry(NamedTuple):
+    value: bytes
+    expires_at: float
+    tags: tuple
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Backend propre au processus : LRU borné avec durée de vie par entrée. Chaque worker uvicorn a
+    le sien ; CACHE_BACKEND=redis partage les entrées et les invalidations entre workers.
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 10_000, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return entry.value
+
+    def _store(self, key: str, value: bytes, ttl: float, tags: Sequence[str]) -> None:
+        self._remove(key)
+        self._data[key] = _Entry(value, self._clock() + ttl, tuple(tags))
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Sequence[str] = ()) -> None:
+        with self._lock:
+            self._store(key, value, ttl, tags)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                return False
+            self._store(key, value, ttl, ())
+            return True
+
+    def delete(self, keys: Sequence[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_tags(self, tags: Sequence[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,73 @@
+from typing import Optional, Sequence
+
+from src.cache.base import CacheBackend, CacheUnavailable
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend partagé par tous les workers, sur le protocole Redis (Redis, Valkey, KeyDB, fakeredis...).
+    redis-py n'est requis que si ce backend est utilisé.
+
+    Chaque étiquette est un ensemble Redis des clés qui la portent ; il vit au moins aussi longtemps
+    que la plus longue de ses entrées. Une entrée écrite entre la lecture de l'ensemble et sa
+    suppression par invalidate_tags() survit à l'invalidation : sa durée de vie borne l'écart.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "", client=None,
+                 socket_timeout: float = 0.5):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("redis is required for CACHE_BACKEND=redis") from e
+            if not url:
+                raise ValueError("CACHE_URL is required for CACHE_BACKEND=redis")
+            client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+        self.client = client
+        self.prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _run(self, func, *args, **kwargs):
+        from redis.exceptions import RedisError
+        try:
+            return func(*args, **kwargs)
+        except RedisError as e:
+            raise CacheUnavailable(str(e)) from e
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._run(self.client.get, self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Sequence[str] = ()) -> None:
+        ttl_ms = max(1, int(ttl * 1000))
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self.prefix + key, value, px=ttl_ms)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, key)
+            # NX à la création de l'ensemble, GT ensuite : la durée de vie ne fait que croître
+            pipe.pexpire(tag_key, ttl_ms, nx=True)
+            pipe.pexpire(tag_key, ttl_ms, gt=True)
+        self._run(pipe.execute)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(self._run(self.client.set, self.prefix + key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, keys: Sequence[str]) -> None:
+        if keys:
+            self._run(self.client.delete, *(self.prefix + key for key in keys))
+
+    def invalidate_tags(self, tags: Sequence[str]) -> None:
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            keys = self._run(self.client.smembers, tag_key)
+            self._run(self.client.delete, tag_key, *(self.prefix + key.decode() for key in keys))
+
+    def clear(self) -> None:
+        keys = self._run(lambda: list(self.client.scan_iter(match=f"{self.prefix}*")))
+        if keys:
+            self._run(self.client.delete, *keys)
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, Response, BackgroundTasks
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import RedirectResponse
-from src.schemas.auth_schema import LoginRequest, ResetPasswordRequest, TokenResponse, ForgotPasswordRequest
+from src.schemas.auth_schema import LoginRequest, Principal, ResetPasswordRequest, TokenResponse, ForgotPasswordRequest
 from src.schemas.user_schema import UserCreate, UserRead
 from src.services.auth_service import AuthService
 from src.services.google_auth_service import GoogleAuthService
-from src.dependencies.injection import get_auth_service, get_current_user, get_google_auth_service
+from src.services.user_service import UserService
+from src.dependencies.injection import get_auth_service, get_current_user, get_google_auth_service, get_user_service
 from src.utils.cookies import set_refresh_token_cookie
 from src.schemas.base_schema import BaseErrorResponse, BaseMessageResponse
 
@@ -21,7 +22,6 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 )
 def register_user(
     data: UserCreate,
-    background_tasks: BackgroundTasks, 
     auth_service: AuthService = Depends(get_auth_service)
 ):
     user = auth_service.register_user(
@@ -29,8 +29,7 @@ def register_user(
         lastname=data.lastname,
         username=data.username,
         email=data.email,
-        password=data.password,
-        background_tasks=background_tasks
+        password=data.password
     )
     return user
     
@@ -66,7 +65,7 @@ def login(
 async def login_with_google(
     google_auth_service: GoogleAuthService = Depends(get_google_auth_service)
 ):
-    auth_url = google_auth_service.get_google_auth_url()
+    auth_url = await google_auth_service.get_google_auth_url()
     return {"auth_url": auth_url}
 
 
@@ -85,7 +84,7 @@ async def google_callback(
     response: Response,
     google_auth_service: GoogleAuthService = Depends(get_google_auth_service)
 ):
-    access_token, refresh_token, _ = google_auth_service.authenticate_with_google(code)
+    access_token, refresh_token, _ = await google_auth_service.authenticate_with_google(code)
     set_refresh_token_cookie(response, refresh_token)
 
     return {"access_token": access_token}
@@ -130,8 +129,11 @@ def logout_user(response: Response):
         401: {"model": BaseErrorResponse, "description": "Not authenticated."}
     }
 )
-def get_me(current_user: UserRead = Depends(get_current_user)):
-    return current_user
+def get_me(
+    current_user: Principal = Depends(get_current_user),
+    user_service: UserService = Depends(get_user_service)
+):
+    return user_service.get_by_id(current_user.id, raise_exc=True)
 
 
 @router.post(
@@ -144,12 +146,11 @@ def get_me(current_user: UserRead = Depends(get_current_user)):
 )
 def forgot_password(
     request: ForgotPasswordRequest, 
-    background_tasks: BackgroundTasks, 
     auth_service: AuthService = Depends(get_auth_service),
     req: Request = None
 ):
     client_ip = req.client.host if req and req.client else None
-    auth_service.forgot_password(request.email, client_ip, background_tasks)
+    auth_service.forgot_password(request.email, client_ip)
     return {"msg": "If the email exists, a reset link has been sent."}
 
 
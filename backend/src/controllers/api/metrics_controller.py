@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.core import instrumentation
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    # async : l'export est lu depuis la boucle d'événements, sans occuper un thread du pool mesuré
+    if not instrumentation.enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(instrumentation.REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
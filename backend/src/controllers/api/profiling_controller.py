@@ -0,0 +1,49 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.core.profiling import ProfileStore
+from src.dependencies.injection import get_profile_store
+from src.dependencies.roles import require_roles
+from src.schemas.base_schema import BaseErrorResponse
+from src.schemas.profile_schema import ProfileSummary
+from src.schemas.role_schema import RoleEnum
+
+router = APIRouter(prefix="/admin/profiles", tags=["Admin"])
+
+
+@router.get(
+    "",
+    response_model=List[ProfileSummary],
+    responses={403: {"model": BaseErrorResponse, "description": "Not enough permissions."}},
+)
+def list_profiles(
+    store: ProfileStore = Depends(get_profile_store),
+    _: None = Depends(require_roles(RoleEnum.ADMIN)),
+):
+    """Liste les profils conservés, du plus récent au plus ancien."""
+    return store.list()
+
+
+@router.get(
+    "/{profile_id}",
+    response_class=PlainTextResponse,
+    responses={
+        403: {"model": BaseErrorResponse, "description": "Not enough permissions."},
+        404: {"model": BaseErrorResponse, "description": "Profile not found."},
+    },
+)
+def download_profile(
+    profile_id: str,
+    store: ProfileStore = Depends(get_profile_store),
+    _: None = Depends(require_roles(RoleEnum.ADMIN)),
+):
+    """Télécharge un profil au format « collapsed stacks » (flamegraph.pl, speedscope)."""
+    collapsed = store.get_collapsed(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profil introuvable.")
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'},
+    )
@@ -2,7 +2,7 @@ import os
 from fastapi import (
     APIRouter, UploadFile, File, Form, Depends, status, HTTPException, Request
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
@@ -11,7 +11,7 @@ from src.schemas.sign_verif_schema import SignatureVerificationResponse, Verific
 from src.schemas.base_schema import BaseErrorResponse
 from src.services.stego_service import StegoService
 from src.dependencies.injection import get_db, get_current_user, get_stego_service
-from src.models import User
+from src.schemas.auth_schema import Principal
 import base64
 
 router = APIRouter(
@@ -39,7 +39,7 @@ def upload_signature_image(
     encryption: str = Form("aes"),
     encryption_key: Optional[str] = Form(None),
     request: Request = None,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     stego_service: StegoService = Depends(get_stego_service),
 ):
     #  Vérification du type de fichier
@@ -72,7 +72,7 @@ def verify_image_signature(
     file: UploadFile = File(...),
     encryption_key: Optional[str] = Form(None),
     rsa_private_pem: Optional[str] = Form(None),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     stego_service: StegoService = Depends(get_stego_service),
 ):
     if not file.content_type.startswith("image/"):
@@ -96,7 +96,7 @@ def verify_image_signature(
     },
 )
 def get_user_signatures(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     stego_service: StegoService = Depends(get_stego_service),
 ):
     """Récupère toutes les signatures créées par l'utilisateur actuel."""
@@ -113,7 +113,7 @@ def get_user_signatures(
     },
 )
 def get_user_verifications(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     stego_service: StegoService = Depends(get_stego_service),
 ):
     """Récupère toutes les vérifications effectuées par l'utilisateur actuel."""
@@ -128,24 +128,32 @@ def get_user_verifications(
 )
 def download_signed_image(
     signature_uuid: str,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
     stego_service: StegoService = Depends(get_stego_service),
 ):
     """
     Télécharge l'image signée associée à un UUID.
+    L'ETag est l'empreinte du contenu : un client qui possède déjà l'image reçoit un 304.
     """
-    signed_path = stego_service.get_signed_image_path(signature_uuid)
-    if not signed_path or not os.path.exists(signed_path):
+    signed_image = stego_service.load_signed_image(
+        signature_uuid, if_none_match=request.headers.get("if-none-match")
+    )
+    if not signed_image:
         raise HTTPException(status_code=404, detail="Image signée introuvable.")
 
-    # Read the image file and encode to base64
-    
-    with open(signed_path, "rb") as image_file:
-        image_data = image_file.read()
-        base64_encoded = base64.b64encode(image_data).decode('utf-8')
+    headers = {"ETag": signed_image.etag, "Cache-Control": "private, max-age=31536000, immutable"} if signed_image.etag else {}
+    if signed_image.data is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Encode the image to base64
+    base64_encoded = base64.b64encode(signed_image.data).decode('utf-8')
     
-    return {
-        "filename": os.path.basename(signed_path),
-        "media_type": f"image/{signed_path.split('.')[-1]}",
-        "base64_data": base64_encoded
-    }
+    return JSONResponse(
+        content={
+            "filename": os.path.basename(signed_image.key),
+            "media_type": f"image/{signed_image.key.split('.')[-1]}",
+            "base64_data": base64_encoded
+        },
+        headers=headers,
+    )
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, FastAPI
 
-from src.controllers.api import auth_controller, user_controller, stego_controller
+from src.controllers.api import auth_controller, user_controller, stego_controller, metrics_controller, profiling_controller
 
 def include_routers(app: FastAPI) -> None:
     api_router = APIRouter(prefix="/api")
     api_router.include_router(auth_controller.router)
     api_router.include_router(user_controller.router)
     api_router.include_router(stego_controller.router)
+    api_router.include_router(profiling_controller.router)
     # Add other routers here as needed
     
     app.include_router(api_router)
+    # Exposé à la racine, où les collecteurs Prometheus l'attendent
+    app.include_router(metrics_controller.router)
@@ -0,0 +1,78 @@
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.core import tracing
+from src.db.locks import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Tâche de maintenance exécutée périodiquement dans un thread démon, avec sa propre session :
+    les workers qui servent les requêtes ne sont jamais bloqués.
+    Les sous-classes implémentent run(db).
+    """
+
+    name = "periodic-job"
+    # Passes fréquentes : un résultat vide (faux) n'est pas journalisé
+    quiet = False
+    # Tâche globale (GC, recompression, tiering) : une seule instance l'exécute à la fois,
+    # sous un verrou consultatif ; les tâches propres au processus restent non exclusives
+    exclusive = False
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: int):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self, db: Session) -> Any:
+        raise NotImplementedError
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def run_once(self) -> Any:
+        db = self.session_factory()
+        try:
+            with self._exclusive_lock(db) as acquired:
+                if not acquired:
+                    logger.debug("%s: already running in another instance, skipped", self.name)
+                    return None
+                with tracing.start_trace(f"job {self.name}"):
+                    result = self.run(db)
+            if result or not self.quiet:
+                logger.info("%s: %s", self.name, result)
+            return result
+        except Exception:
+            logger.exception("%s run failed", self.name)
+            return None
+        finally:
+            db.close()
+
+    def _exclusive_lock(self, db: Session):
+        if not self.exclusive:
+            return nullcontext(True)
+        return advisory_lock(db, f"periodic-job:{self.name}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
@@ -1,12 +1,23 @@
+from typing import Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
+# Environnements où le fournisseur OAuth « stub » (le code OAuth est l'email, sans vérification) est permis
+STUB_OAUTH_ENVS = ("test", "dev")
+
 class Settings(BaseSettings):
     ENV: str
     
     # Database
-    POSTGRES_USER: str
-    POSTGRES_PASSWORD: str
-    POSTGRES_DB: str
+    POSTGRES_USER: Optional[str] = None
+    POSTGRES_PASSWORD: Optional[str] = None
+    POSTGRES_DB: Optional[str] = None
+    # URL SQLAlchemy complète, prioritaire sur la connexion PostgreSQL du docker-compose
+    # (ex. "sqlite:///local.db" ou "sqlite://" en mémoire pour un mode sans aucun service)
+    DATABASE_URL: Optional[str] = None
+    # Schéma au démarrage : "alembic", "create_all" ou "none" ; par défaut create_all en SQLite,
+    # alembic en ENV=dev, rien sinon
+    DB_MIGRATIONS: Optional[str] = None
     
     # JWT
     SECRET_KEY: str
@@ -14,21 +25,30 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
-    # Google OAuth
-    GOOGLE_CLIENT_ID: str
-    GOOGLE_CLIENT_SECRET: str
-    GOOGLE_REDIRECT_URI: str
+    # Google OAuth ("google", ou "stub" : fournisseur local sans appel réseau, qui connecte n'importe
+    # quel compte à partir de son email ; réservé à ENV test/dev sur une base SQLite)
+    OAUTH_PROVIDER: str = "google"
+    GOOGLE_CLIENT_ID: Optional[str] = None
+    GOOGLE_CLIENT_SECRET: Optional[str] = None
+    GOOGLE_REDIRECT_URI: Optional[str] = None
     GOOGLE_OAUTH2_METADATA_URL: str = "https://accounts.google.com/.well-known/openid-configuration"
+    OAUTH_HTTP_TIMEOUT_SECONDS: float = 5.0
+    OAUTH_HTTP_RETRIES: int = 2
+    OAUTH_HTTP_MAX_CONNECTIONS: int = 20
+    OAUTH_METADATA_TTL_SECONDS: float = 3600.0
 
     # Admin credentials
     DEFAULT_ADMIN_EMAIL: str = "admin@example.com"
     DEFAULT_ADMIN_PASSWORD: str = "Admin@123"
 
-    # SMTP
-    SMTP_SERVER: str
-    SMTP_PORT: int
-    SMTP_USER: str
-    SMTP_PASSWORD: str
+    # SMTP ("smtp", "console" : journalisé, ou "memory" : conservé en mémoire pour les tests)
+    MAIL_BACKEND: str = "smtp"
+    SMTP_SERVER: Optional[str] = None
+    SMTP_PORT: int = 465
+    SMTP_USER: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_SECURITY: str = "ssl"  # "ssl", "starttls" ou "none"
+    SMTP_TIMEOUT_SECONDS: float = 10.0
     SMTP_FROM_NAME: str = "Steganographia"
 
     # Frontend 
@@ -36,18 +56,124 @@ class Settings(BaseSettings):
     FRONTEND_RESET_PASSWORD_URL: str
     FRONTEND_CONFIRM_EMAIL_URL: str
 
+    # File d'envoi des emails transactionnels (table email_outbox)
+    MAIL_OUTBOX_ENABLED: bool = True
+    MAIL_OUTBOX_INTERVAL_SECONDS: float = 2.0
+    MAIL_OUTBOX_BATCH_SIZE: int = 50
+    MAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    MAIL_OUTBOX_RETRY_BASE_SECONDS: float = 30.0
+    MAIL_OUTBOX_LEASE_SECONDS: int = 300
+    # Messages envoyés ou abandonnés supprimés après ce délai (purge au plus une fois par MAIL_OUTBOX_PURGE_INTERVAL_SECONDS)
+    MAIL_OUTBOX_RETENTION_SECONDS: int = 7 * 24 * 3600
+    MAIL_OUTBOX_PURGE_INTERVAL_SECONDS: int = 3600
+
     RESET_PASSWORD_EXPIRE_MINUTES: int = 30
     EMAIL_CONFIRMATION_EXPIRE_MINUTES: int = 60
     MAX_PASSWORD_RESET_REQUESTS: int = 1
 
+    # Media storage ("local" ou "s3")
+    STORAGE_BACKEND: str = "local"
+    MEDIA_ROOT: str = "media"
+    STORAGE_SHARD_DEPTH: int = 2
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+
+    # Niveaux chaud/froid : les médias non lus depuis TIERING_COLD_AFTER_DAYS passent au niveau froid compressé
+    TIERING_ENABLED: bool = False
+    TIERING_COLD_AFTER_DAYS: int = 30
+    TIERING_COLD_BACKEND: str = "local"
+    TIERING_COLD_ROOT: str = "media-cold"
+    TIERING_COLD_S3_BUCKET: Optional[str] = None
+    # Cache local des objets froids lus, partagé par les workers : le budget est global (répertoire compté)
+    TIERING_CACHE_DIR: str = "media-cache"
+    TIERING_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    TIERING_INTERVAL_SECONDS: int = 6 * 3600
+    MEDIA_ACCESS_FLUSH_SECONDS: int = 60
+
+    # Media GC
+    MEDIA_GC_ENABLED: bool = True
+    MEDIA_GC_INTERVAL_SECONDS: int = 3600
+    MEDIA_GC_GRACE_SECONDS: int = 24 * 3600
+    MEDIA_GC_BATCH_SIZE: int = 500
+    MEDIA_GC_IO_CONCURRENCY: int = 4
+
+    # Recompression sans perte des originaux
+    RECOMPRESS_ENABLED: bool = True
+    RECOMPRESS_INTERVAL_SECONDS: int = 6 * 3600
+    RECOMPRESS_BATCH_SIZE: int = 50
+    RECOMPRESS_CPU_BUDGET: float = 0.25  # part maximale de temps actif du worker
+    RECOMPRESS_IO_BYTES_PER_SECOND: int = 20 * 1024 * 1024
+    RECOMPRESS_MAX_ATTEMPTS: int = 3  # échecs (lecture, décodage, écriture) avant abandon de l'image
+
+    # Uploads
+    MAX_UPLOAD_BYTES: int = 50 * 1024 * 1024
+    MAX_UPLOAD_PIXELS: int = 50_000_000  # borné aussi par MEMORY_BUDGET_BYTES / coût par pixel du moteur
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # Budget mémoire des traitements d'images, estimé avant décodage (core.memory)
+    MEMORY_BUDGET_BYTES: int = 2 * 1024 * 1024 * 1024
+    MEMORY_BUDGET_WAIT_SECONDS: float = 10.0
+    # tracemalloc est global au processus : une mesure n'est prise que si aucun autre traitement ne tourne
+    MEMORY_TRACEMALLOC_SAMPLE_RATE: float = 0.0
+
+    # Cache applicatif (src.cache) : "memory" (par processus) ou "redis" (partagé entre workers, CACHE_URL)
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: Optional[str] = None
+    CACHE_KEY_PREFIX: str = "stego:"
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_DEFAULT_TTL_SECONDS: float = 60.0
+    # Attente maximale d'un chargement en cours dans un autre processus (single-flight)
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 5.0
+    CACHE_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    # Identité des requêtes authentifiées (statut, rôles) gardée en cache ; 0 désactive le cache.
+    # Avec CACHE_BACKEND=memory, l'invalidation (désactivation, retrait d'un rôle) n'atteint que le worker
+    # qui l'effectue : les autres gardent l'ancienne identité jusqu'à ce délai. Redis dès plusieurs workers.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 5.0
+
+    # Observabilité
+    LOG_FORMAT: str = "json"  # "json" ou "text"
+    LOG_ENGINE_SAMPLE_RATE: float = 1.0  # part des requêtes dont les diagnostics moteurs sont journalisés
+    METRICS_ENABLED: bool = True
+    # Requêtes SQL : seuil du journal des requêtes lentes, budget par requête HTTP (avertissement en DEBUG)
+    DB_SLOW_QUERY_MS: int = 200
+    DB_QUERY_BUDGET: int = 20
+    # Profilage à la demande : en-tête réservé aux administrateurs, ou échantillon aléatoire des requêtes
+    PROFILING_ENABLED: bool = True
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_SECONDS: float = 0.005
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_PROFILES: int = 50
+    # Traçage : part des traces racines échantillonnées (un traceparent reçu impose sa décision)
+    TRACING_ENABLED: bool = True
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_EXPORTER: str = "none"  # "none", "log" (logger src.core.tracing.spans) ou "jsonl" (fichier, sur demande)
+    TRACING_EXPORT_PATH: Optional[str] = None  # chemin absolu, obligatoire avec "jsonl"
+    TRACING_EXPORT_MAX_BYTES: int = 100 * 1024 * 1024
+    TRACING_EXPORT_BACKUP_COUNT: int = 3  # fichiers renommés .1 à .N au-delà de TRACING_EXPORT_MAX_BYTES
+
     DEBUG: bool = False
 
     class Config:
         env_file = ".env"
 
+    @model_validator(mode="after")
+    def _check_stub_oauth(self):
+        if self.OAUTH_PROVIDER == "stub" and not (self.DATABASE_URL or "").startswith("sqlite"):
+            raise ValueError("OAUTH_PROVIDER=stub is only allowed with a SQLite DATABASE_URL")
+        return self
+
 settings = Settings()
 
 def get_database_url():
+    if settings.DATABASE_URL:
+        return settings.DATABASE_URL
     if not all([settings.POSTGRES_USER, settings.POSTGRES_PASSWORD, settings.POSTGRES_DB]):
         raise ValueError("Database settings are not properly configured.")
     return f"postgresql+psycopg2://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@db:5432/{settings.POSTGRES_DB}"
+
+
+def is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
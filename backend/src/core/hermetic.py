@@ -0,0 +1,31 @@
+"""
+Mode autonome : l'application, les tests et les bancs d'essai tournent dans un seul processus,
+sans PostgreSQL, serveur SMTP ni Google (SQLite en mémoire, emails en mémoire, OAuth local).
+
+Ce module n'importe pas src.core.config : apply_hermetic_env() doit précéder la lecture de la
+configuration, c'est-à-dire tout import de l'application.
+"""
+import os
+
+HERMETIC_ENV = {
+    "ENV": "test",
+    "DATABASE_URL": "sqlite://",
+    "SECRET_KEY": "hermetic-secret-key",
+    "MAIL_BACKEND": "memory",
+    "OAUTH_PROVIDER": "stub",
+    "FRONTEND_URL": "http://localhost",
+    "FRONTEND_RESET_PASSWORD_URL": "http://localhost/reset-password/",
+    "FRONTEND_CONFIRM_EMAIL_URL": "http://localhost/confirm-email/",
+    # Tâches de fond coupées : seules les requêtes sont mesurées ou testées
+    "MEDIA_GC_ENABLED": "false",
+    "RECOMPRESS_ENABLED": "false",
+    "TIERING_ENABLED": "false",
+    "MAIL_OUTBOX_ENABLED": "false",
+    "TRACING_EXPORTER": "none",
+}
+
+
+def apply_hermetic_env(overrides: dict | None = None) -> None:
+    """Complète l'environnement du processus ; les variables déjà définies restent prioritaires."""
+    for name, value in {**HERMETIC_ENV, **(overrides or {})}.items():
+        os.environ.setdefault(name, value)
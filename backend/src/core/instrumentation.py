@@ -0,0 +1,345 @@
+"""
+Instrumentation interne : compteurs, jauges et histogrammes au format d'exposition Prometheus.
+
+    with stage("dct"):
+        ...
+
+stage() mesure une étape du pipeline et l'étiquette avec le moteur, la taille de l'image
+(tranche de mégapixels) et l'issue. Les étiquettes de contexte sont ouvertes par
+track_request() puis complétées par set_engine() et observe_image(w, h) ; elles sont
+portées par un contextvar et donc isolées entre requêtes concurrentes.
+Quand METRICS_ENABLED est faux, stage() et track_request() retournent un contexte vide partagé.
+Dans une requête profilée (core.profiling) ou tracée (core.tracing), chaque étape ouvre aussi une
+région nommée du profil et un span.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, Sequence
+
+from src.core import profiling, tracing
+from src.core.config import settings
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MEGAPIXEL_BUCKETS = ((1, "lt1"), (4, "1-4"), (12, "4-12"), (24, "12-24"))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # clé -> [compte par tranche (non cumulé) ..., +Inf, somme]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-1]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Fonction appelée juste avant chaque export (jauges calculées à la demande)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "stego_stage_seconds", "Duration of a steganography pipeline stage.",
+    ("stage", "engine", "megapixels", "outcome"),
+)
+STEGO_REQUESTS = REGISTRY.counter(
+    "stego_requests_total", "Sign and verify operations.", ("operation", "engine", "outcome"),
+)
+STEGO_IN_FLIGHT = REGISTRY.gauge(
+    "stego_requests_in_flight", "Sign and verify operations in progress.", ("operation",),
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"),
+)
+DB_QUERY_SECONDS = REGISTRY.histogram("db_query_seconds", "SQL statement duration.", ("operation",))
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+MEMORY_BUCKETS = tuple(2 ** power for power in range(20, 35))  # 1 Mio -> 16 Gio
+MEMORY_RSS_DELTA = REGISTRY.histogram(
+    "stego_memory_rss_delta_bytes", "RSS growth during an image workload.", ("engine", "megapixels"), MEMORY_BUCKETS,
+)
+MEMORY_PEAK = REGISTRY.histogram(
+    "stego_memory_peak_bytes", "Sampled tracemalloc peak of an image workload.", ("engine", "megapixels"), MEMORY_BUCKETS,
+)
+MEMORY_RESERVED = REGISTRY.gauge("stego_memory_reserved_bytes", "Memory budget currently reserved by image workloads.")
+MEMORY_REJECTIONS = REGISTRY.counter(
+    "stego_memory_rejections_total", "Image workloads refused by the memory budget.", ("engine", "reason"),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by result (hit, miss, coalesced, error).", ("namespace", "result"),
+)
+CACHE_SECONDS = REGISTRY.histogram("cache_operation_seconds", "Cache backend operation latency.", ("backend", "operation"))
+MAIL_DELIVERIES = REGISTRY.counter("mail_deliveries_total", "Outbox email delivery attempts.", ("outcome",))
+HTTP_SECONDS = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency.", ("method",))
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests in progress.")
+THREADPOOL_CAPACITY = REGISTRY.gauge("threadpool_capacity", "Worker threads available to sync endpoints.")
+THREADPOOL_IN_USE = REGISTRY.gauge("threadpool_in_use", "Worker threads currently busy.")
+
+
+def _collect_threadpool():
+    # Pool de threads d'anyio qui exécute les endpoints synchrones de FastAPI
+    from anyio import to_thread
+    try:
+        limiter = to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        # Hors boucle d'événements (ex: export appelé depuis un thread)
+        return
+    THREADPOOL_CAPACITY.set(limiter.total_tokens)
+    THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+
+
+REGISTRY.add_collector(_collect_threadpool)
+
+
+# ---------- étiquettes de contexte ----------
+_context_labels: ContextVar[Optional[dict]] = ContextVar("instrumentation_labels", default=None)
+_NOOP = nullcontext()
+
+
+def enabled() -> bool:
+    return settings.METRICS_ENABLED
+
+
+def megapixel_bucket(width: int, height: int) -> str:
+    megapixels = width * height / 1_000_000
+    for bound, label in MEGAPIXEL_BUCKETS:
+        if megapixels < bound:
+            return label
+    return f"ge{MEGAPIXEL_BUCKETS[-1][0]}"
+
+
+@contextmanager
+def _labels(**values):
+    token = _context_labels.set({**(_context_labels.get() or {}), **values})
+    try:
+        yield
+    finally:
+        _context_labels.reset(token)
+
+
+def observe_image(width: int, height: int):
+    """Renseigne la tranche de mégapixels de l'image en cours de traitement."""
+    current = _context_labels.get()
+    if current is not None:
+        current["megapixels"] = megapixel_bucket(width, height)
+    if tracing.is_recording():
+        tracing.current_span().set_attribute("image.pixels", width * height)
+
+
+@contextmanager
+def _stage(name: str, extra: dict):
+    outcome = "ok"
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        context = _context_labels.get() or {}
+        STAGE_SECONDS.observe(
+            time.perf_counter() - started,
+            stage=name,
+            engine=extra.get("engine", context.get("engine", "none")),
+            megapixels=context.get("megapixels", "unknown"),
+            outcome=outcome,
+        )
+
+
+def _observers(name: str, span_name: str) -> list:
+    """Région de profil et span ouverts avec l'étape, quand la requête est profilée ou tracée."""
+    observers = []
+    if profiling.current_session() is not None:
+        observers.append(profiling.region(name))
+    if tracing.is_recording():
+        observers.append(tracing.span(span_name))
+    return observers
+
+
+@contextmanager
+def _observed(timer, observers: list):
+    with ExitStack() as stack:
+        for observer in observers:
+            stack.enter_context(observer)
+        yield stack.enter_context(timer)
+
+
+def stage(name: str, **extra):
+    """
+    Mesure une étape du pipeline (no-op si les métriques sont désactivées) ; dans une requête
+    profilée ou tracée, l'étape est aussi une région du profil et un span.
+    """
+    timer = _stage(name, extra) if enabled() else _NOOP
+    observers = _observers(name, name)
+    return _observed(timer, observers) if observers else timer
+
+
+class _RequestOutcome:
+    __slots__ = ("outcome",)
+
+    def __init__(self):
+        self.outcome = "ok"
+
+
+@contextmanager
+def _track_request(operation: str):
+    result = _RequestOutcome()
+    STEGO_IN_FLIGHT.inc(operation=operation)
+    try:
+        with _labels(megapixels="unknown"):
+            try:
+                yield result
+            except BaseException:
+                result.outcome = "error"
+                raise
+            finally:
+                engine = (_context_labels.get() or {}).get("engine", "none")
+                STEGO_REQUESTS.inc(operation=operation, engine=engine, outcome=result.outcome)
+    finally:
+        STEGO_IN_FLIGHT.dec(operation=operation)
+
+
+def track_request(operation: str):
+    """
+    Compte une opération sign/verify et son issue ; le bloc reçoit un objet dont
+    .outcome peut être modifié (ex: 'invalid').
+    """
+    tracker = _track_request(operation) if enabled() else nullcontext(_RequestOutcome())
+    observers = _observers(operation, f"stego.{operation}")
+    return _observed(tracker, observers) if observers else tracker
+
+
+def set_engine(engine: str):
+    """Renseigne le moteur (lsb, dct) de l'opération en cours."""
+    current = _context_labels.get()
+    if current is not None:
+        current["engine"] = engine
+    if tracing.is_recording():
+        tracing.current_span().set_attribute("stego.engine", engine)
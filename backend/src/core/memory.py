@@ -0,0 +1,152 @@
+"""
+Budget mémoire des traitements d'images et mesure de leur consommation.
+
+La mémoire d'un traitement est estimée avant tout décodage à partir du nombre de pixels annoncé par
+l'en-tête de l'image et du coût par pixel du moteur (copies pleine résolution qu'il conserve).
+Les traitements réservent cette estimation dans un budget global : au-delà, ils attendent qu'une
+réservation se libère (MEMORY_BUDGET_WAIT_SECONDS) puis sont refusés ; une image dont l'estimation
+dépasse le budget entier est refusée immédiatement ; max_pixels() applique la même borne dès
+l'en-tête de l'upload, avant que le fichier ne soit lu et stocké.
+
+Chaque traitement mesure la variation de RSS ; une fraction d'entre eux (MEMORY_TRACEMALLOC_SAMPLE_RATE)
+mesure aussi le pic d'allocations Python/numpy avec tracemalloc. tracemalloc étant global au processus,
+la mesure n'est prise que lorsque le traitement est le seul en cours : elle ne ralentit aucune autre requête.
+"""
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from src.core import instrumentation
+from src.core.config import settings
+from src.exceptions.upload_exception import MemoryBudgetBusy, MemoryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+# Octets par pixel décodé : pic tracemalloc mesuré sur une image de 1 Mpx (DCT ~38, LSB ~80), arrondi
+# pour les tampons natifs d'OpenCV et de Pillow que tracemalloc ne voit pas.
+# DCT : BGR uint8, YCrCb float32, blocs, DCT et IDCT float32 ; LSB : liste de tuples Python par pixel
+ENGINE_BYTES_PER_PIXEL = {"dct": 48, "lsb": 96}
+DEFAULT_BYTES_PER_PIXEL = 96
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """RSS courant du processus (Linux), ou None si indisponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def estimate_bytes(engine: str, pixels: int) -> int:
+    return pixels * ENGINE_BYTES_PER_PIXEL.get(engine, DEFAULT_BYTES_PER_PIXEL)
+
+
+def max_pixels(engine: Optional[str] = None) -> int:
+    """
+    Nombre de pixels accepté à l'upload : MAX_UPLOAD_PIXELS, borné par ce que le budget mémoire entier
+    peut traiter avec ce moteur (le plus coûteux si le moteur n'est pas connu).
+    """
+    bytes_per_pixel = ENGINE_BYTES_PER_PIXEL.get(engine, DEFAULT_BYTES_PER_PIXEL)
+    return min(settings.MAX_UPLOAD_PIXELS, settings.MEMORY_BUDGET_BYTES // bytes_per_pixel)
+
+
+class MemoryBudget:
+    """Sémaphore en octets : réservations bornées par total_bytes, attente FIFO approximative."""
+
+    def __init__(self, total_bytes: int):
+        self.total_bytes = total_bytes
+        self.reserved = 0
+        self.active = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, amount: int, timeout: float):
+        if amount > self.total_bytes:
+            raise MemoryBudgetExceeded("Image too large to be processed within the memory budget.")
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self.reserved + amount > self.total_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise MemoryBudgetBusy("Server busy processing other images, retry later.")
+                self._condition.wait(remaining)
+            self.reserved += amount
+            self.active += 1
+            instrumentation.MEMORY_RESERVED.set(self.reserved)
+
+    def release(self, amount: int):
+        with self._condition:
+            self.reserved -= amount
+            self.active -= 1
+            instrumentation.MEMORY_RESERVED.set(self.reserved)
+            self._condition.notify_all()
+
+
+_tracemalloc_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_memory_budget() -> MemoryBudget:
+    return MemoryBudget(settings.MEMORY_BUDGET_BYTES)
+
+
+@contextmanager
+def _tracemalloc_peak(result: dict) -> Iterator[None]:
+    # Échantillonné, seulement pour un traitement seul en cours, et jamais deux mesures à la fois
+    if random.random() >= settings.MEMORY_TRACEMALLOC_SAMPLE_RATE or get_memory_budget().active > 1 \
+            or tracemalloc.is_tracing() or not _tracemalloc_lock.acquire(blocking=False):
+        yield
+        return
+    try:
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        _tracemalloc_lock.release()
+
+
+@contextmanager
+def image_workload(engine: str, width: int, height: int) -> Iterator[None]:
+    """
+    Réserve l'estimation mémoire d'un traitement avant décodage (attente ou refus), puis mesure
+    sa consommation réelle (métriques et journal, par moteur et taille d'image).
+    """
+    pixels = width * height
+    estimated = estimate_bytes(engine, pixels)
+    try:
+        get_memory_budget().acquire(estimated, settings.MEMORY_BUDGET_WAIT_SECONDS)
+    except (MemoryBudgetBusy, MemoryBudgetExceeded) as error:
+        instrumentation.MEMORY_REJECTIONS.inc(engine=engine, reason=type(error).__name__)
+        logger.warning("image workload refused", extra={
+            "engine": engine, "pixels": pixels, "estimated_bytes": estimated, "reason": type(error).__name__,
+        })
+        raise
+
+    measured: dict = {}
+    rss_before = current_rss()
+    try:
+        with _tracemalloc_peak(measured):
+            yield
+    finally:
+        get_memory_budget().release(estimated)
+        rss_after = current_rss()
+        megapixels = instrumentation.megapixel_bucket(width, height)
+        if rss_before is not None and rss_after is not None:
+            measured["rss_delta_bytes"] = rss_after - rss_before
+            instrumentation.MEMORY_RSS_DELTA.observe(max(measured["rss_delta_bytes"], 0), engine=engine, megapixels=megapixels)
+        if "peak_bytes" in measured:
+            instrumentation.MEMORY_PEAK.observe(measured["peak_bytes"], engine=engine, megapixels=megapixels)
+        logger.debug("image workload memory", extra={
+            "engine": engine, "pixels": pixels, "estimated_bytes": estimated, **measured,
+        })
@@ -1,7 +1,15 @@
+import random
+import time
+from typing import Callable, Optional
+
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 
+from src.core import instrumentation, profiling, tracing
 from src.core.config import settings
+from src.core.request_context import get_request_id, new_request_id, reset_request_id, set_request_id
+from src.db.query_stats import track_queries
 
 def add_cors_middleware(app: FastAPI):
     app.add_middleware(
@@ -11,3 +19,179 @@ def add_cors_middleware(app: FastAPI):
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI pur (sans BaseHTTPMiddleware) : compte les requêtes par méthode, modèle de route
+    et statut. Le modèle de route (/api/stego/{signature_uuid}) borne la cardinalité des étiquettes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not instrumentation.enabled():
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        instrumentation.HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            instrumentation.HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            instrumentation.HTTP_REQUESTS.inc(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            )
+            instrumentation.HTTP_SECONDS.observe(time.perf_counter() - started, method=scope["method"])
+
+
+def add_metrics_middleware(app: FastAPI):
+    app.add_middleware(MetricsMiddleware)
+
+
+class ProfilingMiddleware:
+    """
+    Profile une requête à la demande : en-tête PROFILING_HEADER envoyé par un administrateur
+    (l'identifiant du profil est renvoyé dans X-Profile-Id), ou tirage aléatoire selon
+    PROFILING_SAMPLE_RATE. Les profils vides (aucune région traversée) ne sont pas conservés.
+    """
+
+    def __init__(self, app, is_admin_token: Callable[[str], bool]):
+        self.app = app
+        self.is_admin_token = is_admin_token
+
+    async def _requested_by_admin(self, scope) -> bool:
+        header = settings.PROFILING_HEADER.lower().encode()
+        headers = dict(scope["headers"])
+        if header not in headers:
+            return False
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        return await run_in_threadpool(self.is_admin_token, token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        requested = await self._requested_by_admin(scope)
+        if not requested and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        session = profiling.ProfileSession(
+            settings.PROFILING_INTERVAL_SECONDS,
+            metadata={"method": scope["method"], "path": scope["path"], "trigger": "header" if requested else "sampling"},
+        )
+        status: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if requested:
+                    message["headers"] = [*message.get("headers", []), (b"x-profile-id", session.id.encode())]
+            await send(message)
+
+        session.start()
+        try:
+            with profiling.activate(session):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            session.stop()
+            session.metadata["status"] = status
+            # Un profil demandé explicitement est conservé même vide, pour que X-Profile-Id reste valide
+            if requested or session.samples:
+                await run_in_threadpool(profiling.get_profile_store().save, session)
+
+
+def add_profiling_middleware(app: FastAPI, is_admin_token: Callable[[str], bool]):
+    app.add_middleware(ProfilingMiddleware, is_admin_token=is_admin_token)
+
+
+class TracingMiddleware:
+    """
+    Ouvre le span racine de chaque requête HTTP, en continuant le traceparent W3C reçu.
+    Le traceparent du span est renvoyé au client pour qu'il puisse retrouver la trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        attributes = {"http.method": scope["method"]}
+        if get_request_id():
+            attributes["http.request_id"] = get_request_id()
+        with tracing.start_trace(f"HTTP {scope['method']}", traceparent, **attributes) as root:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [*message.get("headers", []), (b"traceparent", root.traceparent.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                root.name = f"HTTP {scope['method']} {getattr(route, 'path', 'unmatched')}"
+
+
+def add_tracing_middleware(app: FastAPI):
+    app.add_middleware(TracingMiddleware)
+
+
+class RequestIdMiddleware:
+    """
+    Attribue un identifiant à chaque requête (X-Request-ID reçu, ou généré) : il est porté par un
+    contextvar pour les journaux, ajouté au span racine et renvoyé au client.
+    Ouvre aussi le comptage des requêtes SQL de la requête (db.query_stats).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        request_id = new_request_id(incoming)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        token = set_request_id(request_id)
+        try:
+            with track_queries(scope["path"]):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_request_id(token)
+
+
+def add_request_id_middleware(app: FastAPI):
+    # Ajouté en dernier : le plus externe, l'identifiant est visible de tous les autres middlewares
+    app.add_middleware(RequestIdMiddleware)
@@ -0,0 +1,220 @@
+"""
+Profilage à la demande des requêtes de production, par échantillonnage.
+
+Une ProfileSession est activée (contextvar) pour la requête ciblée ; le contexte suit la requête
+jusque dans le pool de threads. Seuls les threads situés dans une région nommée de la session sont
+échantillonnés (sys._current_frames, sans trace des appels) : les piles collectées sont préfixées
+par les régions en cours, qui correspondent aux étapes du pipeline (voir instrumentation.stage).
+Les profils sont stockés en « collapsed stacks » (flamegraph.pl, speedscope) dans un tampon
+circulaire borné sur disque.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from src.core.config import settings
+
+MAX_STACK_DEPTH = 128
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_active_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+_NOOP = nullcontext()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+
+
+def _collapse(regions: tuple, frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return ";".join([f"[{name}]" for name in regions] + names)
+
+
+def render_collapsed(stacks: dict) -> str:
+    """Format « collapsed stacks » : une pile par ligne, suivie de son nombre d'échantillons."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda item: -item[1]))
+
+
+class ProfileSession:
+    """Échantillonneur des threads d'une requête, actif entre start() et stop()."""
+
+    def __init__(self, interval_seconds: float, metadata: Optional[dict] = None):
+        self.id = uuid.uuid4().hex
+        self.interval_seconds = interval_seconds
+        self.metadata = dict(metadata or {})
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration_seconds = 0.0
+        # thread -> pile des régions ouvertes dans ce thread
+        self._regions: dict[int, list[str]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- régions ----------
+    def enter(self, name: str):
+        with self._lock:
+            self._regions.setdefault(threading.get_ident(), []).append(name)
+
+    def exit(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            regions = self._regions.get(thread_id)
+            if regions:
+                regions.pop()
+                if not regions:
+                    del self._regions[thread_id]
+
+    # ---------- échantillonnage ----------
+    def sample(self):
+        with self._lock:
+            threads = {thread_id: tuple(regions) for thread_id, regions in self._regions.items()}
+        if not threads:
+            return
+        frames = sys._current_frames()
+        for thread_id, regions in threads.items():
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self.stacks[_collapse(regions, frame)] += 1
+                self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.sample()
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.id[:8]}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.started_at is not None:
+            self.duration_seconds = time.time() - self.started_at
+
+
+@contextmanager
+def activate(session: ProfileSession) -> Iterator[ProfileSession]:
+    token = _active_session.set(session)
+    try:
+        yield session
+    finally:
+        _active_session.reset(token)
+
+
+def current_session() -> Optional[ProfileSession]:
+    return _active_session.get()
+
+
+@contextmanager
+def _region(session: ProfileSession, name: str):
+    session.enter(name)
+    try:
+        yield
+    finally:
+        session.exit()
+
+
+def region(name: str):
+    """Région nommée du profil de la requête en cours (no-op si la requête n'est pas profilée)."""
+    session = _active_session.get()
+    return _region(session, name) if session is not None else _NOOP
+
+
+class ProfileStore:
+    """
+    Tampon circulaire de profils sur disque : un fichier JSON par profil, les plus anciens
+    sont supprimés au-delà de max_profiles.
+    """
+
+    def __init__(self, root: str, max_profiles: int):
+        self.root = os.path.abspath(root)
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _files(self) -> list[str]:
+        # Noms "<horodatage>-<id>.json" : l'ordre lexicographique est l'ordre chronologique
+        return sorted(name for name in os.listdir(self.root) if name.endswith(".json"))
+
+    def _path_for(self, profile_id: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        for name in self._files():
+            if name.endswith(f"-{profile_id}.json"):
+                return os.path.join(self.root, name)
+        return None
+
+    def save(self, session: ProfileSession) -> str:
+        document = {
+            **session.metadata,
+            "id": session.id,
+            "started_at": session.started_at,
+            "duration_seconds": round(session.duration_seconds, 6),
+            "interval_seconds": session.interval_seconds,
+            "samples": session.samples,
+            "stacks": dict(session.stacks),
+        }
+        name = f"{int((session.started_at or time.time()) * 1000):015d}-{session.id}.json"
+        temp_path = os.path.join(self.root, f".tmp_{session.id}")
+        with open(temp_path, "w") as f:
+            json.dump(document, f)
+        with self._lock:
+            os.replace(temp_path, os.path.join(self.root, name))
+            for stale in self._files()[:-self.max_profiles]:
+                try:
+                    os.remove(os.path.join(self.root, stale))
+                except FileNotFoundError:
+                    pass
+        return session.id
+
+    def list(self) -> list[dict]:
+        """Métadonnées des profils, du plus récent au plus ancien."""
+        summaries = []
+        for name in reversed(self._files()):
+            try:
+                with open(os.path.join(self.root, name)) as f:
+                    document = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+            document.pop("stacks", None)
+            summaries.append(document)
+        return summaries
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        path = self._path_for(profile_id)
+        if path is None:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def get_collapsed(self, profile_id: str) -> Optional[str]:
+        document = self.get(profile_id)
+        if document is None:
+            return None
+        return render_collapsed(document["stacks"])
+
+
+@lru_cache(maxsize=1)
+def get_profile_store() -> ProfileStore:
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
@@ -0,0 +1,26 @@
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+# Identifiant fourni par le client (X-Request-ID) s'il est sûr, sinon généré
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    return incoming if incoming and _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+
+def set_request_id(request_id: Optional[str]):
+    """Retourne le jeton à passer à reset_request_id()."""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
@@ -0,0 +1,299 @@
+"""
+Traçage des requêtes par spans (modèle OpenTelemetry : trace_id, span_id, parent, attributs, statut).
+
+    with start_trace("HTTP GET /api/stego/verify", traceparent=header):
+        with span("pbkdf2"):
+            ...
+
+La décision d'échantillonnage est prise à la racine (TRACING_SAMPLE_RATE, ou drapeau « sampled »
+du traceparent W3C reçu) et héritée par tous les spans enfants. Le span courant est porté par un
+contextvar : il suit la requête dans le pool de threads et dans les BackgroundTasks ; inject() et
+extract() le transmettent à un autre processus. Hors trace échantillonnée, span() ne coûte qu'une
+lecture de contextvar.
+
+Les spans terminés sont exportés selon TRACING_EXPORTER : ignorés (« none », par défaut), journalisés
+(« log ») ou écrits par lots, par un thread dédié, dans un fichier JSON Lines (« jsonl ») ; les champs
+suivent OTLP/JSON (traceId, spanId, parentSpanId, startTimeUnixNano...).
+"""
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, copy_context
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_NOOP = nullcontext()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "sampled", "name", "attributes",
+                 "start_ns", "end_ns", "status", "status_message")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], sampled: bool, name: str = "",
+                 attributes: Optional[dict] = None, span_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.span_id = span_id or f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.name = name
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = type(error).__name__
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            get_exporter().export(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def is_recording() -> bool:
+    """Vrai dans une trace échantillonnée : les spans enfants seront exportés."""
+    parent = _current_span.get()
+    return parent is not None and parent.sampled
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+@contextmanager
+def _activate(current: Span) -> Iterator[Span]:
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.record_error(error)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes):
+    """
+    Ouvre le span racine d'une requête ou d'un traitement de fond, en continuant la trace
+    reçue dans traceparent le cas échéant. No-op si le traçage est désactivé.
+    """
+    if not settings.TRACING_ENABLED:
+        return _NOOP
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        sampled = random.random() < settings.TRACING_SAMPLE_RATE
+    return _activate(Span(trace_id, parent_id, sampled, name, attributes))
+
+
+def span(name: str, **attributes):
+    """Span enfant du span courant ; no-op hors trace échantillonnée."""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return _NOOP
+    return _activate(Span(parent.trace_id, parent.span_id, True, name, attributes))
+
+
+def begin_span(name: str, **attributes) -> Optional[Span]:
+    """
+    Variante sans contexte pour les points d'accroche en deux temps (événements SQLAlchemy) :
+    le span n'est pas rendu courant, l'appelant le termine avec end().
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return None
+    return Span(parent.trace_id, parent.span_id, True, name, attributes)
+
+
+def traced(name: Optional[str] = None):
+    """Décorateur : exécute la fonction dans un span enfant."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Rattache une tâche différée (BackgroundTasks, executor) à la trace courante :
+    elle s'exécutera dans un span enfant du span actif au moment de l'appel à bind().
+    """
+    context = copy_context()
+    span_name = name or getattr(func, "__qualname__", "task")
+
+    def run(*args, **kwargs):
+        with span(span_name):
+            return func(*args, **kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(run, *args, **kwargs)
+    return wrapper
+
+
+def inject(carrier: Optional[dict] = None) -> dict:
+    """Ajoute le traceparent du span courant à un dictionnaire transmis à un autre processus."""
+    carrier = {} if carrier is None else carrier
+    current = _current_span.get()
+    if current is not None:
+        carrier["traceparent"] = current.traceparent
+    return carrier
+
+
+def extract(carrier: dict, name: str, **attributes):
+    """Côté worker : continue la trace transmise par inject()."""
+    return start_trace(name, traceparent=carrier.get("traceparent"), **attributes)
+
+
+# ---------- export ----------
+class JsonlSpanExporter:
+    """
+    Écrit les spans par lots dans un fichier JSON Lines depuis un thread dédié. La file est bornée :
+    en cas de saturation les spans sont abandonnés plutôt que de ralentir les requêtes.
+    Au-delà de max_bytes, le fichier est renommé en .1 (les précédents décalés jusqu'à .backup_count).
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int = 3, max_queue: int = 10_000,
+                 flush_interval: float = 1.0):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.backup_count = max(backup_count, 1)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def export(self, finished: Span):
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait().to_otlp())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        with self._lock:
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a") as f:
+                    f.write("".join(json.dumps(item) + "\n" for item in batch))
+            except OSError:
+                logger.exception("tracing: failed to write %d spans", len(batch))
+
+
+    def _rotate(self):
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+class LogSpanExporter:
+    """Journalise chaque span (OTLP/JSON) : la destination et la rotation sont celles des logs."""
+
+    def __init__(self):
+        self._logger = logging.getLogger(f"{__name__}.spans")
+
+    def export(self, finished: Span):
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info("%s", json.dumps(finished.to_otlp()))
+
+    def flush(self):
+        pass
+
+
+class NullSpanExporter:
+    def export(self, finished: Span):
+        pass
+
+    def flush(self):
+        pass
+
+
+@lru_cache(maxsize=1)
+def get_exporter():
+    if settings.TRACING_EXPORTER == "jsonl":
+        path = settings.TRACING_EXPORT_PATH
+        if not path or not os.path.isabs(path):
+            raise ValueError("TRACING_EXPORTER=jsonl requires an absolute TRACING_EXPORT_PATH")
+        return JsonlSpanExporter(path, settings.TRACING_EXPORT_MAX_BYTES, settings.TRACING_EXPORT_BACKUP_COUNT)
+    if settings.TRACING_EXPORTER == "log":
+        return LogSpanExporter()
+    if settings.TRACING_EXPORTER == "none":
+        return NullSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
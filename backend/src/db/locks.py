@@ -0,0 +1,28 @@
+import zlib
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+@contextmanager
+def advisory_lock(db: Session, name: str) -> Iterator[bool]:
+    """
+    Verrou consultatif PostgreSQL (pg_try_advisory_lock) tenu par une connexion dédiée le temps du bloc :
+    une seule instance (worker uvicorn, réplique) l'obtient, les autres reçoivent False sans attendre.
+    Les commits de la session ne le relâchent pas. Sans PostgreSQL (SQLite, un seul processus) : toujours True.
+    """
+    engine = db.get_bind()
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    key = zlib.crc32(name.encode("utf-8"))
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
@@ -0,0 +1,52 @@
+"""
+Mise à jour du schéma au démarrage de l'application (lifespan), et non plus à l'import de src.main.
+
+alembic s'exécute dans le processus, sans sous-processus ; create_all sert le mode SQLite autonome
+(fichier ou mémoire), où les migrations écrites pour PostgreSQL ne s'appliquent pas.
+"""
+import logging
+import os
+
+from sqlalchemy.engine import Engine
+
+from src.core.config import is_sqlite_url, settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATION_MODES = ("alembic", "create_all", "none")
+
+
+def migration_mode(url: str) -> str:
+    mode = settings.DB_MIGRATIONS
+    if mode is None:
+        if is_sqlite_url(url):
+            mode = "create_all"
+        else:
+            mode = "alembic" if settings.ENV == "dev" else "none"
+    if mode not in MIGRATION_MODES:
+        raise ValueError(f"Unknown migration mode: {mode}")
+    return mode
+
+
+def run_migrations(engine: Engine) -> str:
+    mode = migration_mode(engine.url.render_as_string(hide_password=False))
+    if mode == "create_all":
+        from src.db.base import Base
+        import src.models  # noqa: F401  (enregistre les tables)
+
+        Base.metadata.create_all(engine)
+    elif mode == "alembic":
+        from alembic import command
+        from alembic.config import Config
+
+        config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+        # La configuration des logs de l'application est conservée (voir alembic/env.py)
+        config.attributes["configure_logger"] = False
+        try:
+            command.upgrade(config, "head")
+        except Exception:
+            # Comme auparavant, un échec de migration n'empêche pas le démarrage
+            logger.exception("database migration failed")
+    logger.info("database schema ready", extra={"migrations": mode, "dialect": engine.dialect.name})
+    return mode
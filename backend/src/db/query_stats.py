@@ -0,0 +1,136 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core import instrumentation
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|\?")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_POSTCOMPILE = re.compile(r"\(?\s*__\[POSTCOMPILE_\w+\]\s*\)?")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Forme normalisée d'une requête : littéraux et paramètres remplacés par ?, listes IN repliées."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _POSTCOMPILE.sub("(...)", normalized)
+    normalized = _LITERALS.sub("?", normalized)
+    return _VALUE_LISTS.sub("(...)", normalized)
+
+
+def _value_shape(value) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameters_shape(parameters, executemany: bool = False):
+    """Types (et longueurs) des paramètres, sans leurs valeurs : rien de sensible n'est journalisé."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": parameters_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+class QueryStats:
+    """Requêtes SQL exécutées pendant une requête HTTP (ou un traitement de fond)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.fingerprints: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement_fingerprint: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.fingerprints[statement_fingerprint] += 1
+
+    def repeated(self, minimum: int = 2) -> list[tuple[str, int]]:
+        """Requêtes identiques exécutées plusieurs fois : le motif typique d'un N+1."""
+        return [(query, count) for query, count in self.fingerprints.most_common() if count >= minimum]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryStats]:
+    """
+    Compte les requêtes SQL du bloc ; en mode DEBUG, avertit quand DB_QUERY_BUDGET est dépassé.
+    Le contexte suit la requête dans le pool de threads.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if instrumentation.enabled():
+            instrumentation.DB_QUERIES_PER_REQUEST.observe(stats.count)
+        if settings.DEBUG and stats.count > settings.DB_QUERY_BUDGET:
+            logger.warning("query budget exceeded", extra={
+                "label": label,
+                "query_count": stats.count,
+                "query_budget": settings.DB_QUERY_BUDGET,
+                "db_ms": round(stats.total_seconds * 1000, 2),
+                "repeated_queries": stats.repeated()[:5],
+            })
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    slow = elapsed * 1000 >= settings.DB_SLOW_QUERY_MS
+    if stats is None and not slow and not instrumentation.enabled():
+        return
+
+    statement_fingerprint = fingerprint(statement)
+    if stats is not None:
+        stats.record(statement_fingerprint, elapsed)
+    if instrumentation.enabled():
+        operation = statement_fingerprint.split(" ", 1)[0].upper()
+        instrumentation.DB_QUERY_SECONDS.observe(elapsed, operation=operation)
+    if slow:
+        logger.warning("slow query", extra={
+            "fingerprint": statement_fingerprint,
+            "duration_ms": round(elapsed * 1000, 2),
+            "params_shape": parameters_shape(parameters, executemany),
+        })
+
+
+def record_queries(engine: Engine):
+    """Chronomètre chaque requête SQL : statistiques par requête HTTP, métriques et journal des requêtes lentes."""
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
@@ -0,0 +1,37 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core import tracing
+
+MAX_STATEMENT_LENGTH = 1000
+
+
+def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+    # Les paramètres ne sont jamais exportés : seule la requête SQL paramétrée l'est
+    context._trace_span = tracing.begin_span(
+        "db.query",
+        **{"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+    )
+
+
+def _end_query_span(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        span.end()
+
+
+def _fail_query_span(exception_context):
+    context = exception_context.execution_context
+    span = getattr(context, "_trace_span", None) if context is not None else None
+    if span is not None:
+        context._trace_span = None
+        span.record_error(exception_context.original_exception)
+        span.end()
+
+
+def trace_queries(engine: Engine):
+    """Un span par requête SQL exécutée dans une trace échantillonnée."""
+    event.listen(engine, "before_cursor_execute", _start_query_span)
+    event.listen(engine, "after_cursor_execute", _end_query_span)
+    event.listen(engine, "handle_error", _fail_query_span)
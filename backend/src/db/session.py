@@ -1,9 +1,35 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from src.core.config import get_database_url
+from src.core.config import get_database_url, is_sqlite_url
+from src.db.query_stats import record_queries
+from src.db.query_tracing import trace_queries
+
+
+def engine_options(url: str) -> dict:
+    """Options de create_engine propres au dialecte : SQLite partagé entre les threads des requêtes."""
+    if not is_sqlite_url(url):
+        return {}
+    options = {"connect_args": {"check_same_thread": False}}
+    if make_url(url).database in (None, "", ":memory:"):
+        # Base en mémoire : une seule connexion, sinon chaque connexion verrait une base vide
+        options["poolclass"] = StaticPool
+    return options
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Désactivées par défaut en SQLite : mêmes contraintes qu'en PostgreSQL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
 
 db_url = get_database_url()
-engine = create_engine(db_url)
+engine = create_engine(db_url, **engine_options(db_url))
+if is_sqlite_url(db_url):
+    event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+trace_queries(engine)
+record_queries(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from src.core.instrumentation import stage
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Regroupe les écritures d'une requête dans une seule transaction : un commit à la sortie,
+    un rollback en cas d'exception. Les repositories y sont appelés avec commit=False.
+    """
+    try:
+        yield db
+        with stage("db_commit"):
+            db.commit()
+    except BaseException:
+        db.rollback()
+        raise
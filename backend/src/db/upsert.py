@@ -0,0 +1,16 @@
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, model):
+    """
+    INSERT propre au dialecte de la session, qui expose on_conflict_do_nothing / on_conflict_do_update
+    et RETURNING (PostgreSQL en production, SQLite >= 3.35 en test).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert not supported for dialect {dialect}")
+    return insert(model)
@@ -6,9 +6,9 @@ from src.services.google_auth_service import GoogleAuthService
 from src.services.password_reset_token_service import PasswordResetTokenService
 from src.repositories.password_history_repository import PasswordHistoryRepository
 from src.repositories.password_reset_token_repository import PasswordResetTokenRepository
+from src.repositories.email_outbox_repository import EmailOutboxRepository
 from src.services.password_history_service import PasswordHistoryService
-from src.models.user import User
-from src.exceptions.auth_exception import InvalidCredentialsException
+from src.schemas.auth_schema import Principal
 from src.db.deps import get_db
 
 from src.repositories.user_repository import UserRepository
@@ -22,8 +22,14 @@ from src.services.role_service import RoleService
 from src.services.status_service import StatusService
 from src.services.user_status_service import UserStatusService
 from src.services.user_role_service import UserRoleService
+from src.services.principal_service import PrincipalService
 from src.services.auth_service import AuthService
 from src.services.stego_service import StegoService
+from src.storage import MediaStorage, get_storage
+from src.cache import Cache, get_cache
+from src.utils.google_oauth import OAuthProvider
+from src.core import profiling, tracing
+from src.core.profiling import ProfileStore
 from fastapi import Request
 
 
@@ -49,8 +55,27 @@ def get_password_history_repository(db: Session = Depends(get_db)) -> PasswordHi
 def get_password_reset_token_repository(db: Session = Depends(get_db)) -> PasswordResetTokenRepository:
     return PasswordResetTokenRepository(db)
 
-def get_stego_service(db: Session = Depends(get_db)) -> StegoService:
-    return StegoService(db=db)
+def get_email_outbox_repository(db: Session = Depends(get_db)) -> EmailOutboxRepository:
+    return EmailOutboxRepository(db)
+
+def get_media_storage() -> MediaStorage:
+    return get_storage()
+
+def get_oauth_provider(request: Request) -> OAuthProvider:
+    # Créé et fermé par le lifespan de l'application (pool de connexions partagé)
+    return request.app.state.oauth_provider
+
+def get_cache_service() -> Cache:
+    return get_cache()
+
+def get_profile_store() -> ProfileStore:
+    return profiling.get_profile_store()
+
+def get_stego_service(
+    db: Session = Depends(get_db),
+    storage: MediaStorage = Depends(get_media_storage)
+) -> StegoService:
+    return StegoService(db=db, storage=storage)
 
 
 # Services injections
@@ -66,17 +91,27 @@ def get_status_service(
 ) -> StatusService:
     return StatusService(db, repo)
 
+def get_principal_service(
+    db: Session = Depends(get_db),
+    user_status_repo: UserStatusRepository = Depends(get_user_status_repository),
+    user_role_repo: UserRoleRepository = Depends(get_user_role_repository),
+    cache: Cache = Depends(get_cache_service)
+) -> PrincipalService:
+    return PrincipalService(db, user_status_repo, user_role_repo, cache)
+
 def get_user_status_service(
     db: Session = Depends(get_db),
-    repo: UserStatusRepository = Depends(get_user_status_repository)
+    repo: UserStatusRepository = Depends(get_user_status_repository),
+    principal_service: PrincipalService = Depends(get_principal_service)
 ) -> UserStatusService:
-    return UserStatusService(db, repo)
+    return UserStatusService(db, repo, principal_service)
 
 def get_user_role_service(
     db: Session = Depends(get_db),
-    repo: UserRoleRepository = Depends(get_user_role_repository)
+    repo: UserRoleRepository = Depends(get_user_role_repository),
+    principal_service: PrincipalService = Depends(get_principal_service)
 ) -> UserRoleService:
-    return UserRoleService(db, repo)
+    return UserRoleService(db, repo, principal_service)
 
 def get_password_history_service(
     db: Session = Depends(get_db),
@@ -113,7 +148,8 @@ def get_auth_service(
     user_role_service: UserRoleService = Depends(get_user_role_service),
     user_status_service: UserStatusService = Depends(get_user_status_service),
     password_history_service: PasswordHistoryService = Depends(get_password_history_service),
-    password_reset_token_service: PasswordResetTokenRepository = Depends(get_password_reset_token_service)
+    password_reset_token_service: PasswordResetTokenRepository = Depends(get_password_reset_token_service),
+    email_outbox_repository: EmailOutboxRepository = Depends(get_email_outbox_repository)
 ) -> AuthService:
     return AuthService(
         db, 
@@ -123,7 +159,8 @@ def get_auth_service(
         user_role_service, 
         user_status_service,
         password_history_service,
-        password_reset_token_service
+        password_reset_token_service,
+        email_outbox_repository
     )
 
 def get_google_auth_service(
@@ -132,7 +169,8 @@ def get_google_auth_service(
     role_service: RoleService = Depends(get_role_service),
     status_service: StatusService = Depends(get_status_service),
     user_role_service: UserRoleService = Depends(get_user_role_service),
-    user_status_service: UserStatusService = Depends(get_user_status_service)
+    user_status_service: UserStatusService = Depends(get_user_status_service),
+    oauth_provider: OAuthProvider = Depends(get_oauth_provider)
 ) -> GoogleAuthService:
     return GoogleAuthService(
         db, 
@@ -140,7 +178,8 @@ def get_google_auth_service(
         role_service,
         status_service,
         user_role_service,
-        user_status_service
+        user_status_service,
+        oauth_provider
     )
 
 
@@ -150,17 +189,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 def get_current_user(
     request: Request,
     access_token: str = Depends(oauth2_scheme), 
-    auth_service: AuthService = Depends(get_auth_service),
-) -> User:
-    # Extract refresh token from request context
-    refresh_token = request.cookies.get("refresh_token")
-
-    # Validate refresh and accesstoken
-    refresh_token_user = auth_service.validate_token_and_get_user(refresh_token)
-    access_token_user = auth_service.validate_token_and_get_user(access_token)
-    
-    # Ensure both tokens belong to the same user
-    if access_token_user.id != refresh_token_user.id:
-        raise InvalidCredentialsException()
-    
-    return access_token_user
\ No newline at end of file
+    principal_service: PrincipalService = Depends(get_principal_service),
+) -> Principal:
+    with tracing.span("auth.get_current_user"):
+        # Refresh token (cookie) et access token doivent appartenir au même utilisateur actif
+        return principal_service.authenticate(access_token, request.cookies.get("refresh_token"))
@@ -1,13 +1,37 @@
+from contextlib import contextmanager
+
 from fastapi import Depends
-from src.dependencies.injection import get_current_user
-from src.exceptions.base_exception import ForbiddenOperationException
+from src.db.deps import get_db
+from src.dependencies.injection import (
+    get_cache_service,
+    get_current_user,
+    get_principal_service,
+    get_user_role_repository,
+    get_user_status_repository,
+)
+from src.exceptions.base_exception import AppException, ForbiddenOperationException
 from src.schemas.role_schema import RoleEnum
-from src.schemas.user_schema import UserRead
+from src.schemas.auth_schema import Principal
 
 def require_roles(*allowed_roles: RoleEnum):
-    def _verify(current_user: UserRead = Depends(get_current_user)):
-        user_roles = [user_role.role.name for user_role in current_user.roles]
-        if not any(role in user_roles for role in allowed_roles):
+    def _verify(current_user: Principal = Depends(get_current_user)):
+        if not current_user.has_any_role(*allowed_roles):
             raise ForbiddenOperationException("Not enough permissions")
         return current_user
     return _verify
+
+
+def is_admin_token(access_token: str) -> bool:
+    """
+    Vérifie hors injection (middleware) qu'un jeton d'accès appartient à un administrateur actif.
+    Mêmes fournisseurs et contrôles que get_current_user (type du jeton, statut, cache des principals).
+    """
+    with contextmanager(get_db)() as db:
+        principal_service = get_principal_service(
+            db, get_user_status_repository(db), get_user_role_repository(db), get_cache_service()
+        )
+        try:
+            principal = principal_service.authenticate_access_token(access_token)
+        except AppException:
+            return False
+    return principal.has_any_role(RoleEnum.ADMIN)
@@ -8,6 +8,7 @@ from src.exceptions.auth_exception import InactiveUserException, InvalidCredenti
 from .user_exception import UserAlreadyExists, UserNotFound
 from .role_exception import RoleNotFound
 from .status_exception import StatusNotFound
+from .upload_exception import UploadTooLarge, InvalidImageUpload, MemoryBudgetBusy
 
 def add_exception_handlers(app):
     """ General exception handler """
@@ -47,6 +48,20 @@ def add_exception_handlers(app):
         return JSONResponse(status_code=404, content={"err": str(exc)})
     
 
+    """ Uploads """
+    @app.exception_handler(UploadTooLarge)
+    async def upload_too_large_handler(request: Request, exc: UploadTooLarge):
+        return JSONResponse(status_code=413, content={"err": str(exc)})
+
+    @app.exception_handler(InvalidImageUpload)
+    async def invalid_image_upload_handler(request: Request, exc: InvalidImageUpload):
+        return JSONResponse(status_code=400, content={"err": str(exc)})
+
+    @app.exception_handler(MemoryBudgetBusy)
+    async def memory_budget_busy_handler(request: Request, exc: MemoryBudgetBusy):
+        return JSONResponse(status_code=503, content={"err": str(exc)}, headers={"Retry-After": "5"})
+
+
     """ Login """
     @app.exception_handler(InvalidCredentialsException)
     async def invalid_credentials_handler(request: Request, exc: InvalidCredentialsException):
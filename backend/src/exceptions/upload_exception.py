@@ -0,0 +1,15 @@
+from .base_exception import AppException
+
+class UploadTooLarge(AppException):
+    pass
+
+class InvalidImageUpload(AppException):
+    pass
+
+class MemoryBudgetExceeded(UploadTooLarge):
+    """L'estimation mémoire de l'image dépasse à elle seule le budget du worker."""
+    pass
+
+class MemoryBudgetBusy(AppException):
+    """Budget mémoire occupé par d'autres traitements au-delà du délai d'attente."""
+    pass
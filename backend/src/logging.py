@@ -1,25 +1,154 @@
+import atexit
+import json
 import logging
+import queue
+import random
+import zlib
+from datetime import datetime, timezone
 from enum import StrEnum
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from src.core import tracing
+from src.core.request_context import get_request_id
 
 
 LOG_FORMAT_DEBUG = "%(levelname)s:%(message)s:%(pathname)s:%(funcName)s:%(lineno)d"
 
+# Diagnostics verbeux des moteurs de stéganographie, échantillonnés par requête
+ENGINE_LOGGER_PREFIX = "src.services.stegano_"
+
+# Attributs standard d'un LogRecord : tout le reste vient de extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id", "trace_id"}
+
 class LogLevels(StrEnum):
     info = "INFO"
     warn = "WARN"
     error = "ERROR"
     debug = "DEBUG"
 
-def configure_logging(log_level: str = LogLevels.error):
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne : horodatage, niveau, logger, message, corrélation et champs extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "trace_id"):
+            value = getattr(record, key, None)
+            if value:
+                document[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                document[key] = value
+        if record.exc_info:
+            document["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            document["exc"] = record.exc_text
+        return json.dumps(document, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute l'identifiant de requête et de trace ; exécuté dans le thread qui journalise."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        span = tracing.current_span()
+        record.trace_id = span.trace_id if span is not None else None
+        return True
+
+
+class EngineSamplingFilter(logging.Filter):
+    """
+    Ne garde les diagnostics (< WARNING) des moteurs que pour une fraction des requêtes.
+    La décision dépend de l'identifiant de requête : une requête retenue l'est pour tous ses enregistrements.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING or not record.name.startswith(ENGINE_LOGGER_PREFIX):
+            return True
+        request_id = getattr(record, "request_id", None) or get_request_id()
+        if request_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(request_id.encode()) % 10_000 < self.rate * 10_000
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Dépose les enregistrements dans une file bornée vidée par un QueueListener : le thread de la requête
+    ne fait jamais d'I/O. File pleine : l'enregistrement est abandonné et compté.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Le message est figé ici, mais l'exception reste séparée pour le formateur JSON
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(log_level: str = LogLevels.error, json_format: bool = True,
+                      engine_sample_rate: float = 1.0, queue_size: int = 10_000):
+    global _listener
     log_level = str(log_level).upper()
     log_levels = [level.value for level in LogLevels]
-
     if log_level not in log_levels:
-        logging.basicConfig(level=LogLevels.error)
-        return
+        log_level = LogLevels.error
+
+    if json_format:
+        formatter = JsonFormatter()
+    elif log_level == LogLevels.debug:
+        formatter = logging.Formatter(LOG_FORMAT_DEBUG)
+    else:
+        formatter = logging.Formatter(logging.BASIC_FORMAT)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(EngineSamplingFilter(engine_sample_rate))
+
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(log_level)
+
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
 
-    if log_level == LogLevels.debug:
-        logging.basicConfig(level=log_level, format=LOG_FORMAT_DEBUG)
-        return
 
-    logging.basicConfig(level=log_level)
\ No newline at end of file
+atexit.register(stop_logging)
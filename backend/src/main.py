@@ -1,32 +1,63 @@
 from contextlib import asynccontextmanager
-import subprocess
 from fastapi import FastAPI
-from src.core.middleware import add_cors_middleware
+from src.core.middleware import add_cors_middleware, add_metrics_middleware, add_profiling_middleware, add_tracing_middleware, add_request_id_middleware
 from src.controllers.routes import include_routers
 from src.exceptions.http_exception_handler import add_exception_handlers
 from src.seeds.base import seed_all
-from src.db.session import SessionLocal
+from src.db.migrations import run_migrations
+from src.db.session import SessionLocal, engine
 from src.core.config import settings
 from .logging import configure_logging, LogLevels
 from src.controllers.api import stego_controller
+from src.dependencies.roles import is_admin_token
+from src.services.mail_outbox_service import MailOutboxWorker
+from src.services.media_gc_service import MediaGCScheduler
+from src.services.principal_service import check_cache_sharing
+from src.services.recompression_service import RecompressionScheduler
+from src.services.tiering_service import AccessFlushJob, TieringJob
+from src.utils.google_oauth import build_oauth_provider
 
 
-configure_logging(LogLevels.debug if settings.DEBUG else LogLevels.info)
-
-# Run database migrations if in development environment
-if settings.ENV == "dev":
-    try:
-        subprocess.run(["alembic", "upgrade", "head"], check=True)
-    except subprocess.CalledProcessError as e:
-        pass
+configure_logging(
+    LogLevels.debug if settings.DEBUG else LogLevels.info,
+    json_format=settings.LOG_FORMAT == "json",
+    engine_sample_rate=settings.LOG_ENGINE_SAMPLE_RATE,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Au démarrage et non à l'import : importer l'application ne touche pas à la base
+    run_migrations(engine)
+    check_cache_sharing()
     db = SessionLocal()
+    media_gc = MediaGCScheduler(SessionLocal)
+    recompression = RecompressionScheduler(SessionLocal)
+    access_flush = AccessFlushJob(SessionLocal)
+    tiering = TieringJob(SessionLocal)
+    mail_outbox = MailOutboxWorker(SessionLocal)
+    app.state.oauth_provider = build_oauth_provider()
     try:
         seed_all(db)
+        if settings.MAIL_OUTBOX_ENABLED:
+            mail_outbox.start()
+        if settings.MEDIA_GC_ENABLED:
+            media_gc.start()
+        if settings.RECOMPRESS_ENABLED:
+            recompression.start()
+        if settings.TIERING_ENABLED:
+            access_flush.start()
+            tiering.start()
         yield
     finally:
+        if settings.TIERING_ENABLED:
+            tiering.stop(timeout=5)
+            access_flush.stop(timeout=5)
+            access_flush.run_once()
+        recompression.stop(timeout=5)
+        media_gc.stop(timeout=5)
+        if settings.MAIL_OUTBOX_ENABLED:
+            mail_outbox.stop(timeout=5)
+        await app.state.oauth_provider.aclose()
         db.close()
 
 app = FastAPI(
@@ -42,5 +73,9 @@ app = FastAPI(
 )
 
 add_cors_middleware(app)
+add_metrics_middleware(app)
+add_profiling_middleware(app, is_admin_token)
+add_tracing_middleware(app)
+add_request_id_middleware(app)
 include_routers(app)
 add_exception_handlers(app)
@@ -7,4 +7,6 @@ from .password_history import PasswordHistory
 from .password_reset_token import PasswordResetToken
 from .signature import Signature
 from .image import Image
-from .verification import Verification
\ No newline at end of file
+from .verification import Verification
+from .media_access import MediaAccess
+from .email_outbox import EmailOutbox
@@ -0,0 +1,24 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String, Text, func
+from src.db.base import Base
+
+class EmailOutbox(Base):
+    """
+    Email transactionnel en attente d'envoi, écrit dans la transaction qui le motive (inscription,
+    réinitialisation) et distribué par MailOutboxWorker. Le gabarit est rendu à l'envoi.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    template = Column(String, nullable=False)
+    context = Column(JSON, nullable=False, default=dict)
+    status = Column(String(16), nullable=False, default="pending", index=True)  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Bail du worker qui distribue le message : un seul envoi même avec plusieurs workers
+    locked_by = Column(String(36), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column,Integer,String, DateTime, func
+from sqlalchemy import BigInteger, Column,Integer,String, DateTime, func
 from sqlalchemy.orm import relationship
 from src.db.base import Base
 
@@ -11,7 +11,15 @@ class Image(Base):
     original_filename = Column(String)
     mime_type = Column(String)
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
-    sha256_hash = Column(String, unique=True)
+    # Dernier upload du même contenu (dédupliqué) : le délai de grâce du GC court à partir de cette date
+    last_uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    sha256_hash = Column(String, unique=True)  # empreinte de l'upload d'origine, conservée après recompression
+    file_size = Column(BigInteger, nullable=True)
+    recompressed_at = Column(DateTime(timezone=True), nullable=True)
+    # Échecs de recompression : l'image est retentée aux passes suivantes jusqu'à RECOMPRESS_MAX_ATTEMPTS
+    recompress_attempts = Column(Integer, nullable=False, server_default="0", default=0)
+    # Ancienne clé après recompression, supprimée par le GC une fois le délai de grâce écoulé
+    superseded_file_path = Column(String, nullable=True)
 
     signatures = relationship("Signature", back_populates="image")
     verifications = relationship("Verification", back_populates="image")
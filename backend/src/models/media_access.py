@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, DateTime
+from src.db.base import Base
+
+class MediaAccess(Base):
+    """Dernier accès connu à un objet du stockage, écrit par lots (voir AccessTracker)."""
+    __tablename__ = "media_access"
+
+    storage_key = Column(String, primary_key=True)
+    last_accessed_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey
+from sqlalchemy import JSON, BigInteger, Column, Integer, String, DateTime, func, ForeignKey
 from sqlalchemy.orm import relationship
 from src.db.base import Base
 
@@ -11,5 +11,13 @@ class Signature(Base):
     signature_uuid = Column(String, unique=True, nullable=False)
     signed_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Image signée produite : emplacement, format et empreinte, pour éviter de sonder le disque
+    output_storage_key = Column(String, nullable=True)
+    output_format = Column(String(16), nullable=True)
+    output_size = Column(BigInteger, nullable=True)
+    output_sha256 = Column(String(64), nullable=True, index=True)
+    engine = Column(String(16), nullable=True)
+    engine_params = Column(JSON, nullable=True)
+
     image = relationship("Image", back_populates="signatures")
     verifications = relationship("Verification", back_populates="signature")
\ No newline at end of file
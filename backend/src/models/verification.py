@@ -6,7 +6,7 @@ class Verification(Base):
     __tablename__ = "verifications"
 
     id = Column(Integer, primary_key=True, index=True)
-    signature_uuid = Column(String, ForeignKey("signatures.signature_uuid"), nullable=True)
+    signature_uuid = Column(String, ForeignKey("signatures.signature_uuid"), nullable=True, index=True)
     image_id = Column(Integer, ForeignKey("images.id"), nullable=True)
     verifier_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     verified = Column(Boolean, nullable=False)
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from src.models import EmailOutbox
+
+
+class EmailOutboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, recipient: str, subject: str, template: str, context: dict, commit: bool = True) -> EmailOutbox:
+        """Ajoute un email à la file ; avec commit=False, il part avec la transaction de l'appelant."""
+        entry = EmailOutbox(
+            recipient=recipient, subject=subject, template=template, context=context,
+            status="pending", attempts=0, next_attempt_at=datetime.now(timezone.utc),
+        )
+        self.db.add(entry)
+        self.db.flush()
+        if commit:
+            self.db.commit()
+        return entry
+
+    def claim_batch(self, worker_id: str, limit: int, lease_seconds: float) -> list[EmailOutbox]:
+        """
+        Réserve jusqu'à limit emails dus pour worker_id, le temps du bail. La réservation est une
+        mise à jour conditionnelle : deux workers ne reçoivent jamais le même email, quel que soit
+        le dialecte (SKIP LOCKED évite en plus l'attente entre workers sous PostgreSQL).
+        """
+        now = datetime.now(timezone.utc)
+        due = (
+            EmailOutbox.status == "pending",
+            EmailOutbox.next_attempt_at <= now,
+            or_(EmailOutbox.locked_until.is_(None), EmailOutbox.locked_until < now),
+        )
+        ids = self.db.scalars(
+            select(EmailOutbox.id).where(*due).order_by(EmailOutbox.id).limit(limit).with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            self.db.commit()
+            return []
+        self.db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids), *due)
+            .values(locked_by=worker_id, locked_until=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return list(self.db.scalars(
+            select(EmailOutbox).where(EmailOutbox.id.in_(ids), EmailOutbox.locked_by == worker_id).order_by(EmailOutbox.id)
+        ))
+
+    def mark_sent(self, entry: EmailOutbox, commit: bool = True):
+        # Le contexte (liens de réinitialisation, de confirmation) n'est plus utile une fois l'email parti
+        entry.context = {}
+        entry.status = "sent"
+        entry.attempts += 1
+        entry.sent_at = datetime.now(timezone.utc)
+        entry.locked_by = entry.locked_until = None
+        entry.last_error = None
+        if commit:
+            self.db.commit()
+
+    def mark_failed(self, entry: EmailOutbox, error: str, retry_in: Optional[float], commit: bool = True):
+        """Échec d'envoi : nouvelle tentative dans retry_in secondes, ou abandon si retry_in est None."""
+        entry.attempts += 1
+        entry.last_error = error[:2000]
+        entry.locked_by = entry.locked_until = None
+        if retry_in is None:
+            entry.status = "failed"
+            entry.context = {}
+        else:
+            entry.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=retry_in)
+        if commit:
+            self.db.commit()
+
+    def purge_finished(self, before: datetime, limit: int) -> int:
+        """Supprime jusqu'à limit emails envoyés ou abandonnés avant la date donnée ; retourne leur nombre."""
+        finished_at = func.coalesce(EmailOutbox.sent_at, EmailOutbox.next_attempt_at)
+        ids = self.db.scalars(
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status.in_(("sent", "failed")), finished_at < before)
+            .order_by(EmailOutbox.id)
+            .limit(limit)
+        ).all()
+        if ids:
+            self.db.execute(delete(EmailOutbox).where(EmailOutbox.id.in_(ids)))
+        self.db.commit()
+        return len(ids)
+
+    def count_by_status(self) -> dict[str, int]:
+        rows = self.db.execute(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status))
+        return {status: count for status, count in rows}
@@ -1,62 +1,198 @@
 import os
-import uuid
-from hashlib import sha256
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Iterable, Optional
 from fastapi import UploadFile
+from sqlalchemy import func, or_, update
 from sqlalchemy.orm import Session
-from src.models import Image
+from src.core.instrumentation import stage
+from src.db.upsert import dialect_insert
+from src.models import Image, Signature, Verification
+from src.storage import ORIGINALS_PREFIX, MediaStorage, get_storage
+from src.utils.upload_utils import discard_upload, ingest_upload
 
-MEDIA_DIR = os.path.abspath("src/media/images/")
+# Insertion puis verrouillage de la ligne existante, repris si le GC la supprime entre les deux
+_SAVE_ATTEMPTS = 3
 
 
 class ImageRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, storage: Optional[MediaStorage] = None):
         self.db = db
+        self.storage = storage or get_storage()
 
-    def save_or_get(self, file: UploadFile, user_id: int) -> Image:
-        """Enregistre l'image si elle n'existe pas déjà (via son hash)."""
-        content = file.file.read()
-        file.file.seek(0)
-        file_hash = sha256(content).hexdigest()
+    def save_or_get(self, file: UploadFile, user_id: int, commit: bool = True, engine: Optional[str] = None) -> Image:
+        """
+        Enregistre l'image si elle n'existe pas déjà (via son hash).
+        L'upload est lu par blocs puis déplacé vers sa clé de stockage adressée par contenu.
+        L'insertion passe par ON CONFLICT (sha256_hash) DO NOTHING RETURNING : deux uploads
+        concurrents du même contenu ne peuvent pas se doubler, et la ligne revient sans SELECT.
+        Une ligne existante est verrouillée jusqu'au commit (voir _touch) : le GC des médias ne
+        peut pas la supprimer pendant la signature.
+        engine borne le nombre de pixels accepté au budget mémoire du moteur qui traitera l'image.
+        """
+        upload = ingest_upload(file.file, self.storage.staging_dir(), engine=engine)
 
-        # Vérifier si déjà en base
-        existing = self.db.query(Image).filter_by(sha256_hash=file_hash).first()
-        if existing:
-            return existing
-
-        # Sauvegarder
-        os.makedirs(MEDIA_DIR, exist_ok=True)
         # Extraire l'extension du fichier original
-        file_extension = os.path.splitext(file.filename)[1] if file.filename else '.png'
-        filename = f"{uuid.uuid4()}{file_extension}"
-        path = os.path.join(MEDIA_DIR, filename)
-
-        with open(path, "wb") as f:
-            f.write(content)
-
-        image = Image(
-            user_id=user_id,
-            file_path=path,
-            original_filename=file.filename,
-            mime_type=file.content_type,
-            sha256_hash=file_hash,
-        )
-        self.db.add(image)
-        self.db.commit()
-        self.db.refresh(image)
-        return image
+        file_extension = os.path.splitext(file.filename)[1].lower() if file.filename else '.png'
+        key = f"{ORIGINALS_PREFIX}{upload.sha256_hash}{file_extension}"
 
-    def save_temp(self, file: UploadFile) -> str:
-        """Sauvegarde temporaire (ex: pour vérification)."""
-        content = file.file.read()
-        os.makedirs(MEDIA_DIR, exist_ok=True)
-        temp_name = f"temp_{uuid.uuid4()}.png"
-        path = os.path.join(MEDIA_DIR, temp_name)
+        try:
+            for _ in range(_SAVE_ATTEMPTS):
+                statement = (
+                    dialect_insert(self.db, Image)
+                    .values(
+                        user_id=user_id,
+                        file_path=key,
+                        original_filename=file.filename,
+                        mime_type=file.content_type,
+                        sha256_hash=upload.sha256_hash,
+                        file_size=upload.size,
+                    )
+                    .on_conflict_do_nothing(index_elements=[Image.sha256_hash])
+                    .returning(Image)
+                )
+                with stage("db_insert"):
+                    image = self.db.scalars(statement).first()
+                if image is not None:
+                    with stage("storage_write"):
+                        self.storage.put_file(key, upload.temp_path)
+                    break
+                image = self._touch(upload.sha256_hash)
+                if image is not None:
+                    # Contenu déjà connu : l'upload est abandonné au profit de la ligne existante
+                    discard_upload(upload.temp_path)
+                    break
+                # Ligne supprimée par le GC entre l'insertion et le verrouillage : nouvel essai
+            else:
+                raise RuntimeError(f"Image {upload.sha256_hash} kept disappearing during upload")
+        except BaseException:
+            discard_upload(upload.temp_path)
+            raise
 
-        with open(path, "wb") as f:
-            f.write(content)
-        return path
+        if commit:
+            self.db.commit()
+        return image
+
+    def _touch(self, sha256_hash: str) -> Optional[Image]:
+        """
+        Ligne existante du contenu, verrouillée par un UPDATE jusqu'à la fin de la transaction ;
+        last_uploaded_at repousse aussi le délai de grâce du GC. None si la ligne vient d'être supprimée.
+        """
+        statement = (
+            update(Image)
+            .where(Image.sha256_hash == sha256_hash)
+            .values(last_uploaded_at=func.now())
+            .returning(Image)
+            .execution_options(populate_existing=True)
+        )
+        with stage("db_lookup"):
+            return self.db.scalars(statement).first()
 
     def get_by_id(self, image_id: int) -> Optional[Image]:
         """Récupère une image par son ID."""
         return self.db.query(Image).filter_by(id=image_id).first()
+
+    def existing_file_paths(self, keys: Iterable[str]) -> set[str]:
+        """Parmi les clés données, retourne celles référencées par une image (une seule requête)."""
+        keys = set(keys)
+        if not keys:
+            return set()
+        rows = (
+            self.db.query(Image.file_path, Image.superseded_file_path)
+            .filter(or_(Image.file_path.in_(keys), Image.superseded_file_path.in_(keys)))
+            .all()
+        )
+        # Une ancienne clé de recompression reste référencée jusqu'à la fin du délai de grâce
+        return {key for row in rows for key in row if key in keys}
+
+    def lock_unreferenced(self, uploaded_before: datetime, after_id: int, limit: int) -> list[Image]:
+        """
+        Images sans signature ni vérification, pas téléversées depuis la date donnée, par id croissant.
+        Les lignes sont verrouillées (FOR UPDATE SKIP LOCKED) jusqu'au commit : celles qu'un upload
+        concurrent vient de verrouiller (_touch) sont ignorées.
+        """
+        return (
+            self.db.query(Image)
+            .filter(func.coalesce(Image.last_uploaded_at, Image.upload_date) < uploaded_before)
+            .filter(Image.id > after_id)
+            .filter(~self.db.query(Signature.id).filter(Signature.image_id == Image.id).exists())
+            .filter(~self.db.query(Verification.id).filter(Verification.image_id == Image.id).exists())
+            .order_by(Image.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=Image)
+            .all()
+        )
+
+    def delete_many(self, image_ids: Iterable[int]):
+        image_ids = list(image_ids)
+        if image_ids:
+            self.db.query(Image).filter(Image.id.in_(image_ids)).delete(synchronize_session=False)
+        self.db.commit()
+
+    def list_recompression_candidates(self, after_id: int, limit: int, max_attempts: int) -> list[int]:
+        """Ids des originaux du stockage pas encore traités par la recompression, par id croissant."""
+        rows = (
+            self.db.query(Image.id)
+            .filter(Image.recompressed_at.is_(None), Image.id > after_id)
+            .filter(Image.recompress_attempts < max_attempts)
+            .filter(Image.file_path.startswith(ORIGINALS_PREFIX))
+            .order_by(Image.id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def lock_for_recompression(self, image_id: int) -> Optional[Image]:
+        """
+        Verrouille l'image jusqu'au commit si elle est toujours à recompresser.
+        None si elle a été traitée entre-temps ou si un upload du même contenu la verrouille (SKIP LOCKED).
+        """
+        return (
+            self.db.query(Image)
+            .filter(Image.id == image_id, Image.recompressed_at.is_(None))
+            .with_for_update(skip_locked=True)
+            .populate_existing()
+            .first()
+        )
+
+    def mark_recompressed(
+        self,
+        image: Image,
+        file_path: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        file_size: Optional[int] = None,
+    ) -> Image:
+        if file_path and file_path != image.file_path:
+            image.superseded_file_path = image.file_path
+            image.file_path = file_path
+        if mime_type:
+            image.mime_type = mime_type
+        if file_size is not None:
+            image.file_size = file_size
+        image.recompressed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return image
+
+    def record_recompression_failure(self, image: Image) -> Image:
+        image.recompress_attempts = (image.recompress_attempts or 0) + 1
+        self.db.commit()
+        return image
+
+    def list_superseded(self, recompressed_before: datetime, limit: int) -> list[Image]:
+        """Images dont l'ancienne clé de recompression a dépassé le délai de grâce."""
+        return (
+            self.db.query(Image)
+            .filter(Image.superseded_file_path.isnot(None), Image.recompressed_at < recompressed_before)
+            .order_by(Image.id)
+            .limit(limit)
+            .all()
+        )
+
+    def clear_superseded(self, image_ids: Iterable[int]):
+        image_ids = list(image_ids)
+        if image_ids:
+            (
+                self.db.query(Image)
+                .filter(Image.id.in_(image_ids))
+                .update({Image.superseded_file_path: None}, synchronize_session=False)
+            )
+        self.db.commit()
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from typing import Iterable
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+from src.db.upsert import dialect_insert
+from src.models import MediaAccess
+
+
+class MediaAccessRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_many(self, accesses: dict[str, float]):
+        """
+        Enregistre un lot d'accès {clé: timestamp POSIX} ; ne recule jamais une date existante.
+        Un seul INSERT ... ON CONFLICT DO UPDATE : les workers qui vident leurs accès en même temps
+        sur une même clé ne se heurtent pas à la clé primaire.
+        """
+        if not accesses:
+            return
+        statement = dialect_insert(self.db, MediaAccess).values([
+            {"storage_key": key, "last_accessed_at": datetime.fromtimestamp(ts, tz=timezone.utc)}
+            for key, ts in accesses.items()
+        ])
+        # GREATEST(existante, nouvelle), écrit avec CASE pour PostgreSQL comme pour SQLite
+        latest = case(
+            (statement.excluded.last_accessed_at > MediaAccess.last_accessed_at, statement.excluded.last_accessed_at),
+            else_=MediaAccess.last_accessed_at,
+        )
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[MediaAccess.storage_key], set_={"last_accessed_at": latest},
+        ))
+        self.db.commit()
+
+    def last_accessed(self, keys: Iterable[str]) -> dict[str, float]:
+        """Dernier accès connu (timestamp POSIX) pour chacune des clés, en une requête."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = self.db.query(MediaAccess).filter(MediaAccess.storage_key.in_(keys))
+        return {row.storage_key: _as_utc(row.last_accessed_at).timestamp() for row in rows}
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite rend des dates naïves
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -7,10 +7,12 @@ class PasswordResetTokenRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, user_id: int, ip_address: str, token: str, expires_at: datetime):
+    def create(self, user_id: int, ip_address: str, token: str, expires_at: datetime, commit: bool = True):
         reset = PasswordResetToken(user_id=user_id,  ip_address=ip_address, token=token, expires_at=expires_at)
         self.db.add(reset)
-        self.db.commit()
+        self.db.flush()
+        if commit:
+            self.db.commit()
         return reset
 
 
@@ -1,27 +1,136 @@
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from src.core.instrumentation import stage
 from src.models import Signature
+from src.utils.lru_cache import LRUCache
+
+
+class SignatureRef(NamedTuple):
+    """Vue légère et immuable d'une signature, utilisée pour la vérification."""
+    id: int
+    signature_uuid: str
+    image_id: int
+    signer_id: int
+    signed_at: Optional[datetime]
+    engine: Optional[str]
+    key_check: Optional[str]
+
+
+def _ref(row) -> SignatureRef:
+    *columns, engine_params = row
+    return SignatureRef(*columns, (engine_params or {}).get("key_check"))
+
+
+# Les signatures ne sont jamais modifiées après création : seuls les résultats
+# positifs sont mis en cache, un UUID inconnu est toujours relu en base.
+_SIGNATURE_REF_CACHE = LRUCache(maxsize=1024)
 
 
 class SignatureRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, image_id: int, signer_id: int, signature_uuid: str) -> Signature:
-        """Crée une nouvelle signature en base."""
-        signature = Signature(
-            image_id=image_id,
-            signer_id=signer_id,
-            signature_uuid=signature_uuid,
+    def create(
+        self,
+        image_id: int,
+        signer_id: int,
+        signature_uuid: str,
+        output_storage_key: Optional[str] = None,
+        output_format: Optional[str] = None,
+        output_size: Optional[int] = None,
+        output_sha256: Optional[str] = None,
+        engine: Optional[str] = None,
+        engine_params: Optional[dict] = None,
+        commit: bool = True,
+    ) -> Signature:
+        """
+        Crée une nouvelle signature en base, avec les métadonnées de l'image signée.
+        id et signed_at reviennent par RETURNING, sans refresh.
+        """
+        statement = (
+            insert(Signature)
+            .values(
+                image_id=image_id,
+                signer_id=signer_id,
+                signature_uuid=signature_uuid,
+                output_storage_key=output_storage_key,
+                output_format=output_format,
+                output_size=output_size,
+                output_sha256=output_sha256,
+                engine=engine,
+                engine_params=engine_params,
+            )
+            .returning(Signature)
         )
-        self.db.add(signature)
-        self.db.commit()
-        self.db.refresh(signature)
+        with stage("db_insert"):
+            signature = self.db.scalars(statement).one()
+        if commit:
+            self.db.commit()
         return signature
 
     def get_by_uuid(self, signature_uuid: str) -> Signature:
         """Récupère une signature par son UUID."""
         return self.db.query(Signature).filter_by(signature_uuid=signature_uuid).first()
 
+    def get_ref_by_uuid(self, signature_uuid: str) -> Optional[SignatureRef]:
+        """Résout un UUID de signature via l'index unique, avec cache en lecture."""
+        if not signature_uuid:
+            return None
+        ref = _SIGNATURE_REF_CACHE.get(signature_uuid)
+        if ref is not None:
+            return ref
+
+        with stage("db_lookup"):
+            row = (
+                self.db.query(
+                    Signature.id,
+                    Signature.signature_uuid,
+                    Signature.image_id,
+                    Signature.signer_id,
+                    Signature.signed_at,
+                    Signature.engine,
+                    Signature.engine_params,
+                )
+                .filter(Signature.signature_uuid == signature_uuid)
+                .first()
+            )
+        if row is None:
+            return None
+        ref = _ref(row)
+        _SIGNATURE_REF_CACHE.set(signature_uuid, ref)
+        return ref
+
+    def get_ref_by_output_hash(self, output_sha256: str) -> Optional[SignatureRef]:
+        """Retrouve une signature dont l'image signée a exactement ce SHA-256 (index dédié)."""
+        row = (
+            self.db.query(
+                Signature.id,
+                Signature.signature_uuid,
+                Signature.image_id,
+                Signature.signer_id,
+                Signature.signed_at,
+                Signature.engine,
+                Signature.engine_params,
+            )
+            .filter(Signature.output_sha256 == output_sha256)
+            .first()
+        )
+        return _ref(row) if row else None
+
+    def existing_output_keys(self, keys: Iterable[str]) -> set[str]:
+        """Parmi les clés données, retourne celles référencées par une signature (une seule requête)."""
+        keys = list(keys)
+        if not keys:
+            return set()
+        rows = (
+            self.db.query(Signature.output_storage_key)
+            .filter(Signature.output_storage_key.in_(keys))
+            .all()
+        )
+        return {row.output_storage_key for row in rows}
+
     def list_by_signer(self, signer_id: int) -> list[Signature]:
         """Récupère toutes les signatures créées par un utilisateur."""
         return (
@@ -19,4 +19,13 @@ class UserRoleRepository:
             .filter(UserRole.user_id == user_id, Role.name == role_name)
             .first()
             is not None
-        )
\ No newline at end of file
+        )
+
+    def get_role_names(self, user_id: int) -> list[str]:
+        rows = (
+            self.db.query(Role.name)
+            .join(UserRole, Role.id == UserRole.role_id)
+            .filter(UserRole.user_id == user_id)
+            .all()
+        )
+        return [row[0] for row in rows]
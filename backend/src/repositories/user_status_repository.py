@@ -23,7 +23,7 @@ class UserStatusRepository:
             self.db.query(Status.name)
             .join(UserStatus, Status.id == UserStatus.status_id)
             .filter(UserStatus.user_id == user_id)
-            .order_by(UserStatus.changed_at.desc())
+            .order_by(UserStatus.changed_at.desc(), UserStatus.id.desc())
             .first()
         )
         return StatusEnum(status[0]) if status else None
\ No newline at end of file
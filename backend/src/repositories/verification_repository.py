@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlalchemy.orm import Session
+from src.core.instrumentation import stage
 from src.models import Verification
 
 
@@ -14,6 +15,7 @@ class VerificationRepository:
         verified: bool,
         image_id: Optional[int] = None,
         extracted_payload: Optional[str] = None,
+        commit: bool = True,
     ) -> Verification:
         verification = Verification(
             signature_uuid=signature_uuid,
@@ -24,8 +26,10 @@ class VerificationRepository:
         )
 
         self.db.add(verification)
-        self.db.commit()
-        self.db.refresh(verification)
+        with stage("db_insert"):
+            self.db.flush()
+        if commit:
+            self.db.commit()
         return verification
 
     def get_by_id(self, verification_id: int) -> Optional[Verification]:
@@ -1,5 +1,10 @@
+from typing import Optional
+
 from pydantic import BaseModel, EmailStr, Field
 
+from src.schemas.role_schema import RoleEnum
+from src.schemas.status_schema import StatusEnum
+
 
 class LoginRequest(BaseModel):
     email: EmailStr = Field(..., example="user@yopmail.com")
@@ -15,6 +20,7 @@ class TokenRefreshResponse(TokenResponse):
 class TokenPayload(BaseModel):
     sub: int
     exp: int
+    type: Optional[str] = None
 
 class EmailConfirmationPayload(BaseModel):
     email: str
@@ -25,4 +31,13 @@ class ForgotPasswordRequest(BaseModel):
 
 class ResetPasswordRequest(BaseModel):
     token: str
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+class Principal(BaseModel):
+    """Identité authentifiée d'une requête, mise en cache (src.services.principal_service)."""
+    id: int
+    status: StatusEnum
+    roles: frozenset[RoleEnum] = frozenset()
+
+    def has_any_role(self, *roles: RoleEnum) -> bool:
+        return any(role in self.roles for role in roles)
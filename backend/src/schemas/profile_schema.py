@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    trigger: str
+    status: Optional[int] = None
+    started_at: float
+    duration_seconds: float
+    interval_seconds: float
+    samples: int
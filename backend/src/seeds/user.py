@@ -24,11 +24,11 @@ DEFAULT_USERS = [
     }
 ]
 
-def seed_users(db: Session):
+def seed_users(db: Session, users: list = DEFAULT_USERS):
     inspector = inspect(db.bind)
     if not User.__tablename__ in inspector.get_table_names():
         return
-    for user_data in DEFAULT_USERS:
+    for user_data in users:
         if not db.query(User).filter_by(email=user_data["email"]).first():
             user = User(
                 firstname=user_data["firstname"],
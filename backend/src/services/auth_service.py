@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 import secrets
 from sqlalchemy.orm import Session
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from src.core.config import settings
 from src.services.password_history_service import PasswordHistoryService
@@ -16,8 +15,8 @@ from src.services.status_service import StatusService
 from src.services.user_role_service import UserRoleService
 from src.services.user_service import UserService
 from src.services.user_status_service import UserStatusService
-from src.utils.security import create_access_token, create_email_confirmation_token, decode_jwt, generate_tokens_for_user, get_password_hash, verify_password
-from src.utils.mail import send_mail
+from src.utils.security import REFRESH_TOKEN_TYPE, create_access_token, create_email_confirmation_token, decode_jwt, generate_tokens_for_user, get_password_hash, token_type_matches, verify_password
+from src.repositories.email_outbox_repository import EmailOutboxRepository
 
 
 class AuthService:
@@ -30,7 +29,8 @@ class AuthService:
         user_role_service: UserRoleService,
         user_status_service: UserStatusService,
         password_history_service: PasswordHistoryService,
-        password_reset_token_service: PasswordResetTokenService
+        password_reset_token_service: PasswordResetTokenService,
+        email_outbox_repository: EmailOutboxRepository
     ):
         self.db = db
         self.user_service = user_service
@@ -40,8 +40,9 @@ class AuthService:
         self.user_status_service = user_status_service
         self.password_history_service = password_history_service
         self.password_reset_token_service = password_reset_token_service
+        self.email_outbox_repository = email_outbox_repository
 
-    def register_user(self, firstname: str, lastname: str, username: str, email: str, password: str, background_tasks=None):
+    def register_user(self, firstname: str, lastname: str, username: str, email: str, password: str):
         try:
             hashed_password = get_password_hash(password)
             user = self.user_service.create_user(firstname, lastname, username, email, hashed_password, commit=False)
@@ -56,11 +57,9 @@ class AuthService:
             status = self.status_service.get_by_name(StatusEnum.INACTIVE) 
             self.user_status_service.assign_status(user.id, status.id, reason="Initial registration", commit=False)
 
+            # Dans la même transaction que le compte : ni email sans compte, ni compte sans email
             email_confirmation_token = create_email_confirmation_token(user.email)
-            if background_tasks:
-                background_tasks.add_task(self.send_email_confirmation, user.email, email_confirmation_token)
-            else:
-                self.send_email_confirmation(user.email, email_confirmation_token)
+            self.send_email_confirmation(user.email, email_confirmation_token)
 
             self.db.commit()
             self.db.refresh(user)
@@ -98,6 +97,8 @@ class AuthService:
         
         payload = decode_jwt(refresh_token)
         token_data = TokenPayload(**payload)
+        if not token_type_matches(token_data.type, REFRESH_TOKEN_TYPE):
+            raise RefreshTokenInvalidException()
 
         user = self.user_service.get_by_id(token_data.sub)
         if not user or self.user_status_service.get_current_status(user.id) != StatusEnum.ACTIVE:
@@ -107,21 +108,17 @@ class AuthService:
 
 
     def send_reset_password_email(self, email: str, token: str):
-        reset_link = f"{settings.FRONTEND_RESET_PASSWORD_URL}{token}"
-        env = Environment(
-            loader=FileSystemLoader("src/templates"),
-            autoescape=select_autoescape(["html", "xml"])
-        )
-        template = env.get_template("reset_password_email.html")
-        html_content = template.render(
-            reset_link=reset_link,
-            exp=settings.RESET_PASSWORD_EXPIRE_MINUTES
+        """Met l'email en file (email_outbox) dans la transaction courante, sans commit."""
+        self.email_outbox_repository.enqueue(
+            email,
+            "SteganographIA - Password Reset Request",
+            "reset_password_email.html",
+            {"reset_link": f"{settings.FRONTEND_RESET_PASSWORD_URL}{token}", "exp": settings.RESET_PASSWORD_EXPIRE_MINUTES},
+            commit=False,
         )
-        subject = "SteganographIA - Password Reset Request"
-        send_mail([email], subject, html_content)
 
 
-    def forgot_password(self, email: str, ip_address: str, background_tasks=None):
+    def forgot_password(self, email: str, ip_address: str):
         user = self.user_service.get_by_email(email)
         if user:
             if not self.password_reset_token_service.can_request_reset(email=email, ip_address=ip_address, max_requests=settings.MAX_PASSWORD_RESET_REQUESTS):
@@ -129,11 +126,13 @@ class AuthService:
 
             token = secrets.token_urlsafe(32)
             expires_at = datetime.now() + timedelta(minutes=settings.RESET_PASSWORD_EXPIRE_MINUTES)
-            self.password_reset_token_service.create_reset_token(user.id, ip_address, token, expires_at)
-            if background_tasks:
-                background_tasks.add_task(self.send_reset_password_email, user.email, token)
-            else:
+            try:
+                self.password_reset_token_service.create_reset_token(user.id, ip_address, token, expires_at, commit=False)
                 self.send_reset_password_email(user.email, token)
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                raise e
 
 
     def reset_password(self, token: str, new_password: str):
@@ -159,18 +158,14 @@ class AuthService:
 
 
     def send_email_confirmation(self, email: str, token: str):
-        confirmation_link = f"{settings.FRONTEND_CONFIRM_EMAIL_URL}{token}"
-        env = Environment(
-            loader=FileSystemLoader("src/templates"),
-            autoescape=select_autoescape(["html", "xml"])
+        """Met l'email en file (email_outbox) dans la transaction courante, sans commit."""
+        self.email_outbox_repository.enqueue(
+            email,
+            "SteganographIA - Email Confirmation",
+            "confirm_email.html",
+            {"confirmation_link": f"{settings.FRONTEND_CONFIRM_EMAIL_URL}{token}", "exp": settings.EMAIL_CONFIRMATION_EXPIRE_MINUTES},
+            commit=False,
         )
-        template = env.get_template("confirm_email.html")
-        html_content = template.render(
-            confirmation_link=confirmation_link, 
-            exp=settings.EMAIL_CONFIRMATION_EXPIRE_MINUTES
-        )
-        subject = "SteganographIA - Email Confirmation"
-        send_mail([email], subject, html_content)
 
 
     def confirm_email(self, token: str):
@@ -193,21 +188,3 @@ class AuthService:
         except Exception as e:
             self.db.rollback()
             raise e
-
-
-    def validate_token_and_get_user(self, token: str):
-        if not token:
-            raise NotAuthenticatedException()
-        
-        token_payload = decode_jwt(token)
-        token_data = TokenPayload(**token_payload)
-
-        user = self.user_service.get_by_id(token_data.sub)
-        if not user:
-            raise InvalidCredentialsException()
-
-        user_status = self.user_status_service.get_current_status(user.id)
-        if user_status != StatusEnum.ACTIVE:
-            raise InactiveUserException()
-        
-        return user
\ No newline at end of file
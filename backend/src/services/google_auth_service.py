@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from src.schemas.role_schema import RoleEnum
 from src.schemas.status_schema import StatusEnum
 from src.services.role_service import RoleService
@@ -7,11 +8,9 @@ from src.services.user_role_service import UserRoleService
 from src.services.user_status_service import UserStatusService
 from src.services.user_service import UserService
 from src.utils.security import generate_tokens_for_user
-from src.utils.google_oauth import exchange_google_code, get_google_user_info
+from src.utils.google_oauth import OAuthProvider
 from src.models.user import User
 from src.exceptions.auth_exception import OAuthTokenException
-from urllib.parse import urlencode
-from src.core.config import settings
 
 class GoogleAuthService:
     def __init__(
@@ -22,6 +21,7 @@ class GoogleAuthService:
         status_service: StatusService,
         user_role_service: UserRoleService,
         user_status_service: UserStatusService,
+        oauth_provider: OAuthProvider,
     ):
         self.db = db
         self.user_service = user_service
@@ -29,29 +29,29 @@ class GoogleAuthService:
         self.status_service = status_service
         self.user_role_service = user_role_service
         self.user_status_service = user_status_service
+        self.oauth_provider = oauth_provider
 
-    def get_google_auth_url(self) -> str:
-        base_url = "https://accounts.google.com/o/oauth2/v2/auth"
-        query = urlencode({
-            "client_id": settings.GOOGLE_CLIENT_ID,
-            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-            "response_type": "code",
-            "scope": "openid email profile",
-            "access_type": "offline",
-            "prompt": "consent"
-        })
-        return f"{base_url}?{query}"
+    async def get_google_auth_url(self) -> str:
+        return await self.oauth_provider.authorization_url()
 
 
-    def authenticate_with_google(self, code: str) -> tuple[str, str, User]:
-        token_data = exchange_google_code(code)
+    async def authenticate_with_google(self, code: str) -> tuple[str, str, User]:
+        token_data = await self.oauth_provider.exchange_code(code)
         if not token_data:
             raise OAuthTokenException("Google token exchange failed")
 
-        user_info = get_google_user_info(token_data["access_token"])
+        user_info = await self.oauth_provider.get_user_info(token_data["access_token"])
         if not user_info or "email" not in user_info:
             raise OAuthTokenException("Invalid user info")
 
+        # Requêtes SQL synchrones : hors de la boucle d'événements
+        user = await run_in_threadpool(self._get_or_create_user, user_info)
+        access_token, refresh_token = generate_tokens_for_user(user.id)
+
+        return access_token, refresh_token, user
+
+
+    def _get_or_create_user(self, user_info: dict) -> User:
         user = self.user_service.get_by_email(user_info["email"])
         if not user:
             try:
@@ -74,7 +74,4 @@ class GoogleAuthService:
             except Exception as e:
                 self.db.rollback()
                 raise e
-
-        access_token, refresh_token = generate_tokens_for_user(user.id)
-
-        return access_token, refresh_token, user
+        return user
@@ -0,0 +1,120 @@
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.core import instrumentation
+from src.core.background import PeriodicJob
+from src.core.config import settings
+from src.repositories.email_outbox_repository import EmailOutboxRepository
+from src.utils.mail import build_message, get_mailer, render_template
+
+logger = logging.getLogger(__name__)
+
+# Plafond de l'attente entre deux tentatives
+MAX_RETRY_DELAY_SECONDS = 6 * 3600
+
+
+@dataclass
+class OutboxReport:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    purged: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.sent or self.retried or self.failed or self.purged)
+
+
+class MailOutboxService:
+    """
+    Distribue la table email_outbox par lots : chaque lot est réservé (bail), rendu avec les gabarits
+    compilés une fois et envoyé sur la connexion persistante du mailer. Un échec est retenté avec
+    une attente exponentielle, puis abandonné (status "failed") après MAIL_OUTBOX_MAX_ATTEMPTS.
+    Le contexte d'un message envoyé ou abandonné est effacé, la ligne purgée après MAIL_OUTBOX_RETENTION_SECONDS.
+    """
+
+    def __init__(self, db: Session, mailer=None, worker_id: Optional[str] = None):
+        self.db = db
+        self.repo = EmailOutboxRepository(db)
+        self.mailer = mailer or get_mailer()
+        self.worker_id = worker_id or str(uuid.uuid4())
+
+    def retry_delay(self, attempts: int) -> Optional[float]:
+        if attempts >= settings.MAIL_OUTBOX_MAX_ATTEMPTS:
+            return None
+        return min(settings.MAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAX_RETRY_DELAY_SECONDS)
+
+    def drain(self, batch_size: Optional[int] = None, should_stop: Callable[[], bool] = lambda: False) -> OutboxReport:
+        report = OutboxReport()
+        batch_size = batch_size or settings.MAIL_OUTBOX_BATCH_SIZE
+        while not should_stop():
+            batch = self.repo.claim_batch(self.worker_id, batch_size, settings.MAIL_OUTBOX_LEASE_SECONDS)
+            if not batch:
+                break
+            for entry in batch:
+                self._deliver(entry, report)
+            self.db.commit()
+            if len(batch) < batch_size:
+                break
+        return report
+
+    def purge(self, batch_size: Optional[int] = None) -> int:
+        batch_size = batch_size or settings.MAIL_OUTBOX_BATCH_SIZE
+        before = datetime.now(timezone.utc) - timedelta(seconds=settings.MAIL_OUTBOX_RETENTION_SECONDS)
+        purged = 0
+        while (count := self.repo.purge_finished(before, batch_size)):
+            purged += count
+        return purged
+
+    def _deliver(self, entry, report: OutboxReport):
+        try:
+            body = render_template(entry.template, entry.context)
+            self.mailer.send(build_message([entry.recipient], entry.subject, body))
+        except Exception as e:
+            delay = self.retry_delay(entry.attempts + 1)
+            self.repo.mark_failed(entry, f"{type(e).__name__}: {e}", delay, commit=False)
+            outcome = "retry" if delay is not None else "failed"
+            logger.warning("mail delivery failed", extra={
+                "outbox_id": entry.id, "attempts": entry.attempts, "outcome": outcome, "error": repr(e),
+            })
+            if delay is None:
+                report.failed += 1
+            else:
+                report.retried += 1
+        else:
+            self.repo.mark_sent(entry, commit=False)
+            outcome = "sent"
+            report.sent += 1
+        if instrumentation.enabled():
+            instrumentation.MAIL_DELIVERIES.inc(outcome=outcome)
+
+
+class MailOutboxWorker(PeriodicJob):
+    """Distribution continue de la file ; la connexion SMTP est conservée entre les passes."""
+
+    name = "mail-outbox"
+    quiet = True
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: Optional[float] = None, mailer=None):
+        super().__init__(session_factory, interval_seconds or settings.MAIL_OUTBOX_INTERVAL_SECONDS)
+        self.mailer = mailer or get_mailer()
+        self.worker_id = str(uuid.uuid4())
+        self._next_purge = 0.0
+
+    def run(self, db: Session) -> OutboxReport:
+        service = MailOutboxService(db, self.mailer, self.worker_id)
+        report = service.drain(should_stop=lambda: self.stopping)
+        # Purge espacée : la file est distribuée toutes les quelques secondes
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + settings.MAIL_OUTBOX_PURGE_INTERVAL_SECONDS
+            report.purged = service.purge()
+        return report
+
+    def stop(self, timeout: Optional[float] = None):
+        super().stop(timeout)
+        self.mailer.close()
@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicJob
+from src.core.config import settings
+from src.models import Image
+from src.repositories.image_repository import ImageRepository
+from src.repositories.signature_repository import SignatureRepository
+from src.storage import ORIGINALS_PREFIX, SIGNED_PREFIX, MediaStorage, StoredObject, get_storage
+
+logger = logging.getLogger(__name__)
+
+# Fichiers temporaires laissés par une requête interrompue : ingestion et écriture atomique dans le dossier
+# de staging, ancien save_temp ("temp_") uniquement dans son dossier historique
+TEMP_PREFIXES = (".incoming_", ".put_")
+LEGACY_TEMP_PREFIXES = ("temp_",)
+LEGACY_TEMP_DIRS = (os.path.join("src", "media", "images"),)
+
+
+@dataclass
+class GCReport:
+    temp_files: int = 0
+    signed_outputs: int = 0
+    originals: int = 0
+    image_rows: int = 0
+    reclaimed_bytes: int = 0
+    errors: int = 0
+    duration_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, kind: str, size: int):
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+            self.reclaimed_bytes += size
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class _BoundedExecutor:
+    """Pool de threads dont la file d'attente est bornée : le parcours ne prend jamais d'avance illimitée."""
+
+    def __init__(self, workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-gc")
+        self._slots = threading.BoundedSemaphore(workers * 2)
+
+    def submit(self, fn: Callable, *args):
+        self._slots.acquire()
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class MediaGCService:
+    """
+    Supprime les fichiers orphelins : temporaires abandonnés, images signées sans référence,
+    originaux sans ligne en base et images jamais signées. Seuls les éléments plus vieux
+    que le délai de grâce sont concernés, pour ne pas toucher une requête en cours.
+    """
+
+    def __init__(self, db: Session, storage: Optional[MediaStorage] = None):
+        self.db = db
+        self.storage = storage or get_storage()
+        self.image_repo = ImageRepository(db, self.storage)
+        self.signature_repo = SignatureRepository(db)
+
+    def collect(
+        self,
+        grace_seconds: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        io_concurrency: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> GCReport:
+        grace_seconds = settings.MEDIA_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        batch_size = batch_size or settings.MEDIA_GC_BATCH_SIZE
+        io_concurrency = io_concurrency or settings.MEDIA_GC_IO_CONCURRENCY
+        cutoff = time.time() - grace_seconds
+
+        report = GCReport()
+        started = time.monotonic()
+        executor = _BoundedExecutor(io_concurrency)
+        self._dry_run = dry_run
+        try:
+            self._collect_temp_files(cutoff, report, executor)
+            self._collect_objects(SIGNED_PREFIX, self.signature_repo.existing_output_keys, "signed_outputs",
+                                  cutoff, batch_size, report, executor)
+            self._collect_objects(ORIGINALS_PREFIX, self.image_repo.existing_file_paths, "originals",
+                                  cutoff, batch_size, report, executor)
+        finally:
+            executor.shutdown()
+        # Les lignes d'images sont supprimées dans le thread de la session
+        self._collect_superseded_originals(cutoff, batch_size, report)
+        self._collect_unreferenced_images(cutoff, batch_size, report)
+
+        report.duration_seconds = round(time.monotonic() - started, 3)
+        return report
+
+    # ---------- temporaires ----------
+    def _temp_dirs(self) -> list[tuple[str, tuple[str, ...]]]:
+        return [(self.storage.staging_dir(), TEMP_PREFIXES), *((d, LEGACY_TEMP_PREFIXES) for d in LEGACY_TEMP_DIRS)]
+
+    def _collect_temp_files(self, cutoff: float, report: GCReport, executor: _BoundedExecutor):
+        for directory, prefixes in self._temp_dirs():
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if not entry.name.startswith(prefixes) or not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat()
+                    if st.st_mtime < cutoff:
+                        executor.submit(self._remove_file, entry.path, st.st_size, report)
+
+    def _remove_file(self, path: str, size: int, report: GCReport):
+        try:
+            if not self._dry_run:
+                os.remove(path)
+            report.add("temp_files", size)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.exception("media GC: failed to remove %s", path)
+            report.error()
+
+    # ---------- objets du stockage ----------
+    def _collect_objects(
+        self,
+        prefix: str,
+        referenced: Callable[[Iterable[str]], set[str]],
+        kind: str,
+        cutoff: float,
+        batch_size: int,
+        report: GCReport,
+        executor: _BoundedExecutor,
+    ):
+        old_objects = (obj for obj in self.storage.list(prefix) if obj.modified_at < cutoff)
+        for batch in _batched(old_objects, batch_size):
+            known = referenced(obj.key for obj in batch)
+            for obj in batch:
+                if obj.key not in known:
+                    executor.submit(self._delete_object, obj, kind, report)
+
+    def _delete_object(self, obj: StoredObject, kind: str, report: GCReport):
+        try:
+            if self._dry_run or self.storage.delete(obj.key):
+                report.add(kind, obj.size)
+        except Exception:
+            logger.exception("media GC: failed to delete %s", obj.key)
+            report.error()
+
+    # ---------- anciennes clés de recompression ----------
+    def _collect_superseded_originals(self, cutoff: float, batch_size: int, report: GCReport):
+        recompressed_before = datetime.fromtimestamp(cutoff, tz=timezone.utc)
+        while images := self.image_repo.list_superseded(recompressed_before, batch_size):
+            if self._dry_run:
+                report.originals += len(images)
+                return
+            cleared = [image.id for image in images if self._delete_original(image.superseded_file_path, report)]
+            self.image_repo.clear_superseded(cleared)
+            report.originals += len(cleared)
+            if len(cleared) < len(images):
+                # Échecs de suppression : repris au passage suivant plutôt que relus en boucle
+                return
+
+    # ---------- images jamais signées ----------
+    def _collect_unreferenced_images(self, cutoff: float, batch_size: int, report: GCReport):
+        uploaded_before = datetime.fromtimestamp(cutoff, tz=timezone.utc)
+        after_id = 0
+        while images := self.image_repo.lock_unreferenced(uploaded_before, after_id, batch_size):
+            after_id = images[-1].id
+            if self._dry_run:
+                report.image_rows += len(images)
+                self.db.rollback()
+                return
+            # Fichiers supprimés sous le verrou des lignes, avant leur suppression : un upload concurrent
+            # du même contenu attend le commit, puis réinsère la ligne et réécrit le fichier
+            deleted = [image.id for image in images if self._delete_originals(image, report)]
+            self.image_repo.delete_many(deleted)
+            report.image_rows += len(deleted)
+
+    def _delete_originals(self, image: Image, report: GCReport) -> bool:
+        keys = [key for key in (image.file_path, image.superseded_file_path) if key]
+        return all([self._delete_original(key, report) for key in keys])
+
+    def _delete_original(self, key: str, report: GCReport) -> bool:
+        try:
+            if os.path.isabs(key):
+                # Chemin absolu d'avant le stockage réparti, non importé par src.storage.reshard
+                self._delete_legacy_file(key, report)
+                return True
+            stored = self.storage.stat(key)
+            if stored and self.storage.delete(key):
+                report.reclaimed_bytes += stored.size
+            return True
+        except Exception:
+            # Ligne conservée : reprise au passage suivant
+            logger.exception("media GC: failed to delete %s", key)
+            report.error()
+            return False
+
+    @staticmethod
+    def _delete_legacy_file(path: str, report: GCReport):
+        try:
+            size = os.stat(path).st_size
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        report.reclaimed_bytes += size
+
+
+class MediaGCScheduler(PeriodicJob):
+    """Exécute le GC des médias périodiquement, hors des workers de requêtes."""
+
+    name = "media-gc"
+    exclusive = True
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: Optional[int] = None):
+        super().__init__(session_factory, interval_seconds or settings.MEDIA_GC_INTERVAL_SECONDS)
+
+    def run(self, db: Session) -> GCReport:
+        return MediaGCService(db).collect()
@@ -13,8 +13,8 @@ class PasswordResetTokenService:
         self.db = db
         self.password_reset_token_repository = password_reset_token_repository
 
-    def create_reset_token(self, user_id: int, ip_address: str, token: str, expires_at: str) -> PasswordResetToken:
-        return self.password_reset_token_repository.create(user_id, ip_address, token, expires_at)
+    def create_reset_token(self, user_id: int, ip_address: str, token: str, expires_at: str, commit: bool = True) -> PasswordResetToken:
+        return self.password_reset_token_repository.create(user_id, ip_address, token, expires_at, commit)
 
 
     def get_valid_token(self, token: str, raise_exc: bool = False) -> PasswordResetToken:
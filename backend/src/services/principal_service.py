@@ -0,0 +1,118 @@
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.cache import Cache
+from src.core.config import settings
+from src.exceptions.auth_exception import InactiveUserException, InvalidCredentialsException, NotAuthenticatedException
+from src.repositories.user_role_repository import UserRoleRepository
+from src.repositories.user_status_repository import UserStatusRepository
+from src.schemas.auth_schema import Principal, TokenPayload
+from src.schemas.status_schema import StatusEnum
+from src.utils.security import ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE, decode_jwt, token_type_matches
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalService:
+    """
+    Authentification des requêtes : les jetons sont vérifiés sans base de données, l'identité
+    (statut et rôles de l'utilisateur) est lue dans le cache « principals » et n'est chargée depuis
+    la base qu'en cas d'absence ou d'expiration (PRINCIPAL_CACHE_TTL_SECONDS).
+
+    Toute modification du statut ou des rôles invalide l'entrée (UserStatusService, UserRoleService).
+    Avec le cache « memory », l'invalidation ne touche que le processus courant : les autres workers
+    voient le changement au plus tard après PRINCIPAL_CACHE_TTL_SECONDS (voir check_cache_sharing).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        user_status_repository: UserStatusRepository,
+        user_role_repository: UserRoleRepository,
+        cache: Cache
+    ):
+        self.db = db
+        self.user_status_repository = user_status_repository
+        self.user_role_repository = user_role_repository
+        self.cache = cache.namespaced("principals")
+        self.ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+
+    @staticmethod
+    def token_subject(token: Optional[str], token_type: str) -> int:
+        if not token:
+            raise NotAuthenticatedException()
+        payload = TokenPayload(**decode_jwt(token))
+        if not token_type_matches(payload.type, token_type):
+            raise InvalidCredentialsException()
+        return payload.sub
+
+
+    def authenticate(self, access_token: Optional[str], refresh_token: Optional[str]) -> Principal:
+        refresh_user_id = self.token_subject(refresh_token, REFRESH_TOKEN_TYPE)
+        access_user_id = self.token_subject(access_token, ACCESS_TOKEN_TYPE)
+        # Les deux jetons doivent appartenir au même utilisateur
+        if access_user_id != refresh_user_id:
+            raise InvalidCredentialsException()
+        return self.active_principal(access_user_id)
+
+
+    def authenticate_access_token(self, access_token: Optional[str]) -> Principal:
+        """Jeton d'accès seul (middleware, sans cookie) : mêmes contrôles de type et de statut."""
+        return self.active_principal(self.token_subject(access_token, ACCESS_TOKEN_TYPE))
+
+
+    def active_principal(self, user_id: int) -> Principal:
+        principal = self.get(user_id)
+        if principal is None:
+            raise InvalidCredentialsException()
+        if principal.status != StatusEnum.ACTIVE:
+            raise InactiveUserException()
+        return principal
+
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        if self.ttl <= 0:
+            return self._load(user_id)
+        value = self.cache.get_or_set(str(user_id), lambda: self._dump(self._load(user_id)), ttl=self.ttl)
+        return Principal(**value) if value is not None else None
+
+
+    def invalidate(self, user_id: int):
+        """
+        Invalide l'identité mise en cache, immédiatement puis au prochain commit de la session : une
+        requête concurrente qui l'aurait rechargée avant le commit remettrait sinon l'ancien état en cache.
+        """
+        self.cache.delete(str(user_id))
+        event.listen(self.db, "after_commit", lambda session: self.cache.delete(str(user_id)), once=True)
+
+
+    def _load(self, user_id: int) -> Optional[Principal]:
+        # Tout utilisateur reçoit un statut à sa création : sans statut, l'utilisateur n'existe pas
+        status = self.user_status_repository.get_latest_status(user_id)
+        if status is None:
+            return None
+        return Principal(id=user_id, status=status, roles=self.user_role_repository.get_role_names(user_id))
+
+    @staticmethod
+    def _dump(principal: Optional[Principal]) -> Optional[dict]:
+        return principal.model_dump(mode="json") if principal is not None else None
+
+
+def check_cache_sharing() -> bool:
+    """
+    Au démarrage : signale un cache de principals propre à chaque processus alors que plusieurs workers
+    tournent (WEB_CONCURRENCY, lu par uvicorn). Retourne False si la fenêtre d'obsolescence s'applique.
+    """
+    workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    if settings.CACHE_BACKEND != "memory" or workers <= 1 or settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return True
+    logger.warning(
+        "principal cache is per process with %d workers: deactivations and role changes may take up to "
+        "%ss to apply in other workers; set CACHE_BACKEND=redis or lower PRINCIPAL_CACHE_TTL_SECONDS",
+        workers, settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+    return False
@@ -0,0 +1,160 @@
+import logging
+import time
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Optional
+
+from PIL import Image as PILImage
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicJob
+from src.core.config import settings
+from src.models import Image
+from src.repositories.image_repository import ImageRepository
+from src.storage import ORIGINALS_PREFIX, MediaStorage, get_storage
+
+logger = logging.getLogger(__name__)
+
+# Formats recompressés sans perte en PNG ; les autres (JPEG...) sont laissés tels quels
+RECOMPRESSIBLE_FORMATS = {"BMP", "PNG", "TIFF"}
+
+
+@dataclass
+class RecompressionReport:
+    scanned: int = 0
+    recompressed: int = 0
+    skipped: int = 0
+    errors: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+class Throttle:
+    """
+    Budget CPU et I/O d'un worker de fond.
+    Après chaque unité de travail, dort assez longtemps pour que la part de temps actif reste sous
+    cpu_budget (0-1] et que le débit d'octets lus + écrits reste sous io_bytes_per_second.
+    """
+
+    def __init__(self, cpu_budget: float, io_bytes_per_second: int, sleep: Callable[[float], None] = time.sleep):
+        if not 0 < cpu_budget <= 1:
+            raise ValueError("cpu_budget must be in (0, 1]")
+        self.cpu_budget = cpu_budget
+        self.io_bytes_per_second = io_bytes_per_second
+        self._sleep = sleep
+
+    def pause(self, busy_seconds: float, io_bytes: int) -> float:
+        cpu_wait = busy_seconds * (1 / self.cpu_budget - 1)
+        io_wait = (io_bytes / self.io_bytes_per_second - busy_seconds) if self.io_bytes_per_second else 0
+        wait = max(cpu_wait, io_wait, 0)
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+def _recompress_png(data) -> Optional[bytes]:
+    """Réencode l'image en PNG (zlib niveau 9, optimisé) et vérifie l'égalité des pixels."""
+    with PILImage.open(BytesIO(data)) as source:
+        if source.format not in RECOMPRESSIBLE_FORMATS or getattr(source, "n_frames", 1) > 1:
+            return None
+        source.load()
+        out = BytesIO()
+        save_kwargs = {"format": "PNG", "compress_level": 9, "optimize": True}
+        for key in ("icc_profile", "transparency", "gamma", "dpi"):
+            if key in source.info:
+                save_kwargs[key] = source.info[key]
+        source.save(out, **save_kwargs)
+
+        candidate = out.getvalue()
+        with PILImage.open(BytesIO(candidate)) as result:
+            result.load()
+            if result.mode != source.mode or result.size != source.size or result.tobytes() != source.tobytes():
+                return None
+            if source.mode == "P" and result.getpalette() != source.getpalette():
+                return None
+    return candidate
+
+
+class RecompressionService:
+    """
+    Recompresse sans perte les originaux stockés (BMP -> PNG, PNG mal compressé -> PNG optimisé).
+    Le nouveau fichier n'est retenu que si les pixels sont identiques et qu'il est plus petit ;
+    l'image est alors écrite sous sa nouvelle clé avant que la ligne Image ne soit basculée.
+    """
+
+    def __init__(self, db: Session, storage: Optional[MediaStorage] = None, throttle: Optional[Throttle] = None):
+        self.db = db
+        self.storage = storage or get_storage()
+        self.image_repo = ImageRepository(db, self.storage)
+        self.throttle = throttle or Throttle(settings.RECOMPRESS_CPU_BUDGET, settings.RECOMPRESS_IO_BYTES_PER_SECOND)
+
+    def run(self, batch_size: Optional[int] = None, should_stop: Callable[[], bool] = lambda: False) -> RecompressionReport:
+        report = RecompressionReport()
+        batch_size = batch_size or settings.RECOMPRESS_BATCH_SIZE
+        last_id = 0
+        while not should_stop():
+            image_ids = self.image_repo.list_recompression_candidates(
+                after_id=last_id, limit=batch_size, max_attempts=settings.RECOMPRESS_MAX_ATTEMPTS
+            )
+            if not image_ids:
+                break
+            for image_id in image_ids:
+                if should_stop():
+                    break
+                # Curseur : une image en échec n'est retentée qu'à la passe suivante
+                last_id = image_id
+                image = self.image_repo.lock_for_recompression(image_id)
+                if image is None:
+                    self.db.rollback()
+                    continue
+                report.scanned += 1
+                started = time.monotonic()
+                io_bytes = self._process(image, report)
+                self.throttle.pause(time.monotonic() - started, io_bytes)
+        return report
+
+    def _process(self, image: Image, report: RecompressionReport) -> int:
+        """Traite une image verrouillée et retourne le nombre d'octets lus et écrits ; chaque issue commit."""
+        try:
+            data = self.storage.read(image.file_path)
+            candidate = _recompress_png(data)
+            if candidate is None or len(candidate) >= len(data):
+                report.skipped += 1
+                self.image_repo.mark_recompressed(image, file_size=len(data))
+                return len(data)
+
+            new_key = f"{ORIGINALS_PREFIX}{image.sha256_hash}.png"
+            # put est atomique : pour une même clé (PNG -> PNG), les lecteurs voient l'ancien ou le nouveau fichier.
+            # Une ancienne clé différente est conservée (superseded_file_path) : un upload ou une signature
+            # en cours peut encore la lire ; le GC la supprime après le délai de grâce.
+            self.storage.put(new_key, candidate)
+            self.image_repo.mark_recompressed(image, file_path=new_key, mime_type="image/png", file_size=len(candidate))
+        except Exception:
+            # Erreur peut-être transitoire : recompressed_at reste vide, l'image sera retentée
+            logger.exception("recompression: failed to process image %s", image.id)
+            report.errors += 1
+            self.db.rollback()
+            image = self.image_repo.lock_for_recompression(image.id)
+            if image is not None:
+                self.image_repo.record_recompression_failure(image)
+            else:
+                self.db.rollback()
+            return 0
+
+        report.recompressed += 1
+        report.bytes_before += len(data)
+        report.bytes_after += len(candidate)
+        return len(data) + len(candidate)
+
+
+class RecompressionScheduler(PeriodicJob):
+    """Passe de recompression périodique, à basse priorité."""
+
+    name = "media-recompression"
+    exclusive = True
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: Optional[int] = None):
+        super().__init__(session_factory, interval_seconds or settings.RECOMPRESS_INTERVAL_SECONDS)
+
+    def run(self, db: Session) -> RecompressionReport:
+        return RecompressionService(db).run(should_stop=lambda: self.stopping)
@@ -1,10 +1,19 @@
+import logging
+import os
+import time
+from io import BytesIO
 from PIL import Image
 import zlib
 from collections import Counter
 from sqlalchemy.orm import Session
 
+from src.core.instrumentation import observe_image, stage
+
 END_MARKER = '0110110011001101'
 
+# Module chargé par chemin de fichier (nom avec tiret) : le nom du logger est fixé explicitement
+logger = logging.getLogger("src.services.stegano_lsb")
+
 class SteganoLSBService:
     def __init__(self, db: Session):
         self.db = db
@@ -25,10 +34,39 @@ class SteganoLSBService:
     def from_bitstring(bits: str) -> bytes:
         return bytes(int(bits[i:i+8], 2) for i in range(0, len(bits), 8))
 
+    @staticmethod
+    def image_format_for(extension: str) -> str:
+        """Format Pillow correspondant à une extension de fichier (PNG par défaut)."""
+        extension = extension.lower()
+        if extension == '.bitmap':
+            return 'BMP'
+        return Image.registered_extensions().get(extension, 'PNG')
+
     def hide_message(self, input_path: str, output_path: str, message: str, repeat: int = 5):
-        img = Image.open(input_path)
+        img = self._hide_in_image(Image.open(input_path), message, repeat)
+        img.save(output_path, format=self.image_format_for(os.path.splitext(output_path)[1]))
+
+    def hide_message_buffer(self, image_data, message: str, repeat: int = 5, image_format: str = 'PNG') -> memoryview:
+        """Cache un message dans une image fournie en mémoire et retourne l'image encodée."""
+        img = self._hide_in_image(self._decode(image_data), message, repeat)
+        out = BytesIO()
+        with stage("encode"):
+            img.save(out, format=image_format)
+        return out.getbuffer()
+
+    @staticmethod
+    def _decode(image_data) -> Image.Image:
+        with stage("decode"):
+            img = Image.open(BytesIO(image_data))
+            img.load()
+        observe_image(*img.size)
+        return img
+
+    def _hide_in_image(self, img: Image.Image, message: str, repeat: int) -> Image.Image:
+        started = time.perf_counter()
         if img.mode not in ['RGB', 'RGBA']:
-            img = img.convert('RGBA')
+            with stage("colour_conversion"):
+                img = img.convert('RGBA')
 
         pixels = list(img.getdata())
         total_pixels = len(pixels)
@@ -42,6 +80,15 @@ class SteganoLSBService:
         if bits_per_copy > pixels_per_copy * 3:
             raise ValueError("❌ Message trop long pour l'image ou pour le nombre de répétitions.")
 
+        with stage("embed"):
+            self._embed_bits(img, pixels, bitstring_unit, repeat, pixels_per_copy)
+        logger.debug("lsb embed done", extra={
+            "payload_bytes": len(compressed), "bits_per_copy": bits_per_copy, "pixels": total_pixels,
+            "repeat": repeat, "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+        return img
+
+    def _embed_bits(self, img: Image.Image, pixels: list, bitstring_unit: str, repeat: int, pixels_per_copy: int):
         new_pixels = pixels[:]
         for i in range(repeat):
             bit_idx = 0
@@ -67,17 +114,49 @@ class SteganoLSBService:
                 new_pixels[j] = (r, g, b, new_pixels[j][3]) if img.mode == 'RGBA' else (r, g, b)
 
         img.putdata(new_pixels)
-        img.save(output_path)
-        print(f"✅ Message caché avec redondance répartie sur {repeat} zones.")
 
     def extract_message(self, image_path: str, repeat: int = 5) -> str:
-        img = Image.open(image_path)
+        return self._extract_from_image(Image.open(image_path), repeat)
+
+    def extract_message_buffer(self, image_data, repeat: int = 5) -> str:
+        """Extrait le message d'une image fournie en mémoire."""
+        return self._extract_from_image(self._decode(image_data), repeat)
+
+    def read_bits_buffer(self, image_data, bit_count: int, repeat: int = 5) -> str:
+        """
+        Premiers bits de chaque zone, fusionnés position par position par vote majoritaire, sans
+        interprétation : sert à mesurer le taux d'erreur binaire d'une image altérée.
+        """
+        img = self._decode(image_data)
+        pixels = list(img.convert('RGB').getdata()) if img.mode not in ['RGB', 'RGBA'] else list(img.getdata())
+        pixels_per_zone = len(pixels) // repeat
+        pixels_needed = -(-bit_count // 3)
+        zones = []
+        for i in range(repeat):
+            start = i * pixels_per_zone
+            zone_pixels = pixels[start:start + min(pixels_needed, pixels_per_zone)]
+            zones.append(''.join(str(channel & 1) for pixel in zone_pixels for channel in pixel[:3])[:bit_count])
+        return ''.join(
+            '1' if 2 * sum(zone[k] == '1' for zone in zones if k < len(zone)) > len(zones) else '0'
+            for k in range(bit_count)
+        )
+
+    def _extract_from_image(self, img: Image.Image, repeat: int) -> str:
         if img.mode not in ['RGB', 'RGBA']:
             raise ValueError("❌ Image non supportée")
 
         pixels = list(img.getdata())
         total_pixels = len(pixels)
         pixels_per_zone = total_pixels // repeat
+        with stage("vote"):
+            messages = self._read_zones(pixels, total_pixels, pixels_per_zone, repeat)
+
+        if not messages:
+            return "❌ Aucun message lisible trouvé."
+
+        return Counter(messages).most_common(1)[0][0]
+
+    def _read_zones(self, pixels: list, total_pixels: int, pixels_per_zone: int, repeat: int) -> list:
         messages = []
 
         for i in range(repeat):
@@ -100,10 +179,7 @@ class SteganoLSBService:
                 if bits.endswith(END_MARKER):
                     break
 
-        if not messages:
-            return "❌ Aucun message lisible trouvé."
-
-        return Counter(messages).most_common(1)[0][0]
+        return messages
 
 
 
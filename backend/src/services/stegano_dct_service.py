@@ -3,15 +3,22 @@ import cv2
 import numpy as np
 import zlib
 import hashlib
+import logging
 import random
+import time
 import base64
 import os
-from typing import Tuple
+import uuid
+from typing import Optional, Tuple
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from sqlalchemy.orm import Session
 
+from src.core.instrumentation import observe_image, stage
+
+logger = logging.getLogger(__name__)
+
 
 class SteganoDCTService:
     """
@@ -33,14 +40,18 @@ class SteganoDCTService:
             salt=salt,
             iterations=iterations,
         )
-        return kdf.derive(password.encode())
+        with stage("pbkdf2"):
+            return kdf.derive(password.encode())
 
-    def aes_encrypt(self, plaintext: bytes, password: str) -> bytes:
+    def aes_encrypt(self, plaintext: bytes, password: str, salt: Optional[bytes] = None) -> bytes:
         """
         Chiffre des données avec AES-GCM.
         Return bytes: salt(16) || nonce(12) || tag+ciphertext
         """
-        salt = os.urandom(16)
+        if salt is None:
+            salt = os.urandom(16)
+        if len(salt) != 16:
+            raise ValueError("Le sel AES doit faire 16 octets")
         key = self._derive_key(password, salt)
         aesgcm = AESGCM(key)
         nonce = os.urandom(12)
@@ -98,6 +109,32 @@ class SteganoDCTService:
             x = (x << 1) | int(b)
         return x
 
+    # ---------- Décodage / encodage en mémoire ----------
+    def _decode_image(self, image_data) -> np.ndarray:
+        """Décode une image (bytes ou memoryview) en tableau BGR sans passer par le disque."""
+        with stage("decode"):
+            img_bgr = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img_bgr is None:
+            raise ValueError("Image invalide ou format non supporté.")
+        observe_image(img_bgr.shape[1], img_bgr.shape[0])
+        return img_bgr
+
+    def _encode_image(self, img_bgr: np.ndarray, image_format: str, jpeg_quality: int) -> memoryview:
+        """Encode un tableau BGR au format demandé (extension, ex: '.png')."""
+        image_format = image_format.lower()
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality] if image_format in (".jpg", ".jpeg") else []
+        with stage("encode"):
+            ok, encoded = cv2.imencode(image_format, img_bgr, params)
+        if not ok:
+            raise ValueError(f"Encodage {image_format} impossible.")
+        return memoryview(encoded.reshape(-1))
+
+    def _read_file(self, in_path: str) -> bytes:
+        if not os.path.isfile(in_path):
+            raise FileNotFoundError("Image non trouvée.")
+        with open(in_path, "rb") as f:
+            return f.read()
+
     # ---------- Embedding (now accepts bytes payload) ----------
     def embed_message_bytes(
         self,
@@ -113,18 +150,46 @@ class SteganoDCTService:
         """
         Intègre des données binaires dans une image en utilisant la DCT.
         """
-        img_bgr = cv2.imread(in_path)
-        if img_bgr is None:
-            raise FileNotFoundError("Image non trouvée.")
-        img_ycc = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb).astype(np.float32)
+        encoded = self.embed_message_bytes_buffer(
+            image_data=self._read_file(in_path),
+            payload_bytes=payload_bytes,
+            key=key,
+            strength=strength,
+            redundancy=redundancy,
+            channel_choice=channel_choice,
+            jpeg_quality=jpeg_quality,
+            image_format=os.path.splitext(out_path)[1] or ".png",
+        )
+        with open(out_path, "wb") as f:
+            f.write(encoded)
+
+    def embed_message_bytes_buffer(
+        self,
+        image_data,
+        payload_bytes: bytes,
+        key: str,
+        strength: float = 20.0,
+        redundancy: int = 20,
+        channel_choice: str = "Y",
+        jpeg_quality: int = 100,
+        image_format: str = ".png"
+    ) -> memoryview:
+        """
+        Intègre des données binaires dans une image en mémoire et retourne l'image encodée.
+        """
+        started = time.perf_counter()
+        img_bgr = self._decode_image(image_data)
+        with stage("colour_conversion"):
+            img_ycc = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb).astype(np.float32)
         ch_map = {"Y":0, "Cr":1, "Cb":2}
         ch_idx = ch_map.get(channel_choice, 0)
         channel = img_ycc[:,:,ch_idx]
 
-        blocks, orig_shape, padded_shape = self._blocks_from_channel(channel)
-        dct_blocks = np.empty_like(blocks)
-        for i, blk in enumerate(blocks):
-            dct_blocks[i] = cv2.dct(blk)
+        with stage("dct"):
+            blocks, orig_shape, padded_shape = self._blocks_from_channel(channel)
+            dct_blocks = np.empty_like(blocks)
+            for i, blk in enumerate(blocks):
+                dct_blocks[i] = cv2.dct(blk)
 
         # Payload packaging: [4 bytes len] + payload + [4 bytes CRC]
         length = len(payload_bytes)
@@ -135,106 +200,151 @@ class SteganoDCTService:
             bits.extend(self._int_to_bits(b, 8))
         total_bits = len(bits)
 
-        print(f"Total bits à intégrer: {total_bits}")
-
         num_blocks = dct_blocks.shape[0]
-        rng = random.Random(hashlib.sha256(key.encode()).digest())
-        all_indices = list(range(num_blocks))
-        rng.shuffle(all_indices)
-
         ci, cj = self._select_mid_coeff_positions()
 
-        positions = []
-        idx_cursor = 0
-        for bit_i in range(total_bits):
-            chosen = []
-            for r in range(redundancy):
-                chosen.append(all_indices[(idx_cursor + r) % num_blocks])
-            positions.append(chosen)
-            idx_cursor = (idx_cursor + redundancy) % num_blocks
-
-        print(f"Positions: {len(positions)} bits, {len(positions[0]) if positions else 0} blocs par bit")
-
-        for bit_i, bit in enumerate(bits):
-            d = self._bit_to_delta(bit, strength)
-            for bidx in positions[bit_i]:
-                # Vérifier si le bloc contient principalement du blanc ou du noir
-                block = blocks[bidx]
-                mean_val = np.mean(block)
-                if 15 < mean_val < 240:  # Éviter les zones trop noires (<15) et trop blanches (>240)
-                    val = dct_blocks[bidx, ci, cj]
-                    dct_blocks[bidx, ci, cj] = val + d
-
-        idct_blocks = np.empty_like(dct_blocks)
-        for i, b in enumerate(dct_blocks):
-            idct_blocks[i] = cv2.idct(b)
-
-        new_channel = self._channel_from_blocks(idct_blocks, orig_shape, padded_shape)
+        with stage("permutation"):
+            rng = random.Random(hashlib.sha256(key.encode()).digest())
+            all_indices = list(range(num_blocks))
+            rng.shuffle(all_indices)
+
+            positions = []
+            idx_cursor = 0
+            for bit_i in range(total_bits):
+                chosen = []
+                for r in range(redundancy):
+                    chosen.append(all_indices[(idx_cursor + r) % num_blocks])
+                positions.append(chosen)
+                idx_cursor = (idx_cursor + redundancy) % num_blocks
+
+        with stage("embed"):
+            for bit_i, bit in enumerate(bits):
+                d = self._bit_to_delta(bit, strength)
+                for bidx in positions[bit_i]:
+                    # Vérifier si le bloc contient principalement du blanc ou du noir
+                    block = blocks[bidx]
+                    mean_val = np.mean(block)
+                    if 15 < mean_val < 240:  # Éviter les zones trop noires (<15) et trop blanches (>240)
+                        val = dct_blocks[bidx, ci, cj]
+                        dct_blocks[bidx, ci, cj] = val + d
+
+        with stage("idct"):
+            idct_blocks = np.empty_like(dct_blocks)
+            for i, b in enumerate(dct_blocks):
+                idct_blocks[i] = cv2.idct(b)
+
+            new_channel = self._channel_from_blocks(idct_blocks, orig_shape, padded_shape)
         img_ycc[:,:,ch_idx] = new_channel
-        img_out = cv2.cvtColor(img_ycc.astype(np.uint8), cv2.COLOR_YCrCb2BGR)
-        cv2.imwrite(out_path, img_out, [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality])
-        print(f"Embed done — bits: {total_bits}, redundancy: {redundancy}, strength: {strength}")
+        with stage("colour_conversion"):
+            img_out = cv2.cvtColor(img_ycc.astype(np.uint8), cv2.COLOR_YCrCb2BGR)
+        encoded = self._encode_image(img_out, image_format, jpeg_quality)
+        logger.debug("dct embed done", extra={
+            "payload_bytes": length, "total_bits": total_bits, "blocks": num_blocks,
+            "redundancy": redundancy, "strength": strength, "channel": channel_choice,
+            "output_bytes": encoded.nbytes, "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+        return encoded
 
     # ---------- Extraction (returns bytes payload) ----------
-    def extract_message_bytes(
+    def read_bits_buffer(
         self,
-        in_path: str,
+        image_data,
         key: str,
+        bit_count: int,
         redundancy: int = 20,
-        channel_choice: str = "Y",
-        max_message_bytes: int = 1000
-    ) -> bytes:
+        channel_choice: str = "Y"
+    ) -> list:
         """
-        Extrait des données binaires d'une image stéganographiée.
+        Bits lus (vote majoritaire sur les blocs redondants) en tête du flux intégré, sans
+        interprétation : sert à mesurer le taux d'erreur binaire d'une image altérée.
         """
-        img_bgr = cv2.imread(in_path)
-        if img_bgr is None:
-            raise FileNotFoundError("Image non trouvée.")
-        img_ycc = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb).astype(np.float32)
+        return self._read_bits(image_data, key, bit_count, redundancy, channel_choice)[0]
+
+    def _read_bits(self, image_data, key: str, bit_count: int, redundancy: int, channel_choice: str) -> Tuple[list, int]:
+        img_bgr = self._decode_image(image_data)
+        with stage("colour_conversion"):
+            img_ycc = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb).astype(np.float32)
         ch_map = {"Y":0, "Cr":1, "Cb":2}
         ch_idx = ch_map.get(channel_choice, 0)
         channel = img_ycc[:,:,ch_idx]
 
-        blocks, orig_shape, padded_shape = self._blocks_from_channel(channel)
-        dct_blocks = np.empty_like(blocks)
-        for i, blk in enumerate(blocks):
-            dct_blocks[i] = cv2.dct(blk)
+        with stage("dct"):
+            blocks, orig_shape, padded_shape = self._blocks_from_channel(channel)
+            dct_blocks = np.empty_like(blocks)
+            for i, blk in enumerate(blocks):
+                dct_blocks[i] = cv2.dct(blk)
 
         num_blocks = dct_blocks.shape[0]
-        rng = random.Random(hashlib.sha256(key.encode()).digest())
-        all_indices = list(range(num_blocks))
-        rng.shuffle(all_indices)
-
         ci, cj = self._select_mid_coeff_positions()
 
-        max_header_bits = (4 + max_message_bytes + 4) * 8
-        positions = []
-        idx_cursor = 0
-        for bit_i in range(max_header_bits):
-            chosen = []
-            for r in range(redundancy):
-                chosen.append(all_indices[(idx_cursor + r) % num_blocks])
-            positions.append(chosen)
-            idx_cursor = (idx_cursor + redundancy) % num_blocks
+        with stage("permutation"):
+            rng = random.Random(hashlib.sha256(key.encode()).digest())
+            all_indices = list(range(num_blocks))
+            rng.shuffle(all_indices)
 
-        print(f"Positions d'extraction: {len(positions)} bits, {len(positions[0]) if positions else 0} blocs par bit")
+            positions = []
+            idx_cursor = 0
+            for bit_i in range(bit_count):
+                chosen = []
+                for r in range(redundancy):
+                    chosen.append(all_indices[(idx_cursor + r) % num_blocks])
+                positions.append(chosen)
+                idx_cursor = (idx_cursor + redundancy) % num_blocks
 
         bits = []
-        for bit_i in range(max_header_bits):
-            votes = []
-            for bidx in positions[bit_i]:
-                val = dct_blocks[bidx, ci, cj]
-                votes.append(1 if val > 0 else 0)
-            bit = 1 if sum(votes) >= (len(votes)/2) else 0
-            bits.append(bit)
+        with stage("vote"):
+            for bit_i in range(bit_count):
+                votes = []
+                for bidx in positions[bit_i]:
+                    val = dct_blocks[bidx, ci, cj]
+                    votes.append(1 if val > 0 else 0)
+                bit = 1 if sum(votes) >= (len(votes)/2) else 0
+                bits.append(bit)
+        return bits, num_blocks
 
-        print(f"Bits extraits: {len(bits)}")
+    def extract_message_bytes(
+        self,
+        in_path: str,
+        key: str,
+        redundancy: int = 20,
+        channel_choice: str = "Y",
+        max_message_bytes: int = 1000
+    ) -> bytes:
+        """
+        Extrait des données binaires d'une image stéganographiée.
+        """
+        return self.extract_message_bytes_buffer(
+            image_data=self._read_file(in_path),
+            key=key,
+            redundancy=redundancy,
+            channel_choice=channel_choice,
+            max_message_bytes=max_message_bytes
+        )
+
+    def extract_message_bytes_buffer(
+        self,
+        image_data,
+        key: str,
+        redundancy: int = 20,
+        channel_choice: str = "Y",
+        max_message_bytes: int = 1000
+    ) -> bytes:
+        """
+        Extrait des données binaires d'une image stéganographiée fournie en mémoire.
+        """
+        started = time.perf_counter()
+        max_header_bits = (4 + max_message_bytes + 4) * 8
+        bits, num_blocks = self._read_bits(image_data, key, max_header_bits, redundancy, channel_choice)
 
         if len(bits) < 32:
             raise ValueError("Image trop petite.")
         len_bits = bits[:32]
         length = self._bits_to_int(len_bits)
-        print(f"Longueur du message: {length} octets")
+        logger.debug("dct extract header", extra={
+            "extracted_bits": len(bits), "payload_bytes": length, "blocks": num_blocks,
+            "redundancy": redundancy, "channel": channel_choice,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
         if length <= 0 or length > max_message_bytes:
             raise ValueError(f"Payload length invalide : {length}")
 
@@ -263,23 +373,58 @@ class SteganoDCTService:
         strength: float = 24.0,
         redundancy: int = 30,
         channel_choice: str = "Y",
-        jpeg_quality: int = 85
+        jpeg_quality: int = 85,
+        signature_uuid: Optional[str] = None
     ):
         """
         Intègre un message chiffré avec AES dans une image.
         """
+        encoded = self.embed_message_aes_buffer(
+            image_data=self._read_file(in_path),
+            message=message,
+            password=password,
+            key_positions_secret=key_positions_secret,
+            strength=strength,
+            redundancy=redundancy,
+            channel_choice=channel_choice,
+            jpeg_quality=jpeg_quality,
+            image_format=os.path.splitext(out_path)[1] or ".png",
+            signature_uuid=signature_uuid
+        )
+        with open(out_path, "wb") as f:
+            f.write(encoded)
+
+    def embed_message_aes_buffer(
+        self,
+        image_data,
+        message: str,
+        password: str,
+        key_positions_secret: str,
+        strength: float = 24.0,
+        redundancy: int = 30,
+        channel_choice: str = "Y",
+        jpeg_quality: int = 85,
+        image_format: str = ".png",
+        signature_uuid: Optional[str] = None
+    ) -> memoryview:
+        """
+        Intègre un message chiffré avec AES dans une image en mémoire.
+        Si signature_uuid est fourni, ses 16 octets servent de sel PBKDF2 : l'UUID
+        est ainsi récupérable à l'extraction sans consommer de capacité DCT.
+        """
+        salt = uuid.UUID(signature_uuid).bytes if signature_uuid else None
         # encrypt message bytes with AES-GCM, then base64-encode to keep binary-safe if you want text transport.
-        ciphertext = self.aes_encrypt(message.encode('utf-8'), password)
-        # We embed raw bytes (no base64 needed). embed_message_bytes accepts bytes.
-        self.embed_message_bytes(
-            in_path=in_path,
-            out_path=out_path,
+        ciphertext = self.aes_encrypt(message.encode('utf-8'), password, salt=salt)
+        # We embed raw bytes (no base64 needed). embed_message_bytes_buffer accepts bytes.
+        return self.embed_message_bytes_buffer(
+            image_data=image_data,
             payload_bytes=ciphertext,
             key=key_positions_secret,
             strength=strength,
             redundancy=redundancy,
             channel_choice=channel_choice,
-            jpeg_quality=jpeg_quality
+            jpeg_quality=jpeg_quality,
+            image_format=image_format
         )
 
     def extract_message_aes(
@@ -293,8 +438,31 @@ class SteganoDCTService:
         """
         Extrait et déchiffre un message d'une image stéganographiée.
         """
-        payload_bytes = self.extract_message_bytes(
-            in_path=in_path,
+        _, message = self.extract_signed_message_aes_buffer(
+            image_data=self._read_file(in_path),
+            password=password,
+            key_positions_secret=key_positions_secret,
+            redundancy=redundancy,
+            channel_choice=channel_choice
+        )
+        return message
+
+    def extract_signed_message_aes_buffer(
+        self,
+        image_data,
+        password: str,
+        key_positions_secret: str,
+        redundancy: int = 30,
+        channel_choice: str = "Y"
+    ) -> Tuple[Optional[str], str]:
+        """
+        Extrait et déchiffre un message d'une image en mémoire, et retourne l'UUID de
+        signature candidat porté par le sel.
+        Le sel d'une image signée avant l'intégration de l'UUID est aléatoire : l'UUID
+        retourné n'est alors rattaché à aucune signature en base.
+        """
+        payload_bytes = self.extract_message_bytes_buffer(
+            image_data=image_data,
             key=key_positions_secret,
             redundancy=redundancy,
             channel_choice=channel_choice
@@ -304,4 +472,6 @@ class SteganoDCTService:
             plain = self.aes_decrypt(payload_bytes, password)
         except Exception as e:
             raise ValueError("Déchiffrement AES échoué: " + str(e))
-        return plain.decode('utf-8')
\ No newline at end of file
+        signature_uuid = uuid.UUID(bytes=payload_bytes[:16])
+        candidate = str(signature_uuid) if signature_uuid.version == 4 else None
+        return candidate, plain.decode('utf-8')
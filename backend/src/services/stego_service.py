@@ -1,22 +1,32 @@
 import os
+import hmac
 import json
+from hashlib import sha256
 from io import BytesIO
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 
 from cryptography.fernet import Fernet
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
+from src.core import tracing
+from src.core.instrumentation import set_engine, stage, track_request
+from src.core.memory import image_workload
+from src.db.unit_of_work import unit_of_work
 from src.repositories.image_repository import ImageRepository
-from src.repositories.signature_repository import SignatureRepository
+from src.repositories.signature_repository import SignatureRef, SignatureRepository
 from src.repositories.verification_repository import VerificationRepository
 from src.schemas.sign_schema import SignatureResponse, SignatureListItem
 from src.schemas.sign_verif_schema import SignatureVerificationResponse, VerificationListItem
 from src.models import Signature
 from typing import List
 
-from src.utils.stego_utils import embed_data_into_image, extract_data_from_image
+from src.utils.stego_utils import (
+    embed_data_into_image, extract_data_from_image, pack_signed_message, signer_key_check, unpack_signed_message,
+)
 from src.services.stegano_dct_service import SteganoDCTService
+from src.storage import SIGNED_PREFIX, MediaStorage, get_storage
+from src.utils.upload_utils import image_dimensions, read_upload
 import importlib.util
 
 # Import du module avec tiret dans le nom
@@ -28,17 +38,25 @@ SteganoLSBService = stegano_lsb_module.SteganoLSBService
 
 # clé par défaut (pour compatibilité / tests) — tu peux la remplacer / gérer par utilisateur
 DEFAULT_FERNET_KEY = b"V4U3vLAVddPqktGCNF0hDgO3qIdJFa7mcqRg3b7EPMA="
-MEDIA_DIR = os.path.abspath("media/")  # Dossier où stocker les images signées
+# Paramètres des moteurs utilisés à la signature (enregistrés avec chaque signature)
+LSB_SIGN_PARAMS = {"repeat": 10}
+DCT_SIGN_PARAMS = {"strength": 24.0, "redundancy": 30, "channel_choice": "Y", "jpeg_quality": 100}
+
+class SignedImage(NamedTuple):
+    key: str
+    etag: Optional[str]
+    data: Optional[bytes]
+
 
 class StegoService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, storage: Optional[MediaStorage] = None):
         self.db = db
-        self.image_repo = ImageRepository(db)
+        self.storage = storage or get_storage()
+        self.image_repo = ImageRepository(db, self.storage)
         self.signature_repo = SignatureRepository(db)
         self.verification_repo = VerificationRepository(db)
         self.stegano_lsb = SteganoLSBService(db)
         self.stegano_dct = SteganoDCTService(db)
-        os.makedirs(MEDIA_DIR, exist_ok=True)
 
     def create_signature(
         self,
@@ -50,29 +68,111 @@ class StegoService:
         password: Optional[str] = None,
         key_positions_secret: Optional[str] = None,
     ) -> SignatureResponse:
-        image_record = self.image_repo.save_or_get(image_file, user_id)
+        # Toute la requête est persistée dans une seule transaction, validée une fois à la fin
+        with track_request("sign"), unit_of_work(self.db):
+            return self._create_signature(
+                user_id, image_file, message, password, key_positions_secret
+            )
+
+    def _create_signature(
+        self,
+        user_id: int,
+        image_file: UploadFile,
+        message: str,
+        password: Optional[str],
+        key_positions_secret: Optional[str],
+    ) -> SignatureResponse:
+        # L'upload est ingéré par blocs directement dans le stockage, puis exposé en buffer (mmap en local)
+        upload_extension = os.path.splitext(image_file.filename.lower())[1] if image_file.filename else ""
+        with stage("upload_read"):
+            image_record = self.image_repo.save_or_get(
+                image_file, user_id, commit=False, engine=self._engine_for(upload_extension)
+            )
 
         import uuid
         signature_uuid = str(uuid.uuid4())
         
         # Détecter le type d'image pour choisir la méthode de stéganographie
         file_extension = os.path.splitext(image_file.filename.lower())[1] if image_file.filename else ""
-        original_extension = os.path.splitext(image_record.file_path.lower())[1]
+        # L'original stocké peut avoir été recompressé (BMP -> PNG) : le format d'upload d'origine fait foi
+        original_extension = (
+            os.path.splitext((image_record.original_filename or "").lower())[1]
+            or os.path.splitext(image_record.file_path.lower())[1]
+        )
         
         # Utiliser l'extension du fichier original si disponible
         extension = original_extension or file_extension
         
-        signed_filename = f"signed_{signature_uuid}{extension}"
-        signed_path = os.path.join(MEDIA_DIR, signed_filename)
+        # L'UUID est intégré pour relier l'image à sa signature lors de la vérification :
+        # préfixe compact en LSB, sel AES en DCT (aucune capacité consommée)
+        embedded_message = pack_signed_message(signature_uuid, message)
         
+        with self.storage.open_buffer(image_record.file_path) as content:
+            # Budget mémoire réservé d'après l'en-tête, avant que le moteur ne décode l'image
+            with image_workload(self._engine_for(extension), *image_dimensions(content)):
+                signed_content, engine, engine_params = self._embed(
+                    content, extension, user_id, message, embedded_message,
+                    signature_uuid, password, key_positions_secret
+                )
+
+        # Clé dérivée du contenu : unique (l'UUID intégré diffère à chaque signature), empreinte servie en ETag
+        with stage("hash"):
+            output_sha256 = sha256(signed_content).hexdigest()
+        output_key = f"{SIGNED_PREFIX}{output_sha256}{extension}"
+        with stage("storage_write"):
+            self.storage.put(output_key, signed_content)
+
+        signature = self.signature_repo.create(
+            image_id=image_record.id,
+            signer_id=user_id,
+            signature_uuid=signature_uuid,
+            output_storage_key=output_key,
+            output_format=extension.lstrip("."),
+            output_size=signed_content.nbytes,
+            output_sha256=output_sha256,
+            engine=engine,
+            engine_params=engine_params,
+            commit=False,
+        )
+
+        # Réponse construite avant le commit : aucun rechargement des objets expirés
+        return SignatureResponse(
+            signature_uuid=signature.signature_uuid,
+            image_id=image_record.id,
+            file_path=output_key,
+        )
+
+    @staticmethod
+    def _engine_for(extension: str) -> str:
+        """Moteur utilisé pour une extension : DCT pour PNG et JPEG, LSB sinon."""
+        return "dct" if extension in ['.png', '.jpg', '.jpeg'] else "lsb"
+
+    @tracing.traced("stego.embed")
+    def _embed(
+        self,
+        content,
+        extension: str,
+        user_id: int,
+        message: str,
+        embedded_message: str,
+        signature_uuid: str,
+        password: Optional[str],
+        key_positions_secret: Optional[str],
+    ) -> Tuple[memoryview, str, dict]:
+        """
+        Choisit le moteur selon le format.
+        Retourne l'image signée encodée, le nom du moteur et ses paramètres.
+        """
         if extension in ['.bmp', '.bitmap']:
             # Utiliser LSB pour les bitmaps
-            self.stegano_lsb.hide_message(
-                input_path=image_record.file_path,
-                output_path=signed_path,
-                message=message,
-                repeat=10
+            set_engine("lsb")
+            signed_content = self.stegano_lsb.hide_message_buffer(
+                image_data=content,
+                message=embedded_message,
+                image_format=self.stegano_lsb.image_format_for(extension),
+                **LSB_SIGN_PARAMS
             )
+            return signed_content, "lsb", LSB_SIGN_PARAMS
         
         elif extension in ['.png', '.jpg', '.jpeg']:
             # Utiliser des valeurs par défaut si les paramètres DCT ne sont pas fournis
@@ -82,39 +182,28 @@ class StegoService:
                 key_positions_secret = f"_{user_id}_"
             
             # Utiliser DCT pour PNG et JPEG
-            self.stegano_dct.embed_message_aes(
-                in_path=image_record.file_path,
-                out_path=signed_path,
+            set_engine("dct")
+            signed_content = self.stegano_dct.embed_message_aes_buffer(
+                image_data=content,
                 message=message,
                 password=password,
                 key_positions_secret=key_positions_secret,
-                strength=24.0,
-                redundancy=30,
-                channel_choice="Y",
-                jpeg_quality=100
-            )
-        
-        else:
-            # Par défaut, utiliser LSB pour les autres formats
-            
-            self.stegano_lsb.hide_message(
-                input_path=image_record.file_path,
-                output_path=signed_path,
-                message=message,
-                repeat=10
+                image_format=extension,
+                signature_uuid=signature_uuid,
+                **DCT_SIGN_PARAMS
             )
+            key_check = signer_key_check(signature_uuid, password, key_positions_secret)
+            return signed_content, "dct", {**DCT_SIGN_PARAMS, "key_check": key_check}
 
-        signature = self.signature_repo.create(
-            image_id=image_record.id,
-            signer_id=user_id,
-            signature_uuid=signature_uuid,
-        )
-
-        return SignatureResponse(
-            signature_uuid=signature.signature_uuid,
-            image_id=image_record.id,
-            file_path=signed_path,
+        # Par défaut, utiliser LSB pour les autres formats
+        set_engine("lsb")
+        signed_content = self.stegano_lsb.hide_message_buffer(
+            image_data=content,
+            message=embedded_message,
+            image_format=self.stegano_lsb.image_format_for(extension),
+            **LSB_SIGN_PARAMS
         )
+        return signed_content, "lsb", LSB_SIGN_PARAMS
 
     def verify_signature(
         self,
@@ -125,23 +214,43 @@ class StegoService:
         password: Optional[str] = None,
         key_positions_secret: Optional[str] = None,
     ) -> SignatureVerificationResponse:
-        # Sauvegarder temporairement le fichier pour extract_message
-        temp_path = self.image_repo.save_temp(file)
-        
+        with track_request("verify") as tracked:
+            # L'image à vérifier est lue par blocs (limites de taille) et traitée en mémoire
+            extension = os.path.splitext(file.filename.lower())[1] if file.filename else ""
+            with stage("upload_read"):
+                content = read_upload(file.file, engine=self._engine_for(extension))
+
+            # La vérification est enregistrée dans une seule transaction, quelle que soit l'issue
+            with image_workload(self._engine_for(extension), *image_dimensions(content)), unit_of_work(self.db):
+                result = self._verify_content(
+                    user_id, file, content, password, key_positions_secret
+                )
+            if not result.valid:
+                tracked.outcome = "invalid"
+            return result
+
+    def _verify_content(
+        self,
+        user_id: int,
+        file: UploadFile,
+        content,
+        password: Optional[str],
+        key_positions_secret: Optional[str],
+    ) -> SignatureVerificationResponse:
         try:
             # Détecter le type d'image pour choisir la méthode de stéganographie
-            file_extension = os.path.splitext(file.filename.lower())[1] if file.filename else ""
-            temp_extension = os.path.splitext(temp_path.lower())[1]
-            
-            # Utiliser l'extension du fichier temporaire si disponible
-            extension = temp_extension or file_extension
+            extension = os.path.splitext(file.filename.lower())[1] if file.filename else ""
             
+            engine = self._engine_for(extension)
+            key_check = None
             if extension in ['.bmp', '.bitmap']:
                 # Utiliser LSB pour les bitmaps
-                extracted_message = self.stegano_lsb.extract_message(
-                    image_path=temp_path,
+                set_engine("lsb")
+                extracted_message = self.stegano_lsb.extract_message_buffer(
+                    image_data=content,
                     repeat=5
                 )
+                embedded_uuid, extracted_message = unpack_signed_message(extracted_message)
                 
                 # Si le message commence par "❌", c'est une erreur
                 if extracted_message.startswith("❌"):
@@ -149,7 +258,8 @@ class StegoService:
                         signature_uuid=None,
                         verifier_id=user_id,
                         verified=False,
-                        extracted_payload=extracted_message
+                        extracted_payload=extracted_message,
+                        commit=False,
                     )
                     return SignatureVerificationResponse(valid=False, message=extracted_message)
             
@@ -160,20 +270,25 @@ class StegoService:
                 if not key_positions_secret:
                     key_positions_secret = f"_{user_id}_"
                 
-                extracted_message = self.stegano_dct.extract_message_aes(
-                    in_path=temp_path,
+                set_engine("dct")
+                embedded_uuid, extracted_message = self.stegano_dct.extract_signed_message_aes_buffer(
+                    image_data=content,
                     password=password,
                     key_positions_secret=key_positions_secret,
                     redundancy=30,
                     channel_choice="Y"
                 )
+                if embedded_uuid:
+                    key_check = signer_key_check(embedded_uuid, password, key_positions_secret)
             
             else:
                 # Par défaut, essayer LSB pour les autres formats
-                extracted_message = self.stegano_lsb.extract_message(
-                    image_path=temp_path,
+                set_engine("lsb")
+                extracted_message = self.stegano_lsb.extract_message_buffer(
+                    image_data=content,
                     repeat=5
                 )
+                embedded_uuid, extracted_message = unpack_signed_message(extracted_message)
                 
                 # Si le message commence par "❌", c'est une erreur
                 if extracted_message.startswith("❌"):
@@ -181,21 +296,32 @@ class StegoService:
                         signature_uuid=None,
                         verifier_id=user_id,
                         verified=False,
-                        extracted_payload=extracted_message
+                        extracted_payload=extracted_message,
+                        commit=False,
                     )
                     return SignatureVerificationResponse(valid=False, message=extracted_message)
             
+            # Relier le message extrait à sa signature via l'UUID intégré, sinon par
+            # correspondance exacte avec une image signée connue (anciennes signatures)
+            with tracing.span("stego.resolve_signature"):
+                signature = self._attributed_signature(embedded_uuid, engine, content, key_check)
+
             # Enregistrer la vérification réussie avec le message extrait
             self.verification_repo.create(
-                signature_uuid=None,
+                signature_uuid=signature.signature_uuid if signature else None,
+                image_id=signature.image_id if signature else None,
                 verifier_id=user_id,
                 verified=True,
-                extracted_payload=extracted_message
+                extracted_payload=extracted_message,
+                commit=False,
             )
             
             return SignatureVerificationResponse(
                 valid=True,
-                message=extracted_message
+                message=extracted_message,
+                signature_uuid=signature.signature_uuid if signature else None,
+                author_id=signature.signer_id if signature else None,
+                signed_at=signature.signed_at if signature else None,
             )
             
         except Exception as e:
@@ -205,15 +331,26 @@ class StegoService:
                 verifier_id=user_id,
                 verified=False,
                 extracted_payload=error_message,
+                commit=False,
             )
             return SignatureVerificationResponse(valid=False, message=error_message)
-        finally:
-            # Nettoyer le fichier temporaire
-            try:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-            except:
-                pass
+
+    def _attributed_signature(
+        self, embedded_uuid: Optional[str], engine: str, content, key_check: Optional[str] = None
+    ) -> Optional[SignatureRef]:
+        """
+        Signature à laquelle attribuer le message extrait. L'UUID intégré n'est retourné par l'extraction que
+        s'il est authentifié (étiquette HMAC en LSB, AES-GCM en DCT) ; il doit en plus désigner une signature
+        produite par le même moteur et, en DCT, avec les secrets du signataire (empreinte key_check).
+        Sinon, seule une copie exacte d'une image signée est attribuée.
+        """
+        signature = self.signature_repo.get_ref_by_uuid(embedded_uuid)
+        if signature is not None and signature.engine in (None, engine):
+            if engine != "dct" or (
+                signature.key_check is not None and hmac.compare_digest(signature.key_check, key_check or "")
+            ):
+                return signature
+        return self.signature_repo.get_ref_by_output_hash(sha256(content).hexdigest())
 
     def get_user_signatures(self, user_id: int) -> List[SignatureListItem]:
         """Récupère toutes les signatures créées par un utilisateur."""
@@ -246,19 +383,20 @@ class StegoService:
             extracted_payload=verif.extracted_payload
         ) for verif in verifications]
         
-    def get_signed_image_path(self, signature_uuid: str) -> Optional[str]:
+    def load_signed_image(self, signature_uuid: str, if_none_match: Optional[str] = None) -> Optional[SignedImage]:
+        """
+        Retourne l'image signée avec son ETag fort (SHA-256 du contenu), ou None si elle est introuvable.
+        Si l'ETag correspond à if_none_match, le contenu n'est pas lu (data=None).
+        Les signatures antérieures aux métadonnées de sortie sont rattachées par `python -m src.storage.reshard`.
+        """
         signature = self.signature_repo.get_by_uuid(signature_uuid)
-        if not signature:
+        if not signature or not signature.output_storage_key:
             return None
-
-        # List of possible extensions to check
-        extensions = ['.bmp', '.bitmap', '.png', '.jpg', '.jpeg']
-        
-        for ext in extensions:
-            signed_filename = f"signed_{signature_uuid}{ext}"
-            signed_path = os.path.join(MEDIA_DIR, signed_filename)
-            if os.path.exists(signed_path):
-                return signed_path
-                
-        return None
+        key = signature.output_storage_key
+        etag = f'"{signature.output_sha256}"' if signature.output_sha256 else None
+        if etag and if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return SignedImage(key, etag, None)
+        if not self.storage.exists(key):
+            return None
+        return SignedImage(key, etag, self.storage.read(key))
 
@@ -0,0 +1,112 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicJob
+from src.core.config import settings
+from src.repositories.media_access_repository import MediaAccessRepository
+from src.storage import MediaStorage, get_storage
+from src.storage.tiered import TieredStorage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TieringReport:
+    scanned: int = 0
+    demoted: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    errors: int = 0
+
+
+class TieringService:
+    """Vide les accès accumulés en mémoire et rétrograde les objets inactifs vers le niveau froid."""
+
+    def __init__(self, db: Session, storage: Optional[MediaStorage] = None):
+        self.db = db
+        self.storage = storage or get_storage()
+        self.access_repo = MediaAccessRepository(db)
+
+    @property
+    def enabled(self) -> bool:
+        return isinstance(self.storage, TieredStorage)
+
+    def flush_access(self) -> int:
+        if not self.enabled:
+            return 0
+        pending = self.storage.tracker.drain()
+        self.access_repo.record_many(pending)
+        return len(pending)
+
+    def demote_inactive(
+        self,
+        cold_after_days: Optional[int] = None,
+        batch_size: int = 500,
+        should_stop: Callable[[], bool] = lambda: False,
+    ) -> TieringReport:
+        report = TieringReport()
+        if not self.enabled:
+            return report
+        days = settings.TIERING_COLD_AFTER_DAYS if cold_after_days is None else cold_after_days
+        cutoff = time.time() - days * 86400
+        # Les accès encore en mémoire comptent aussi
+        self.flush_access()
+
+        batch = []
+        for obj in self.storage.list_hot():
+            if should_stop():
+                break
+            report.scanned += 1
+            if obj.modified_at < cutoff:
+                batch.append(obj)
+            if len(batch) >= batch_size:
+                self._demote_batch(batch, cutoff, report)
+                batch = []
+        if batch and not should_stop():
+            self._demote_batch(batch, cutoff, report)
+        return report
+
+    def _demote_batch(self, batch, cutoff: float, report: TieringReport):
+        last_accessed = self.access_repo.last_accessed(obj.key for obj in batch)
+        for obj in batch:
+            if last_accessed.get(obj.key, obj.modified_at) >= cutoff:
+                continue
+            try:
+                compressed_size = self.storage.demote(obj.key)
+            except Exception:
+                logger.exception("tiering: failed to demote %s", obj.key)
+                report.errors += 1
+                continue
+            if compressed_size is not None:
+                report.demoted += 1
+                report.bytes_before += obj.size
+                report.bytes_after += compressed_size
+
+
+class AccessFlushJob(PeriodicJob):
+    """Écrit en base, par lots, les dates d'accès accumulées en mémoire."""
+
+    name = "media-access-flush"
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: Optional[int] = None):
+        super().__init__(session_factory, interval_seconds or settings.MEDIA_ACCESS_FLUSH_SECONDS)
+
+    def run(self, db: Session) -> int:
+        return TieringService(db).flush_access()
+
+
+class TieringJob(PeriodicJob):
+    """Rétrogradation périodique des médias inactifs."""
+
+    name = "media-tiering"
+    exclusive = True
+
+    def __init__(self, session_factory: Callable[[], Session], interval_seconds: Optional[int] = None):
+        super().__init__(session_factory, interval_seconds or settings.TIERING_INTERVAL_SECONDS)
+
+    def run(self, db: Session) -> TieringReport:
+        return TieringService(db).demote_inactive(should_stop=lambda: self.stopping)
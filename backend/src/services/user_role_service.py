@@ -2,18 +2,23 @@ from sqlalchemy.orm import Session
 from src.schemas.role_schema import RoleEnum
 from src.repositories.user_role_repository import UserRoleRepository
 from src.models.user_role import UserRole
+from src.services.principal_service import PrincipalService
 
 class UserRoleService:
     def __init__(
         self, 
         db: Session, 
-        user_role_repository: UserRoleRepository
+        user_role_repository: UserRoleRepository,
+        principal_service: PrincipalService
     ):
         self.db = db
         self.user_role_repository = user_role_repository
+        self.principal_service = principal_service
 
     def assign_role(self, user_id: int, role_id: int, commit: bool = True) -> UserRole:
-        return self.user_role_repository.create(user_id, role_id, commit)
+        user_role = self.user_role_repository.create(user_id, role_id, commit)
+        self.principal_service.invalidate(user_id)
+        return user_role
     
 
     def has_role(self, user_id: int, role: RoleEnum) -> bool:
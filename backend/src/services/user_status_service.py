@@ -2,19 +2,23 @@ from sqlalchemy.orm import Session
 from src.schemas.status_schema import StatusEnum
 from src.models.user_status import UserStatus
 from src.repositories.user_status_repository import UserStatusRepository
+from src.services.principal_service import PrincipalService
 
 class UserStatusService:
-    def __init__(self, db: Session, user_status_repository: UserStatusRepository):
+    def __init__(self, db: Session, user_status_repository: UserStatusRepository, principal_service: PrincipalService):
         self.db = db
         self.user_status_repository = user_status_repository
+        self.principal_service = principal_service
 
     def assign_status(self, user_id: int, status_id: int, reason: str = None, commit: bool = True) -> UserStatus:
-        return self.user_status_repository.create(
+        user_status = self.user_status_repository.create(
             user_id=user_id,
             status_id=status_id,
             reason=reason,
             commit=commit
         )
+        self.principal_service.invalidate(user_id)
+        return user_status
 
 
     def get_current_status(self, user_id: int) -> StatusEnum:
@@ -0,0 +1,42 @@
+from functools import lru_cache
+from typing import Optional
+
+from src.core.config import settings
+from src.storage.base import MediaStorage, StoredObject
+from src.storage.local import LocalFileStorage
+
+# Espaces de noms des clés de stockage
+ORIGINALS_PREFIX = "originals/"
+SIGNED_PREFIX = "signed/"
+
+
+def _build_backend(backend: str, root: str, bucket: Optional[str]) -> MediaStorage:
+    if backend == "local":
+        return LocalFileStorage(root, shard_depth=settings.STORAGE_SHARD_DEPTH)
+    if backend == "s3":
+        from src.storage.s3 import S3Storage
+        return S3Storage(
+            bucket=bucket,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def build_storage() -> MediaStorage:
+    storage = _build_backend(settings.STORAGE_BACKEND, settings.MEDIA_ROOT, settings.S3_BUCKET)
+    if not settings.TIERING_ENABLED:
+        return storage
+
+    from src.storage.disk_cache import DiskLRUCache
+    from src.storage.tiered import TieredStorage
+    cold = _build_backend(settings.TIERING_COLD_BACKEND, settings.TIERING_COLD_ROOT, settings.TIERING_COLD_S3_BUCKET)
+    cache = DiskLRUCache(settings.TIERING_CACHE_DIR, settings.TIERING_CACHE_MAX_BYTES)
+    return TieredStorage(storage, cold, cache)
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> MediaStorage:
+    return build_storage()
@@ -0,0 +1,69 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass
+class StoredObject:
+    """Description d'un objet stocké, telle que retournée par les listings."""
+    key: str
+    size: int
+    modified_at: float  # timestamp POSIX
+
+
+class MediaStorage(ABC):
+    """
+    Stockage des médias (originaux et images signées) adressé par clé.
+    Les clés sont des chemins relatifs de la forme '<espace>/<nom>', ex: 'signed/<uuid>.png'.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    @abstractmethod
+    def put(self, key: str, data) -> None:
+        """Écrit (ou remplace) l'objet à partir de bytes ou d'un memoryview."""
+
+    @abstractmethod
+    def put_file(self, key: str, src_path: str) -> None:
+        """Déplace un fichier local (ex: upload ingéré) vers l'objet ; src_path est consommé."""
+
+    @abstractmethod
+    def open_stream(self, key: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Lit l'objet par blocs."""
+
+    @abstractmethod
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        """Lit length octets à partir de start."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Supprime l'objet ; retourne False s'il n'existait pas."""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[StoredObject]:
+        ...
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        """Parcourt les objets dont la clé commence par prefix, sans tout charger en mémoire."""
+
+    @abstractmethod
+    def staging_dir(self) -> str:
+        """Dossier local où préparer les fichiers avant put_file (même volume si possible)."""
+
+    def read(self, key: str) -> bytes:
+        return b"".join(self.open_stream(key))
+
+    @contextmanager
+    def open_buffer(self, key: str) -> Iterator[memoryview]:
+        """Expose le contenu de l'objet sous forme de buffer ; les backends locaux évitent la copie."""
+        view = memoryview(self.read(key))
+        try:
+            yield view
+        finally:
+            view.release()
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import threading
+import uuid
+from typing import Optional
+
+
+class DiskLRUCache:
+    """
+    Cache LRU de fichiers sur disque local rapide, borné en octets, partagé par tous les workers
+    qui pointent sur le même répertoire (TIERING_CACHE_DIR).
+    Le répertoire fait foi, il n'y a pas d'index en mémoire : la date de modification d'un fichier est
+    sa date de dernier usage (mise à jour à chaque lecture), et chaque écriture recalcule l'occupation
+    réelle du répertoire puis évince les fichiers les moins récemment utilisés, quel que soit le worker
+    qui les a écrits. Le budget max_bytes est donc global, et non multiplié par le nombre de workers.
+    Un fichier évincé par un autre worker est absent : get_path retourne None et l'appelant relit le
+    niveau froid.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            self._evict()
+
+    def _name(self, key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _files(self) -> list[tuple[int, str, int]]:
+        """(dernier usage, nom, taille) des fichiers du cache, du moins au plus récemment utilisé."""
+        files = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # évincé entre-temps par un autre worker
+                files.append((st.st_mtime_ns, entry.name, st.st_size))
+        return sorted(files)
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Chemin du fichier en cache (et le marque comme récemment utilisé), ou None s'il est absent."""
+        path = self._path(self._name(key))
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, data) -> str:
+        name = self._name(key)
+        path = self._path(name)
+        temp_path = self._path(f".tmp_{uuid.uuid4()}")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._evict(keep=name)
+        return path
+
+    def discard(self, key: str):
+        self._remove(self._name(key))
+
+    def _evict(self, keep: Optional[str] = None):
+        # Appelé sous verrou : les autres processus évincent en parallèle, les suppressions sont idempotentes
+        files = self._files()
+        total = sum(size for _, _, size in files)
+        for _, name, size in files:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self._remove(name)
+            total -= size
+        self.size = total
+
+    def _remove(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(self._name(key)))
+
+    def __len__(self) -> int:
+        return len(self._files())
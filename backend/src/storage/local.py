@@ -0,0 +1,122 @@
+import hashlib
+import os
+import posixpath
+import uuid
+from typing import Iterator, Optional
+
+from src.storage.base import MediaStorage, StoredObject
+from src.utils.upload_utils import mapped_file
+
+
+class LocalFileStorage(MediaStorage):
+    """
+    Stockage sur système de fichiers local, réparti par préfixe de hash.
+    La clé 'signed/abc.png' est rangée dans <root>/signed/<h0h1>/<h2h3>/abc.png où h = sha256('abc.png'),
+    ce qui borne le nombre d'entrées par dossier quel que soit le volume.
+    """
+
+    def __init__(self, root: str, shard_depth: int = 2, shard_width: int = 2):
+        self.root = os.path.abspath(root)
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+        os.makedirs(self.root, exist_ok=True)
+
+    # ---------- layout ----------
+    def _shards(self, name: str) -> list[str]:
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        w = self.shard_width
+        return [digest[i * w:(i + 1) * w] for i in range(self.shard_depth)]
+
+    def path_for(self, key: str) -> str:
+        namespace, name = posixpath.split(key)
+        if not namespace or not name or name in (".", "..") or ".." in namespace.split("/"):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return os.path.join(self.root, *namespace.split("/"), *self._shards(name), name)
+
+    def staging_dir(self) -> str:
+        path = os.path.join(self.root, ".incoming")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    # ---------- writes ----------
+    def put(self, key: str, data) -> None:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = os.path.join(self.staging_dir(), f".put_{uuid.uuid4()}")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def put_file(self, key: str, src_path: str) -> None:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(src_path, path)
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self.path_for(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    # ---------- reads ----------
+    def open_stream(self, key: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        with open(self.path_for(key), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def read(self, key: str) -> bytes:
+        with open(self.path_for(key), "rb") as f:
+            return f.read()
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        with open(self.path_for(key), "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def open_buffer(self, key: str):
+        return mapped_file(self.path_for(key))
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path_for(key))
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            st = os.stat(self.path_for(key))
+        except FileNotFoundError:
+            return None
+        return StoredObject(key=key, size=st.st_size, modified_at=st.st_mtime)
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        # Le préfixe est un espace de noms ('signed/'), sans préfixe on parcourt tous les espaces
+        namespace = prefix.strip("/")
+        if namespace:
+            yield from self._walk(os.path.join(self.root, *namespace.split("/")), namespace, 0)
+            return
+        with os.scandir(self.root) as entries:
+            namespaces = [e.name for e in entries if e.is_dir() and not e.name.startswith(".")]
+        for namespace in namespaces:
+            yield from self._walk(os.path.join(self.root, namespace), namespace, 0)
+
+    def _walk(self, directory: str, namespace: str, depth: int) -> Iterator[StoredObject]:
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if depth < self.shard_depth:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self._walk(entry.path, namespace, depth + 1)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat()
+                    key = f"{namespace}/{entry.name}" if namespace else entry.name
+                    yield StoredObject(key=key, size=st.st_size, modified_at=st.st_mtime)
@@ -0,0 +1,155 @@
+"""
+Migration des médias existants vers le stockage configuré.
+
+    python -m src.storage.reshard [--workers N] [--dry-run] [--from-depth D]
+
+- Importe les fichiers des anciens dossiers plats (`media/signed_<uuid>.*` et
+  `src/media/images/<nom>`, ou chemin absolu enregistré) sous leurs clés de
+  stockage et met à jour `images.file_path` et `signatures.output_storage_key`.
+  Idempotent : exécuté par entrypoint.sh à chaque démarrage, seules les lignes
+  pas encore migrées sont relues.
+- Avec --from-depth, redistribue un stockage local déjà réparti avec une autre
+  profondeur de sharding vers la profondeur courante (les clés ne changent pas).
+
+Les déplacements de fichiers sont parallélisés ; les mises à jour en base sont
+faites ensuite dans le thread principal, une seule transaction.
+"""
+import argparse
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+
+from src.core.config import settings
+from src.storage import ORIGINALS_PREFIX, SIGNED_PREFIX, MediaStorage, get_storage
+from src.storage.local import LocalFileStorage
+
+LEGACY_SIGNED_DIR = "media"
+LEGACY_IMAGES_DIR = os.path.join("src", "media", "images")
+
+
+@dataclass
+class MoveJob:
+    source_path: str
+    key: str
+    # Mise à jour en base à appliquer une fois le fichier déplacé
+    on_done: Optional[Callable[[], None]] = None
+
+
+def _legacy_jobs(db, signed_dir: str, images_dir: str) -> list[MoveJob]:
+    from src.models import Image, Signature
+
+    jobs: list[MoveJob] = []
+
+    for image in db.query(Image).filter(Image.file_path.notlike(f"{ORIGINALS_PREFIX}%")):
+        name = os.path.basename(image.file_path)
+        source = image.file_path if os.path.isabs(image.file_path) else os.path.join(images_dir, name)
+        if not os.path.isfile(source):
+            continue
+        key = f"{ORIGINALS_PREFIX}{name}"
+
+        def update(image=image, key=key):
+            image.file_path = key
+        jobs.append(MoveJob(source, key, update))
+
+    legacy_signatures = db.query(Signature).filter(
+        or_(Signature.output_storage_key.is_(None), Signature.output_storage_key.notlike(f"{SIGNED_PREFIX}%"))
+    )
+    for signature in legacy_signatures:
+        if signature.output_storage_key:
+            candidates = [os.path.join(signed_dir, signature.output_storage_key)]
+        else:
+            candidates = glob.glob(os.path.join(signed_dir, f"signed_{signature.signature_uuid}.*"))
+        source = next((c for c in candidates if os.path.isfile(c)), None)
+        if source is None:
+            continue
+        extension = os.path.splitext(source)[1]
+        key = f"{SIGNED_PREFIX}{signature.signature_uuid}{extension}"
+
+        def update(signature=signature, key=key):
+            signature.output_storage_key = key
+        jobs.append(MoveJob(source, key, update))
+
+    return jobs
+
+
+def _reshard_jobs(storage: LocalFileStorage, from_depth: int) -> list[MoveJob]:
+    source = LocalFileStorage(storage.root, shard_depth=from_depth, shard_width=storage.shard_width)
+    # Le listing est matérialisé avant de déplacer quoi que ce soit dans la même arborescence
+    return [MoveJob(source.path_for(obj.key), obj.key) for obj in list(source.list())]
+
+
+def _prune_empty_dirs(root: str):
+    for directory, _, _ in os.walk(root, topdown=False):
+        if directory == root or os.path.basename(directory).startswith("."):
+            continue
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def run_jobs(storage: MediaStorage, jobs: list[MoveJob], workers: int, dry_run: bool = False) -> list[MoveJob]:
+    """Déplace les fichiers en parallèle et retourne les jobs réussis."""
+    if dry_run:
+        for job in jobs:
+            print(f"[dry-run] {job.source_path} -> {job.key}")
+        return []
+
+    done: list[MoveJob] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(storage.put_file, job.key, job.source_path): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+                done.append(job)
+            except Exception as e:
+                print(f"Échec {job.source_path} -> {job.key}: {e}")
+    return done
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Migre les médias vers le stockage configuré.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--from-depth", type=int, default=None,
+                        help="Profondeur de sharding actuelle d'un stockage local à redistribuer.")
+    parser.add_argument("--legacy-signed-dir", default=LEGACY_SIGNED_DIR)
+    parser.add_argument("--legacy-images-dir", default=LEGACY_IMAGES_DIR)
+    args = parser.parse_args(argv)
+
+    storage = get_storage()
+
+    if args.from_depth is not None:
+        if not isinstance(storage, LocalFileStorage):
+            parser.error("--from-depth ne s'applique qu'au stockage local.")
+        if args.from_depth == storage.shard_depth:
+            print("Profondeur identique, rien à faire.")
+            return
+        jobs = _reshard_jobs(storage, args.from_depth)
+        moved = run_jobs(storage, jobs, args.workers, args.dry_run)
+        if not args.dry_run:
+            _prune_empty_dirs(storage.root)
+        print(f"{len(moved)}/{len(jobs)} objets redistribués (profondeur {args.from_depth} -> {storage.shard_depth}).")
+        return
+
+    from src.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        jobs = _legacy_jobs(db, args.legacy_signed_dir, args.legacy_images_dir)
+        moved = run_jobs(storage, jobs, args.workers, args.dry_run)
+        for job in moved:
+            job.on_done()
+        db.commit()
+        print(f"{len(moved)}/{len(jobs)} fichiers importés dans le stockage '{settings.STORAGE_BACKEND}'.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from typing import Iterator, Optional
+
+from src.storage.base import MediaStorage, StoredObject
+
+
+class S3Storage(MediaStorage):
+    """
+    Stockage compatible S3 (AWS, MinIO, moto...). boto3 n'est requis que si ce backend est utilisé.
+    Les clés sont utilisées telles quelles : S3 ne souffre pas des dossiers volumineux.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        client=None,
+    ):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("boto3 is required for STORAGE_BACKEND=s3") from e
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region_name,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+            )
+        self.bucket = bucket
+        self.client = client
+
+    def _is_missing(self, error) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def staging_dir(self) -> str:
+        # Sous-dossier dédié : le GC y supprime les fichiers temporaires abandonnés, jamais ceux d'autres programmes
+        path = os.path.join(tempfile.gettempdir(), "stego-staging")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def put(self, key: str, data) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=bytes(data))
+
+    def put_file(self, key: str, src_path: str) -> None:
+        # upload_file découpe en multipart : pas de chargement complet en mémoire
+        self.client.upload_file(src_path, self.bucket, key)
+        os.remove(src_path)
+
+    def open_stream(self, key: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size or self.CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=key, Range=f"bytes={start}-{start + length - 1}"
+        )
+        return response["Body"].read()
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return StoredObject(key=key, size=head["ContentLength"], modified_at=head["LastModified"].timestamp())
+
+    def delete(self, key: str) -> bool:
+        if not self.exists(key):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return True
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield StoredObject(key=obj["Key"], size=obj["Size"], modified_at=obj["LastModified"].timestamp())
@@ -0,0 +1,158 @@
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+from src.storage.base import MediaStorage, StoredObject
+from src.storage.disk_cache import DiskLRUCache
+from src.utils.upload_utils import mapped_open_file
+
+
+class AccessTracker:
+    """
+    Dernier accès par clé, accumulé en mémoire et vidé périodiquement en base :
+    une lecture ne coûte jamais d'écriture SQL.
+    """
+
+    def __init__(self):
+        self._pending: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, key: str):
+        now = time.time()
+        with self._lock:
+            self._pending[key] = now
+
+    def drain(self) -> dict[str, float]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+class TieredStorage(MediaStorage):
+    """
+    Stockage à deux niveaux : les écritures vont dans le niveau chaud, les objets inactifs sont
+    déplacés (compressés zlib) vers le niveau froid par demote(). Un objet froid lu est décompressé
+    dans un cache LRU sur disque local (promotion à la lecture) ; il reste froid tant qu'il n'est pas réécrit.
+    """
+
+    COLD_COMPRESSION_LEVEL = 6
+
+    def __init__(self, hot: MediaStorage, cold: MediaStorage, cache: DiskLRUCache,
+                 tracker: Optional[AccessTracker] = None):
+        self.hot = hot
+        self.cold = cold
+        self.cache = cache
+        self.tracker = tracker or AccessTracker()
+
+    # ---------- niveaux ----------
+    def demote(self, key: str) -> Optional[int]:
+        """Déplace un objet chaud vers le niveau froid ; retourne la taille compressée, ou None."""
+        if not self.hot.exists(key):
+            return None
+        compressed = zlib.compress(self.hot.read(key), self.COLD_COMPRESSION_LEVEL)
+        self.cold.put(key, compressed)
+        self.hot.delete(key)
+        return len(compressed)
+
+    def _cached_path(self, key: str) -> Optional[str]:
+        """Chemin local d'un objet froid, décompressé dans le cache au besoin."""
+        path = self.cache.get_path(key)
+        if path is not None:
+            return path
+        if not self.cold.exists(key):
+            return None
+        return self.cache.put(key, zlib.decompress(self.cold.read(key)))
+
+    def _open_cold(self, key: str) -> BinaryIO:
+        """
+        Ouvre la copie en cache d'un objet froid. Le cache est partagé entre workers : si un autre
+        l'évince entre get_path et l'ouverture, l'objet est relu une fois depuis le niveau froid.
+        Une fois ouvert, le fichier reste lisible même s'il est évincé.
+        """
+        for _ in range(2):
+            path = self._cached_path(key)
+            if path is None:
+                raise FileNotFoundError(key)
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(key)
+
+    # ---------- écritures ----------
+    def put(self, key: str, data) -> None:
+        self.hot.put(key, data)
+        self._drop_cold_copy(key)
+
+    def put_file(self, key: str, src_path: str) -> None:
+        self.hot.put_file(key, src_path)
+        self._drop_cold_copy(key)
+
+    def _drop_cold_copy(self, key: str):
+        self.cache.discard(key)
+        self.cold.delete(key)
+
+    def delete(self, key: str) -> bool:
+        self.cache.discard(key)
+        deleted_hot = self.hot.delete(key)
+        deleted_cold = self.cold.delete(key)
+        return deleted_hot or deleted_cold
+
+    # ---------- lectures ----------
+    def open_stream(self, key: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        self.tracker.touch(key)
+        if self.hot.exists(key):
+            yield from self.hot.open_stream(key, chunk_size)
+            return
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        with self._open_cold(key) as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def read(self, key: str) -> bytes:
+        self.tracker.touch(key)
+        if self.hot.exists(key):
+            return self.hot.read(key)
+        with self._open_cold(key) as f:
+            return f.read()
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        self.tracker.touch(key)
+        if self.hot.exists(key):
+            return self.hot.read_range(key, start, length)
+        with self._open_cold(key) as f:
+            f.seek(start)
+            return f.read(length)
+
+    @contextmanager
+    def open_buffer(self, key: str) -> Iterator[memoryview]:
+        self.tracker.touch(key)
+        if self.hot.exists(key):
+            with self.hot.open_buffer(key) as view:
+                yield view
+            return
+        with self._open_cold(key) as f, mapped_open_file(f) as view:
+            yield view
+
+    def exists(self, key: str) -> bool:
+        return self.hot.exists(key) or key in self.cache or self.cold.exists(key)
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        return self.hot.stat(key) or self.cold.stat(key)
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        # Un objet en cours de rétrogradation peut apparaître dans les deux niveaux
+        yield from self.hot.list(prefix)
+        yield from self.cold.list(prefix)
+
+    def list_hot(self, prefix: str = "") -> Iterator[StoredObject]:
+        return self.hot.list(prefix)
+
+    def staging_dir(self) -> str:
+        return self.hot.staging_dir()
@@ -1,20 +1,172 @@
+"""
+Fournisseurs OAuth de la connexion Google, asynchrones : l'échange du code et la lecture du profil
+n'occupent plus la boucle d'événements.
+
+Le fournisseur est créé au démarrage (lifespan de src.main) et fermé à l'arrêt ; un seul
+httpx.AsyncClient, et donc un seul pool de connexions, sert toutes les requêtes du worker.
+Les points d'accès sont lus dans le document de découverte OIDC (GOOGLE_OAUTH2_METADATA_URL),
+mis en cache ; à défaut, les points d'accès Google connus sont utilisés.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+from urllib.parse import urlencode
+
 import httpx
-from src.core.config import settings
-
-def exchange_google_code(code: str) -> dict | None:
-    resp = httpx.post("https://oauth2.googleapis.com/token", data={
-        "code": code,
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "client_secret": settings.GOOGLE_CLIENT_SECRET,
-        "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-        "grant_type": "authorization_code"
-    })
-    return resp.json() if resp.status_code == 200 else None
-
-
-def get_google_user_info(access_token: str) -> dict | None:
-    resp = httpx.get(
-        "https://www.googleapis.com/oauth2/v2/userinfo",
-        headers={"Authorization": f"Bearer {access_token}"}
-    )
-    return resp.json() if resp.status_code == 200 else None
+from src.core.config import STUB_OAUTH_ENVS, settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINTS = {
+    "authorization_endpoint": "https://accounts.google.com/o/oauth2/v2/auth",
+    "token_endpoint": "https://oauth2.googleapis.com/token",
+    "userinfo_endpoint": "https://openidconnect.googleapis.com/v1/userinfo",
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Un échec de la découverte est retenu moins longtemps qu'un document valide
+METADATA_FAILURE_TTL_SECONDS = 60.0
+
+
+class OAuthProvider(ABC):
+    @abstractmethod
+    async def authorization_url(self) -> str:
+        ...
+
+    @abstractmethod
+    async def exchange_code(self, code: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    async def get_user_info(self, access_token: str) -> dict | None:
+        ...
+
+    async def aclose(self):
+        pass
+
+
+class GoogleOAuthProvider(OAuthProvider):
+    def __init__(self, client: httpx.AsyncClient, metadata_url: str = settings.GOOGLE_OAUTH2_METADATA_URL,
+                 retries: int = 2, backoff_seconds: float = 0.2, metadata_ttl: float = 3600.0,
+                 clock=time.monotonic):
+        self.client = client
+        self.metadata_url = metadata_url
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.metadata_ttl = metadata_ttl
+        self._clock = clock
+        self._metadata: Optional[dict] = None
+        self._metadata_expires_at = 0.0
+        self._metadata_lock = asyncio.Lock()
+
+    async def _request(self, method: str, url: str, idempotent: bool = True, **kwargs) -> Optional[httpx.Response]:
+        """
+        Requête avec nouvelles tentatives (attente exponentielle). Une requête non idempotente
+        (l'échange du code, à usage unique) n'est rejouée que si elle n'a pas pu partir.
+        """
+        retryable = (httpx.TransportError,) if idempotent else (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except retryable as e:
+                if last:
+                    logger.warning("oauth request failed", extra={"url": url, "attempts": attempt + 1, "error": repr(e)})
+                    return None
+            except httpx.TransportError as e:
+                logger.warning("oauth request failed", extra={"url": url, "attempts": attempt + 1, "error": repr(e)})
+                return None
+            else:
+                if not idempotent or response.status_code not in RETRY_STATUSES or last:
+                    return response
+            await asyncio.sleep(self.backoff_seconds * 2 ** attempt)
+        return None
+
+    async def metadata(self) -> dict:
+        if self._clock() < self._metadata_expires_at:
+            return self._metadata
+        async with self._metadata_lock:
+            # Rechargé par une autre requête pendant l'attente du verrou
+            if self._clock() < self._metadata_expires_at:
+                return self._metadata
+            response = await self._request("GET", self.metadata_url)
+            if response is not None and response.status_code == 200:
+                self._metadata = {**DEFAULT_ENDPOINTS, **response.json()}
+                self._metadata_expires_at = self._clock() + self.metadata_ttl
+            else:
+                logger.warning("oauth metadata unavailable, using default endpoints", extra={"url": self.metadata_url})
+                self._metadata = self._metadata or dict(DEFAULT_ENDPOINTS)
+                self._metadata_expires_at = self._clock() + METADATA_FAILURE_TTL_SECONDS
+            return self._metadata
+
+    async def authorization_url(self) -> str:
+        query = urlencode({
+            "client_id": settings.GOOGLE_CLIENT_ID or "",
+            "redirect_uri": settings.GOOGLE_REDIRECT_URI or "",
+            "response_type": "code",
+            "scope": "openid email profile",
+            "access_type": "offline",
+            "prompt": "consent"
+        })
+        return f"{(await self.metadata())['authorization_endpoint']}?{query}"
+
+    async def exchange_code(self, code: str) -> dict | None:
+        resp = await self._request("POST", (await self.metadata())["token_endpoint"], idempotent=False, data={
+            "code": code,
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+            "grant_type": "authorization_code"
+        })
+        return resp.json() if resp is not None and resp.status_code == 200 else None
+
+    async def get_user_info(self, access_token: str) -> dict | None:
+        resp = await self._request(
+            "GET", (await self.metadata())["userinfo_endpoint"],
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        return resp.json() if resp is not None and resp.status_code == 200 else None
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class StubOAuthProvider(OAuthProvider):
+    """
+    Fournisseur local, sans appel réseau : le code d'autorisation est l'email de l'utilisateur
+    (GET /api/auth/google/callback?code=alice@example.com). Réservé aux tests et bancs d'essai.
+    """
+    _prefix = "stub-token:"
+
+    async def authorization_url(self) -> str:
+        return f"http://localhost/stub-oauth/authorize?{urlencode({'redirect_uri': settings.GOOGLE_REDIRECT_URI or ''})}"
+
+    async def exchange_code(self, code: str) -> dict | None:
+        if "@" not in code:
+            return None
+        return {"access_token": f"{self._prefix}{code}", "token_type": "Bearer"}
+
+    async def get_user_info(self, access_token: str) -> dict | None:
+        if not access_token.startswith(self._prefix):
+            return None
+        email = access_token[len(self._prefix):]
+        return {"email": email, "given_name": email.split("@")[0].title(), "family_name": "Stub"}
+
+
+def build_oauth_provider() -> OAuthProvider:
+    if settings.OAUTH_PROVIDER == "google":
+        timeout = settings.OAUTH_HTTP_TIMEOUT_SECONDS
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 3.0)),
+            limits=httpx.Limits(max_connections=settings.OAUTH_HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=settings.OAUTH_HTTP_MAX_CONNECTIONS),
+        )
+        return GoogleOAuthProvider(client, retries=settings.OAUTH_HTTP_RETRIES,
+                                   metadata_ttl=settings.OAUTH_METADATA_TTL_SECONDS)
+    if settings.OAUTH_PROVIDER == "stub":
+        # Connexion à n'importe quel compte sans mot de passe : jamais hors des tests et du développement
+        if settings.ENV not in STUB_OAUTH_ENVS:
+            raise ValueError(f"OAUTH_PROVIDER=stub is not allowed with ENV={settings.ENV}")
+        return StubOAuthProvider()
+    raise ValueError(f"Unknown OAuth provider: {settings.OAUTH_PROVIDER}")
@@ -1,22 +1,173 @@
+"""
+Envoi des emails. Les emails transactionnels passent par la table email_outbox et le worker
+MailOutboxWorker (src.services.mail_outbox_service) ; send_mail() envoie immédiatement.
+
+Les gabarits Jinja sont compilés une fois par processus. SMTPMailer garde sa connexion ouverte
+d'un envoi à l'autre et la rétablit si le serveur l'a fermée.
+"""
+import logging
+import os
 import smtplib
+import threading
+import time
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from functools import lru_cache
+from typing import Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from src.core.config import settings
 
+logger = logging.getLogger(__name__)
 
-def send_mail(to_emails: list[str], subject: str, body: str, html: bool = True):
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+# Au-delà, la connexion est vérifiée (NOOP) avant l'envoi : les serveurs ferment les connexions inactives
+SMTP_IDLE_CHECK_SECONDS = 30.0
+
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html", "xml"]),
+    # Gabarits livrés avec le code : pas de vérification de date à chaque rendu
+    auto_reload=False,
+)
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    return _environment.get_template(name)
+
+
+def render_template(name: str, context: dict) -> str:
+    return get_template(name).render(**context)
+
+
+def build_message(to_emails: list[str], subject: str, body: str, html: bool = True) -> Message:
     msg = MIMEMultipart()
+    sender = settings.SMTP_USER or "no-reply@localhost"
     if hasattr(settings, "SMTP_FROM_NAME") and settings.SMTP_FROM_NAME:
-        msg['From'] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_USER}>"
+        msg['From'] = f"{settings.SMTP_FROM_NAME} <{sender}>"
     else:
-        msg['From'] = settings.SMTP_USER
+        msg['From'] = sender
     msg['To'] = ", ".join(to_emails)
     msg['Subject'] = subject
     if html:
         msg.attach(MIMEText(body, 'html'))
     else:
         msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+class SMTPMailer:
+    """
+    Connexion SMTP persistante et thread-safe. SMTP_SECURITY : "ssl" (SMTP_SSL), "starttls" ou
+    "none" (serveur local de test) ; l'authentification n'a lieu que si SMTP_USER est défini.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, security: Optional[str] = None,
+                 user: Optional[str] = None, password: Optional[str] = None, timeout: Optional[float] = None):
+        self.host = host or settings.SMTP_SERVER
+        self.port = port or settings.SMTP_PORT
+        self.security = security or settings.SMTP_SECURITY
+        self.user = settings.SMTP_USER if user is None else user
+        self.password = settings.SMTP_PASSWORD if password is None else password
+        self.timeout = timeout or settings.SMTP_TIMEOUT_SECONDS
+        self.connections = 0
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.security == "ssl":
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                server.starttls()
+        if self.user:
+            server.login(self.user, self.password)
+        self.connections += 1
+        logger.debug("smtp connected", extra={"host": self.host, "port": self.port})
+        return server
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is not None and time.monotonic() - self._last_used > SMTP_IDLE_CHECK_SECONDS:
+            try:
+                self._server.noop()
+            except (smtplib.SMTPException, OSError):
+                self._discard()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def _discard(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.close()
+            except OSError:
+                pass
 
-    with smtplib.SMTP_SSL(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.send_message(msg)
+    def send(self, msg: Message):
+        with self._lock:
+            try:
+                try:
+                    self._connection().send_message(msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    # Connexion fermée par le serveur : une reconnexion, le message n'avait pas été accepté
+                    self._discard()
+                    self._connection().send_message(msg)
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self._discard()
+                raise
+            finally:
+                self._last_used = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._discard()
+
+
+class ConsoleMailer:
+    """Journalise les emails au lieu de les envoyer (développement local, tests de charge)."""
+
+    def send(self, msg: Message):
+        logger.info("mail not sent (console backend)", extra={"to": msg["To"], "subject": msg["Subject"]})
+
+    def close(self):
+        pass
+
+
+class MemoryMailer:
+    """Conserve les emails en mémoire : les tests y lisent les liens de confirmation."""
+
+    def __init__(self):
+        self.outbox: list[Message] = []
+        self._lock = threading.Lock()
+
+    def send(self, msg: Message):
+        with self._lock:
+            self.outbox.append(msg)
+
+    def close(self):
+        pass
+
+
+@lru_cache(maxsize=1)
+def get_mailer():
+    if settings.MAIL_BACKEND == "smtp":
+        return SMTPMailer()
+    if settings.MAIL_BACKEND == "console":
+        return ConsoleMailer()
+    if settings.MAIL_BACKEND == "memory":
+        return MemoryMailer()
+    raise ValueError(f"Unknown mail backend: {settings.MAIL_BACKEND}")
+
+
+def send_mail(to_emails: list[str], subject: str, body: str, html: bool = True):
+    get_mailer().send(build_message(to_emails, subject, body, html))
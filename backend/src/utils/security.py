@@ -7,6 +7,18 @@ from src.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Claim « type » : un refresh token ne peut pas servir de jeton d'accès, et inversement
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+def token_type_matches(claimed, expected: str) -> bool:
+    """
+    Les jetons émis avant l'ajout du claim n'en ont pas : ils restent acceptés pour le type attendu,
+    pour ne pas déconnecter tout le monde à la mise à jour, jusqu'à leur expiration.
+    """
+    return claimed is None or claimed == expected
+
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
@@ -25,14 +37,15 @@ def decode_jwt(token: str):
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.now() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": ACCESS_TOKEN_TYPE})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def create_refresh_token(data: dict):
+    to_encode = data.copy()
     expire = datetime.now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    data.update({"exp": expire})
-    return jwt.encode(data, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "type": REFRESH_TOKEN_TYPE})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def generate_tokens_for_user(user_id: int):
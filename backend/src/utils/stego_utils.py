@@ -1,4 +1,4 @@
-import json, uuid, zlib, base64
+import json, uuid, zlib, base64, hashlib, hmac, os
 from io import BytesIO
 from typing import Optional
 from PIL import Image
@@ -8,6 +8,10 @@ from cryptography.fernet import Fernet
 # chiffrement asymétrique
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from src.core.config import settings
+from src.utils.lru_cache import LRUCache
 
 EOF_MARKER = '1111111111111110'  # fin de flux LSB (1 octet 0xFE)
 
@@ -21,9 +25,81 @@ def _bits_to_str(bits: str) -> str:
     chars = [chr(int(bits[i:i+8], 2)) for i in range(0, len(bits), 8)]
     return ''.join(chars)
 
+# -------------------------
+# cache des clés parsées
+# -------------------------
+KEY_CACHE_MAX_ENTRIES = 32
+
+# empreinte (type + sha256 du matériel) -> objet clé prêt à l'emploi
+_KEY_CACHE = LRUCache(maxsize=KEY_CACHE_MAX_ENTRIES)
+_KEY_KINDS = ("fernet", "rsa-public", "rsa-private")
+
+_OAEP = padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                     algorithm=hashes.SHA256(),
+                     label=None)
+
+def _as_bytes(material) -> bytes:
+    return material.encode() if isinstance(material, str) else bytes(material)
+
+def _key_fingerprint(kind: str, material: bytes) -> str:
+    return f"{kind}:{hashlib.sha256(material).hexdigest()}"
+
+def _cached_key(kind: str, material, loader):
+    material = _as_bytes(material)
+    fingerprint = _key_fingerprint(kind, material)
+    key_obj = _KEY_CACHE.get(fingerprint)
+    if key_obj is None:
+        key_obj = loader(material)
+        _KEY_CACHE.set(fingerprint, key_obj)
+    return key_obj
+
+def _get_fernet(fernet_key) -> Fernet:
+    return _cached_key("fernet", fernet_key, Fernet)
+
+def _get_rsa_public_key(rsa_public_pem):
+    return _cached_key("rsa-public", rsa_public_pem, serialization.load_pem_public_key)
+
+def _get_rsa_private_key(rsa_private_pem):
+    return _cached_key("rsa-private", rsa_private_pem,
+                       lambda pem: serialization.load_pem_private_key(pem, password=None))
+
+def evict_key_material(material) -> bool:
+    """Retire du cache toutes les clés dérivées de ce matériel (PEM ou clé Fernet)."""
+    material = _as_bytes(material)
+    evicted = False
+    for kind in _KEY_KINDS:
+        if _KEY_CACHE.pop(_key_fingerprint(kind, material)) is not None:
+            evicted = True
+    return evicted
+
+def clear_key_cache() -> None:
+    _KEY_CACHE.clear()
+
 # -------------------------
 # enveloppe / encryptions
 # -------------------------
+# rsa        : RSA-OAEP direct (~190 octets max pour une clé 2048 bits)
+# rsa-hybrid : clé AES-GCM aléatoire chiffrée par RSA-OAEP + payload chiffré en AES-GCM
+#              format: len(wrapped_key)(2) || wrapped_key || nonce(12) || ct+tag
+def _rsa_hybrid_encrypt(payload_bytes: bytes, public_key) -> bytes:
+    data_key = AESGCM.generate_key(bit_length=256)
+    nonce = os.urandom(12)
+    ct = AESGCM(data_key).encrypt(nonce, payload_bytes, associated_data=None)
+    wrapped_key = public_key.encrypt(data_key, _OAEP)
+    return len(wrapped_key).to_bytes(2, "big") + wrapped_key + nonce + ct
+
+def _rsa_hybrid_decrypt(data_bytes: bytes, private_key) -> bytes:
+    if len(data_bytes) < 2:
+        raise ValueError("rsa-hybrid payload too short")
+    wrapped_len = int.from_bytes(data_bytes[:2], "big")
+    if len(data_bytes) < 2 + wrapped_len + 12 + 16:
+        raise ValueError("rsa-hybrid payload too short")
+    wrapped_key = data_bytes[2:2 + wrapped_len]
+    nonce = data_bytes[2 + wrapped_len:2 + wrapped_len + 12]
+    ct = data_bytes[2 + wrapped_len + 12:]
+    data_key = private_key.decrypt(wrapped_key, _OAEP)
+    return AESGCM(data_key).decrypt(nonce, ct, associated_data=None)
+
 def _encrypt_payload(payload_bytes: bytes, mode: str,
                      fernet_key: Optional[bytes]=None,
                      rsa_public_pem: Optional[bytes]=None) -> bytes:
@@ -32,19 +108,17 @@ def _encrypt_payload(payload_bytes: bytes, mode: str,
     if mode == "aes":
         if not fernet_key:
             raise ValueError("fernet_key required for aes mode")
-        f = Fernet(fernet_key)
-        return f.encrypt(payload_bytes)
-    if mode == "rsa":
+        return _get_fernet(fernet_key).encrypt(payload_bytes)
+    if mode in ("rsa", "rsa-hybrid"):
         if not rsa_public_pem:
-            raise ValueError("rsa_public_pem required for rsa mode")
-        pub = serialization.load_pem_public_key(rsa_public_pem)
-        encrypted = pub.encrypt(
-            payload_bytes,
-            padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                         algorithm=hashes.SHA256(),
-                         label=None)
-        )
-        return encrypted
+            raise ValueError(f"rsa_public_pem required for {mode} mode")
+        pub = _get_rsa_public_key(rsa_public_pem)
+        if mode == "rsa-hybrid":
+            return _rsa_hybrid_encrypt(payload_bytes, pub)
+        max_len = pub.key_size // 8 - 2 * hashes.SHA256.digest_size - 2
+        if len(payload_bytes) > max_len:
+            raise ValueError(f"payload too large for rsa mode ({len(payload_bytes)} > {max_len} bytes), use rsa-hybrid")
+        return pub.encrypt(payload_bytes, _OAEP)
     raise ValueError("unsupported encryption mode")
 
 def _decrypt_payload(data_bytes: bytes, mode: str,
@@ -55,19 +129,14 @@ def _decrypt_payload(data_bytes: bytes, mode: str,
     if mode == "aes":
         if not fernet_key:
             raise ValueError("fernet_key required for aes mode")
-        f = Fernet(fernet_key)
-        return f.decrypt(data_bytes)
-    if mode == "rsa":
+        return _get_fernet(fernet_key).decrypt(data_bytes)
+    if mode in ("rsa", "rsa-hybrid"):
         if not rsa_private_pem:
-            raise ValueError("rsa_private_pem required for rsa mode")
-        priv = serialization.load_pem_private_key(rsa_private_pem, password=None)
-        decrypted = priv.decrypt(
-            data_bytes,
-            padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                         algorithm=hashes.SHA256(),
-                         label=None)
-        )
-        return decrypted
+            raise ValueError(f"rsa_private_pem required for {mode} mode")
+        priv = _get_rsa_private_key(rsa_private_pem)
+        if mode == "rsa-hybrid":
+            return _rsa_hybrid_decrypt(data_bytes, priv)
+        return priv.decrypt(data_bytes, _OAEP)
     raise ValueError("unsupported encryption mode")
 
 # -------------------------
@@ -111,13 +180,61 @@ def _extract_string_from_image_bytes(image_bytes: bytes) -> str:
             bits += str(g & 1)
             bits += str(b & 1)
     s = _bits_to_str(bits)
-    # découpe avant EOF marker byte (\xFE)
-    s = s.split(chr(int("11111110", 2)))[0]
+    # découpe avant EOF marker (\xFF\xFE)
+    s = s.split(_bits_to_str(EOF_MARKER))[0]
     return s
 
 # -------------------------
 # Fonctions publiques
 # -------------------------
+# préfixe compact: marqueur (1) + UUID en base64url sans padding (22) + étiquette HMAC (16) — la capacité
+# DCT est limitée, une enveloppe JSON coûterait ~60 octets de plus par signature.
+# L'UUID apparaît dans les URL de téléchargement : sans l'étiquette (HMAC-SHA256 tronqué à 96 bits, clé
+# SECRET_KEY, sur l'UUID et le message), n'importe qui pourrait l'intégrer pour s'attribuer une signature.
+SIGNED_MESSAGE_MARKER = "\x1e"
+_UUID_B64_LEN = 22
+_TAG_BYTES = 12
+_TAG_B64_LEN = 16
+
+def _signed_message_tag(uuid_bytes: bytes, message: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode("utf-8"), b"signed-message:" + uuid_bytes + message.encode("utf-8"),
+                      hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:_TAG_BYTES]).decode("ascii")
+
+def pack_signed_message(signature_uuid: str, message: str) -> str:
+    """Préfixe le message avec l'UUID de signature et son étiquette avant intégration dans l'image."""
+    uuid_bytes = uuid.UUID(signature_uuid).bytes
+    uuid_b64 = base64.urlsafe_b64encode(uuid_bytes).decode("ascii").rstrip("=")
+    return SIGNED_MESSAGE_MARKER + uuid_b64 + _signed_message_tag(uuid_bytes, message) + message
+
+def unpack_signed_message(text: str) -> tuple[Optional[str], str]:
+    """
+    Retourne (signature_uuid, message) à partir du texte extrait.
+    Les images signées avant l'intégration de l'UUID renvoient (None, texte) ; un UUID dont l'étiquette
+    ne correspond pas (falsifié, ou altéré) renvoie (None, message) : le message reste lisible, sans attribution.
+    """
+    prefix_len = 1 + _UUID_B64_LEN + _TAG_B64_LEN
+    if not text.startswith(SIGNED_MESSAGE_MARKER) or len(text) < prefix_len:
+        return None, text
+    uuid_b64 = text[1:1 + _UUID_B64_LEN]
+    try:
+        signature_uuid = uuid.UUID(bytes=base64.urlsafe_b64decode(uuid_b64 + "=="))
+    except ValueError:
+        return None, text
+    tag, message = text[1 + _UUID_B64_LEN:prefix_len], text[prefix_len:]
+    if not hmac.compare_digest(tag, _signed_message_tag(signature_uuid.bytes, message)):
+        return None, message
+    return str(signature_uuid), message
+
+def signer_key_check(signature_uuid: str, password: str, key_positions_secret: str) -> str:
+    """
+    Empreinte des secrets DCT du signataire, conservée avec la signature. Le sel AES-GCM est l'UUID de
+    signature (public) : sans cette empreinte, un tiers pourrait chiffrer avec ses propres secrets et l'UUID
+    d'autrui. HMAC clé SECRET_KEY : l'empreinte stockée ne permet pas de tester des mots de passe hors ligne.
+    """
+    material = b"\x00".join(s.encode("utf-8") for s in (signature_uuid, password, key_positions_secret))
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), b"dct-signer:" + material, hashlib.sha256).hexdigest()[:32]
+
 def embed_data_into_image(image_bytes: bytes, author_id: int, message: str,
                           mode: str = "none",
                           fernet_key: Optional[bytes]=None,
@@ -0,0 +1,146 @@
+import mmap
+import os
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import sha256
+from io import BytesIO
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from PIL import Image
+
+from src.core.config import settings
+from src.core.memory import max_pixels as engine_max_pixels
+from src.exceptions.upload_exception import InvalidImageUpload, UploadTooLarge
+
+# Taille maximale conservée pour lire les dimensions dans l'en-tête de l'image
+HEADER_PROBE_BYTES = 1024 * 1024
+
+
+@dataclass
+class IngestedUpload:
+    """Résultat de l'ingestion d'un upload : fichier temporaire déjà haché et contrôlé."""
+    temp_path: str
+    sha256_hash: str
+    size: int
+    width: int
+    height: int
+
+
+def _probe_dimensions(header: bytes) -> Optional[Tuple[int, int]]:
+    """Lit les dimensions dans l'en-tête de l'image sans décoder les pixels."""
+    try:
+        with Image.open(BytesIO(header)) as img:
+            return img.size
+    except Image.DecompressionBombError:
+        raise UploadTooLarge("Image dimensions exceed the allowed pixel count.")
+    except Exception:
+        return None
+
+
+class _LimitedReader:
+    """
+    Lit un flux par blocs en appliquant les limites de taille et de pixels au fil de l'eau.
+    La limite de pixels tient compte du budget mémoire du moteur qui traitera l'image.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_pixels: Optional[int] = None,
+                 engine: Optional[str] = None):
+        self.max_bytes = max_bytes or settings.MAX_UPLOAD_BYTES
+        self.max_pixels = max_pixels or engine_max_pixels(engine)
+        self.size = 0
+        self.dimensions: Optional[Tuple[int, int]] = None
+        self._header = bytearray()
+
+    def chunks(self, stream: BinaryIO) -> Iterator[bytes]:
+        while True:
+            chunk = stream.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise UploadTooLarge(f"Upload exceeds the maximum size of {self.max_bytes} bytes.")
+            self._check_dimensions(chunk)
+            yield chunk
+
+        if self.size == 0:
+            raise InvalidImageUpload("Empty upload.")
+        if self.dimensions is None:
+            raise InvalidImageUpload("Unreadable image header.")
+
+    def _check_dimensions(self, chunk: bytes):
+        if self.dimensions is not None or len(self._header) >= HEADER_PROBE_BYTES:
+            return
+        self._header += chunk[:HEADER_PROBE_BYTES - len(self._header)]
+        self.dimensions = _probe_dimensions(bytes(self._header))
+        if self.dimensions is None:
+            return
+        self._header = bytearray()
+        width, height = self.dimensions
+        if width * height > self.max_pixels:
+            raise UploadTooLarge(f"Image exceeds the maximum of {self.max_pixels} pixels.")
+
+
+def ingest_upload(stream: BinaryIO, dest_dir: str, engine: Optional[str] = None) -> IngestedUpload:
+    """
+    Copie l'upload par blocs dans un fichier temporaire de dest_dir en calculant le SHA-256
+    au fil de l'eau. La mémoire utilisée est constante quelle que soit la taille du fichier.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    temp_path = os.path.join(dest_dir, f".incoming_{uuid.uuid4()}")
+    reader = _LimitedReader(engine=engine)
+    digest = sha256()
+    try:
+        with open(temp_path, "wb") as f:
+            for chunk in reader.chunks(stream):
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        discard_upload(temp_path)
+        raise
+
+    width, height = reader.dimensions
+    return IngestedUpload(temp_path, digest.hexdigest(), reader.size, width, height)
+
+
+def discard_upload(temp_path: str):
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def image_dimensions(data) -> Tuple[int, int]:
+    """Dimensions d'une image en mémoire, lues dans son en-tête (avant tout décodage)."""
+    dimensions = _probe_dimensions(bytes(data[:HEADER_PROBE_BYTES]))
+    if dimensions is None:
+        raise InvalidImageUpload("Unreadable image header.")
+    return dimensions
+
+
+def read_upload(stream: BinaryIO, engine: Optional[str] = None) -> bytearray:
+    """Lit un upload non conservé (ex: vérification) en appliquant les mêmes limites."""
+    reader = _LimitedReader(engine=engine)
+    content = bytearray()
+    for chunk in reader.chunks(stream):
+        content += chunk
+    return content
+
+
+@contextmanager
+def mapped_file(path: str) -> Iterator[memoryview]:
+    """Expose un fichier stocké en lecture seule via mmap, sans le copier en mémoire."""
+    with open(path, "rb") as f:
+        with mapped_open_file(f) as view:
+            yield view
+
+
+@contextmanager
+def mapped_open_file(f: BinaryIO) -> Iterator[memoryview]:
+    """Comme mapped_file, pour un fichier déjà ouvert (qui reste lisible même s'il est supprimé entre-temps)."""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            yield view
+        finally:
+            view.release()
@@ -0,0 +1,4 @@
+# Avant tout import de src : la configuration est lue à l'import
+from src.core.hermetic import apply_hermetic_env
+
+apply_hermetic_env()
@@ -1,11 +1,60 @@
+import pytest
 from fastapi.testclient import TestClient
+
+from src.core.config import settings
+from src.db.session import SessionLocal
 from src.main import app
+from src.services.mail_outbox_service import MailOutboxService
+from src.utils.mail import get_mailer
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Le lifespan crée le schéma (SQLite en mémoire) et les données de référence
+    with TestClient(app) as client:
+        yield client
+
 
-client = TestClient(app)
+def test_register_and_login(client):
+    user = {"firstname": "Ada", "lastname": "Lovelace", "username": "ada",
+            "email": "ada@example.com", "password": "Secret@123"}
+    res = client.post("/api/auth/register", json=user)
+    assert res.status_code == 201
+    # Email mis en file avec le compte, distribué par le worker de la file
+    db = SessionLocal()
+    try:
+        assert MailOutboxService(db).drain().sent == 1
+    finally:
+        db.close()
+    assert get_mailer().outbox[-1]["To"] == user["email"]
 
-def test_register_and_login():
-    user = {"email": "a@b.com", "password": "123456"}
-    client.post("/auth/register", json=user)
-    res = client.post("/auth/login", json=user)
+    # Compte inactif tant que l'email n'est pas confirmé
+    res = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    assert res.status_code == 403
+
+    res = client.post("/api/auth/login", json={"email": settings.DEFAULT_ADMIN_EMAIL,
+                                               "password": settings.DEFAULT_ADMIN_PASSWORD})
     assert res.status_code == 200
     assert "access_token" in res.json()
+
+
+def test_google_login_with_stub_provider(client):
+    res = client.get("/api/auth/google/callback", params={"code": "grace@example.com"})
+    assert res.status_code == 200
+    assert "access_token" in res.json()
+    assert "refresh_token=" in res.headers["set-cookie"]
+
+    assert client.get("/api/auth/google/callback", params={"code": "not-an-email"}).status_code >= 400
+
+
+def test_forgot_password_enqueues_reset_email(client):
+    res = client.post("/api/auth/forgot-password", json={"email": settings.DEFAULT_ADMIN_EMAIL})
+    assert res.status_code == 200
+    db = SessionLocal()
+    try:
+        assert MailOutboxService(db).drain().sent == 1
+    finally:
+        db.close()
+    message = get_mailer().outbox[-1]
+    assert message["To"] == settings.DEFAULT_ADMIN_EMAIL
+    assert "http://localhost/reset-password/" in message.get_payload()[0].get_payload(decode=True).decode()
@@ -0,0 +1,66 @@
+import numpy as np
+
+from benchmarks import compare, corpus
+from benchmarks.cases import select_cases
+from benchmarks.runner import run_case
+
+
+def _result(wall: float, ok: bool = True, peak: int = 1_000_000) -> dict:
+    timings = {"wall_median": wall, "wall_min": wall, "cpu_median": wall, "runs": 3, "peak_traced_bytes": peak}
+    return {"case": "dct/prod", "image": {"name": "2mp-photo-png"}, "ok": ok,
+            "embed": dict(timings), "extract": dict(timings)}
+
+
+def test_corpus_is_deterministic_per_seed(tmp_path):
+    first = corpus.generate(0.05, "photo", seed=1)
+    assert np.array_equal(first, corpus.generate(0.05, "photo", seed=1))
+    assert not np.array_equal(first, corpus.generate(0.05, "photo", seed=2))
+    assert first.shape == (*reversed(corpus.dimensions(0.05)), 3)
+
+    image = corpus.load_image(0.05, "noise", "png", seed=1, cache_dir=str(tmp_path))
+    cached = corpus.load_image(0.05, "noise", "png", seed=1, cache_dir=str(tmp_path))
+    assert image.data == cached.data
+    assert image.data == corpus.load_image(0.05, "noise", "png", seed=1, cache_dir=None).data
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_run_case_records_timings_and_round_trip():
+    case = select_cases({"lsb"}, {"r5"})[0]
+    image = corpus.load_image(0.05, "photo", "bmp", cache_dir=None)
+
+    result = run_case(case, image, repeat=1)
+
+    assert result["ok"], result.get("error")
+    assert result["params"] == {"repeat": 5}
+    for operation in ("embed", "extract"):
+        assert result[operation]["wall_median"] > 0
+        assert result[operation]["peak_traced_bytes"] > 0
+
+
+def test_run_case_measures_failed_extractions():
+    # Trop petite pour la redondance DCT : l'extraction échoue mais reste chronométrée
+    case = select_cases({"dct"}, {"prod"})[0]
+    result = run_case(case, corpus.load_image(0.05, "flat", "png", cache_dir=None), repeat=1, memory=False)
+
+    assert result["ok"] is False and result["error"]
+    assert result["extract"]["wall_median"] > 0
+
+
+def test_compare_flags_only_significant_regressions():
+    baseline = {"results": [_result(0.200)]}
+
+    assert not any(c.regression for c in compare.compare(baseline, {"results": [_result(0.215)]}))
+    slower = compare.compare(baseline, {"results": [_result(0.300)]})
+    assert {c.metric for c in slower if c.regression} == {
+        "embed.wall_median", "embed.cpu_median", "extract.wall_median", "extract.cpu_median",
+    }
+    # Sous min_seconds, une hausse relative n'est que du bruit
+    tiny = compare.compare({"results": [_result(0.001)]}, {"results": [_result(0.002)]})
+    assert not any(c.regression for c in tiny)
+
+
+def test_compare_flags_broken_extraction_and_memory():
+    comparisons = compare.compare({"results": [_result(0.2)]}, {"results": [_result(0.2, ok=False, peak=2_000_000)]})
+    flagged = {c.metric for c in comparisons if c.regression}
+    assert flagged == {"ok", "embed.peak_traced_bytes", "extract.peak_traced_bytes"}
+    assert "REGRESSION" in compare.render(comparisons)
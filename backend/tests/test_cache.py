@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from src.cache import Cache, CacheUnavailable, MemoryCacheBackend
+from src.core import instrumentation
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.cache.redis import RedisCacheBackend
+    return RedisCacheBackend(prefix="test:", client=fakeredis.FakeRedis())
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    backend = MemoryCacheBackend(maxsize=100) if request.param == "memory" else _redis_backend()
+    return Cache(backend, default_ttl=60, lock_timeout=2.0)
+
+
+def test_get_set_delete_round_trip(cache):
+    assert cache.get("missing", "default") == "default"
+    cache.set("principal", {"id": 1, "roles": ["admin"]})
+    cache.set("nothing", None)
+
+    assert cache.get("principal") == {"id": 1, "roles": ["admin"]}
+    # Une valeur None en cache n'est pas un défaut
+    assert cache.get("nothing", "default") is None
+    cache.delete("principal", "nothing")
+    assert cache.get("principal") is None
+
+
+def test_tags_invalidate_every_tagged_entry(cache):
+    cache.set("user:1:principal", 1, tags=["user:1"])
+    cache.set("user:1:quota", 2, tags=["user:1", "quotas"])
+    cache.set("user:2:principal", 3, tags=["user:2"])
+
+    cache.invalidate_tags("user:1")
+
+    assert cache.get("user:1:principal") is None and cache.get("user:1:quota") is None
+    assert cache.get("user:2:principal") == 3
+
+
+def test_namespaces_isolate_keys_and_tags(cache):
+    users, sessions = cache.namespaced("users"), cache.namespaced("sessions")
+    users.set("1", "user", tags=["t"])
+    sessions.set("1", "session", tags=["t"])
+
+    users.invalidate_tags("t")
+    assert users.get("1") is None and sessions.get("1") == "session"
+
+
+def test_single_flight_loads_once_for_concurrent_misses(cache):
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"loaded": True}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_set("slow", load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"loaded": True}] * 8
+
+
+def test_single_flight_waits_for_another_process():
+    backend = _redis_backend()
+    # Deux instances : deux workers qui partagent le même Redis
+    first, second = Cache(backend, lock_timeout=2.0), Cache(backend, lock_timeout=2.0)
+    started = threading.Event()
+
+    def slow_load():
+        started.set()
+        time.sleep(0.2)
+        return "from-first"
+
+    thread = threading.Thread(target=first.get_or_set, args=("key", slow_load))
+    thread.start()
+    started.wait()
+    assert second.get_or_set("key", lambda: "from-second") == "from-first"
+    thread.join()
+
+
+def test_memory_backend_expires_and_evicts():
+    clock = _Clock()
+    backend = MemoryCacheBackend(maxsize=2, clock=clock)
+    cache = Cache(backend, default_ttl=10)
+
+    cache.set("a", 1, tags=["t"])
+    clock.now = 11
+    assert cache.get("a") is None
+
+    cache.set("b", 2, tags=["t"])
+    cache.set("c", 3)
+    cache.get("b")
+    cache.set("d", 4)
+    assert cache.get("c") is None and cache.get("b") == 2
+    assert len(backend) == 2
+    # L'index des étiquettes suit les évictions
+    cache.invalidate_tags("t")
+    assert len(backend) == 1
+
+
+def test_metrics_and_unavailable_backend():
+    cache = Cache(MemoryCacheBackend(), namespace="metrics-test:")
+    hits = instrumentation.CACHE_REQUESTS.value(namespace="metrics-test", result="hit")
+    misses = instrumentation.CACHE_REQUESTS.value(namespace="metrics-test", result="miss")
+    cache.get_or_set("k", lambda: 1)
+    cache.get("k")
+    assert instrumentation.CACHE_REQUESTS.value(namespace="metrics-test", result="hit") == hits + 1
+    assert instrumentation.CACHE_REQUESTS.value(namespace="metrics-test", result="miss") == misses + 2
+    assert instrumentation.CACHE_SECONDS.count(backend="memory", operation="get") >= 3
+
+    class Down(MemoryCacheBackend):
+        def get(self, key):
+            raise CacheUnavailable("connection refused")
+
+        def set(self, key, value, ttl, tags=()):
+            raise CacheUnavailable("connection refused")
+
+    # Backend injoignable : le chargement a lieu, la requête n'échoue pas
+    assert Cache(Down()).get_or_set("k", lambda: "fresh") == "fresh"
@@ -0,0 +1,73 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmarks import corpus
+from src.services.stegano_dct_service import SteganoDCTService
+from src.services.stego_service import SteganoLSBService, stegano_lsb_module
+
+END_MARKER = stegano_lsb_module.END_MARKER
+
+_IMAGE = corpus.generate(0.07, "photo")
+_EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "bmp": ".bmp"}
+
+
+def _write_original(tmp_path, image_format: str) -> tuple[str, bytes]:
+    data = corpus.encode(_IMAGE, image_format)
+    path = tmp_path / f"original{_EXTENSIONS[image_format]}"
+    path.write_bytes(data)
+    return str(path), data
+
+
+@pytest.mark.parametrize("image_format", ["png", "jpeg", "bmp"])
+def test_lsb_buffer_path_matches_file_path(tmp_path, image_format):
+    lsb = SteganoLSBService(db=None)
+    in_path, data = _write_original(tmp_path, image_format)
+    # Sortie sans perte : le flux LSB ne survit pas à un encodage JPEG
+    out_path = str(tmp_path / ("signed.bmp" if image_format == "bmp" else "signed.png"))
+
+    lsb.hide_message(in_path, out_path, "hello", repeat=5)
+    buffered = lsb.hide_message_buffer(data, "hello", repeat=5, image_format=lsb.image_format_for(out_path[-4:]))
+
+    with open(out_path, "rb") as f:
+        assert bytes(buffered) == f.read()
+    assert lsb.extract_message_buffer(buffered, repeat=5) == lsb.extract_message(out_path, repeat=5) == "hello"
+
+
+@pytest.mark.parametrize("image_format", ["png", "jpeg", "bmp"])
+def test_dct_buffer_path_matches_file_path(tmp_path, image_format):
+    dct = SteganoDCTService(db=None)
+    in_path, data = _write_original(tmp_path, image_format)
+    extension = _EXTENSIONS[image_format]
+    out_path = str(tmp_path / f"signed{extension}")
+    params = {"key": "positions", "strength": 24.0, "redundancy": 5}
+
+    dct.embed_message_bytes(in_path, out_path, b"hello", **params)
+    buffered = dct.embed_message_bytes_buffer(data, b"hello", image_format=extension, **params)
+
+    with open(out_path, "rb") as f:
+        assert bytes(buffered) == f.read()
+    extract = {"key": "positions", "redundancy": 5, "max_message_bytes": 64}
+    assert dct.extract_message_bytes_buffer(buffered, **extract) == dct.extract_message_bytes(out_path, **extract)
+    assert dct.extract_message_bytes_buffer(buffered, **extract) == b"hello"
+
+
+def test_lsb_buffer_output_only_changes_low_bits():
+    lsb = SteganoLSBService(db=None)
+    data = corpus.encode(_IMAGE, "png")
+    signed = lsb.hide_message_buffer(data, "hello", repeat=5)
+
+    original = np.asarray(Image.open(BytesIO(data)).convert("RGB"))
+    marked = np.asarray(Image.open(BytesIO(bytes(signed))).convert("RGB"))
+    assert np.array_equal(original >> 1, marked >> 1)
+    bits = lsb.to_bitstring(lsb.compress_message("hello")) + END_MARKER
+    assert "".join(str(v & 1) for v in marked.reshape(-1)[:len(bits)]) == bits
+
+
+def test_buffer_apis_accept_memoryview_input():
+    data = memoryview(corpus.encode(_IMAGE, "png"))
+    lsb = SteganoLSBService(db=None)
+    signed = lsb.hide_message_buffer(data, "hello", repeat=5)
+    assert lsb.extract_message_buffer(memoryview(signed), repeat=5) == "hello"
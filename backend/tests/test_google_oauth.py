@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from src.core.config import Settings, settings
+from src.utils.google_oauth import DEFAULT_ENDPOINTS, GoogleOAuthProvider, StubOAuthProvider, build_oauth_provider
+
+METADATA_URL = "https://accounts.example/.well-known/openid-configuration"
+METADATA = {
+    "authorization_endpoint": "https://accounts.example/auth",
+    "token_endpoint": "https://accounts.example/token",
+    "userinfo_endpoint": "https://accounts.example/userinfo",
+}
+
+
+class _Google:
+    """Serveur OAuth simulé derrière httpx.MockTransport : compte les appels, échoue à la demande."""
+
+    def __init__(self, failures: dict | None = None):
+        self.calls: list[str] = []
+        self.failures = dict(failures or {})
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.calls.append(path)
+        failure = self.failures.get(path)
+        if failure:
+            self.failures[path] = failure[1:]
+            if failure[0] == "connect":
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(failure[0])
+        if path == "/.well-known/openid-configuration":
+            return httpx.Response(200, json=METADATA)
+        if path == "/token":
+            assert b"code=abc" in request.content
+            return httpx.Response(200, json={"access_token": "token-1"})
+        if path == "/userinfo":
+            assert request.headers["Authorization"] == "Bearer token-1"
+            return httpx.Response(200, json={"email": "ada@example.com", "given_name": "Ada"})
+        return httpx.Response(404)
+
+
+def _provider(server: _Google, **kwargs) -> GoogleOAuthProvider:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return GoogleOAuthProvider(client, METADATA_URL, backoff_seconds=0, **kwargs)
+
+
+def test_code_exchange_uses_cached_discovery_document():
+    server = _Google()
+
+    async def scenario():
+        provider = _provider(server)
+        token = await provider.exchange_code("abc")
+        user = await provider.get_user_info(token["access_token"])
+        url = await provider.authorization_url()
+        await provider.aclose()
+        return user, url
+
+    user, url = asyncio.run(scenario())
+    assert user["email"] == "ada@example.com"
+    assert url.startswith("https://accounts.example/auth?")
+    assert server.calls.count("/.well-known/openid-configuration") == 1
+
+
+def test_transient_failures_are_retried():
+    server = _Google({"/userinfo": [503, "connect"], "/token": ["connect"]})
+
+    async def scenario():
+        provider = _provider(server, retries=2)
+        token = await provider.exchange_code("abc")
+        return await provider.get_user_info(token["access_token"])
+
+    assert asyncio.run(scenario())["email"] == "ada@example.com"
+    assert server.calls.count("/userinfo") == 3 and server.calls.count("/token") == 2
+
+
+def test_code_exchange_is_not_replayed_after_a_server_error():
+    # Code à usage unique : une réponse 5xx n'est pas rejouée
+    server = _Google({"/token": [502]})
+    assert asyncio.run(_provider(server, retries=2).exchange_code("abc")) is None
+    assert server.calls.count("/token") == 1
+
+
+def test_discovery_failure_falls_back_to_default_endpoints():
+    server = _Google({"/.well-known/openid-configuration": [500, 500, 500]})
+    metadata = asyncio.run(_provider(server, retries=2).metadata())
+    assert metadata == DEFAULT_ENDPOINTS
+
+
+def test_stub_provider_is_refused_outside_test_and_dev(monkeypatch):
+    assert isinstance(build_oauth_provider(), StubOAuthProvider)
+
+    monkeypatch.setattr(settings, "ENV", "prod")
+    with pytest.raises(ValueError):
+        build_oauth_provider()
+
+
+def test_stub_provider_requires_a_sqlite_database():
+    with pytest.raises(ValidationError):
+        Settings(OAUTH_PROVIDER="stub", DATABASE_URL="postgresql+psycopg2://app:secret@db:5432/app")
+    with pytest.raises(ValidationError):
+        Settings(OAUTH_PROVIDER="stub", DATABASE_URL=None)
+    assert Settings(OAUTH_PROVIDER="stub", DATABASE_URL="sqlite:///local.db").OAUTH_PROVIDER == "stub"
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.controllers.api import metrics_controller
+from src.core import instrumentation
+from src.core.config import settings
+from src.core.instrumentation import Histogram, MetricsRegistry, observe_image, set_engine, stage, track_request
+from src.core.middleware import add_metrics_middleware
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="dct")
+    histogram.observe(0.5, stage="dct")
+    histogram.observe(3.0, stage="dct")
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{stage="dct",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="dct",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{stage="dct",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="dct"} 3' in text
+
+
+def test_stage_is_labelled_with_request_context():
+    before = instrumentation.STEGO_REQUESTS.value(operation="verify", engine="dct", outcome="invalid")
+    with track_request("verify") as tracked:
+        set_engine("dct")
+        observe_image(3000, 2000)
+        with stage("embed"):
+            pass
+        tracked.outcome = "invalid"
+
+    assert instrumentation.STAGE_SECONDS.count(stage="embed", engine="dct", megapixels="4-12", outcome="ok") >= 1
+    assert instrumentation.STEGO_REQUESTS.value(operation="verify", engine="dct", outcome="invalid") == before + 1
+
+
+def test_stage_records_errors():
+    with pytest.raises(ValueError):
+        with stage("test_failure"):
+            raise ValueError()
+    assert instrumentation.STAGE_SECONDS.count(
+        stage="test_failure", engine="none", megapixels="unknown", outcome="error"
+    ) == 1
+
+
+def test_disabled_metrics_are_noop(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    with stage("test_disabled"):
+        pass
+    assert instrumentation.STAGE_SECONDS.count(
+        stage="test_disabled", engine="none", megapixels="unknown", outcome="ok"
+    ) == 0
+
+
+def _app():
+    app = FastAPI()
+    add_metrics_middleware(app)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    app.include_router(metrics_controller.router)
+    return app
+
+
+def test_metrics_endpoint_uses_route_templates():
+    client = TestClient(_app())
+    client.get("/items/1")
+    client.get("/items/2")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2.0' in response.text
+    assert "threadpool_capacity " in response.text
+
+
+def test_metrics_endpoint_hidden_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    assert TestClient(_app()).get("/metrics").status_code == 404
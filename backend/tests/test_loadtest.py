@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from loadtest import report
+from loadtest.runner import Sample
+from loadtest.scenario import OPERATIONS, SCENARIOS_DIR, load_scenario
+
+
+@pytest.mark.parametrize("name", sorted(os.path.splitext(f)[0] for f in os.listdir(SCENARIOS_DIR)))
+def test_repository_scenarios_are_valid(name):
+    scenario = load_scenario(name)
+    assert scenario.name == name
+    assert set(scenario.operations) <= set(OPERATIONS)
+    assert scenario.images and scenario.concurrency >= 1
+
+
+def test_invalid_scenario_is_rejected(tmp_path):
+    path = tmp_path / "broken.toml"
+    path.write_text('[operations]\nupload = 1\n[[images]]\nmegapixels = 1\ntexture = "photo"\nformat = "png"\n')
+    with pytest.raises(ValueError):
+        load_scenario(str(path))
+
+
+def test_percentiles_use_observed_values():
+    values = [float(v) for v in range(1, 101)]
+    assert report.percentile(values, 50) == 50.0
+    assert report.percentile(values, 99) == 99.0
+    assert report.percentile([0.2], 99) == 0.2
+    assert report.percentile([], 50) == 0.0
+
+
+def test_summary_reports_throughput_errors_and_latencies():
+    samples = [Sample("download", 0.0, 0.010 * i, 0.005 * i, 200) for i in range(1, 11)]
+    samples += [Sample("download", 0.0, 0.001, 0.001, 500, "HTTP 500"),
+                Sample("sign", 0.0, 2.0, 1.5, 201)]
+
+    summary = report.summarize(samples, duration_seconds=4.0)
+
+    download = summary["operations"]["download"]
+    assert download["requests"] == 11 and download["errors"] == 1
+    assert download["throughput_rps"] == 2.75
+    assert download["statuses"] == {"200": 10, "500": 1}
+    # L'échec rapide n'entre pas dans les percentiles
+    assert download["latency_ms"]["p50"] == 50.0
+    assert summary["total"]["requests"] == 12
+    assert "TOTAL" in report.render(summary)
@@ -0,0 +1,69 @@
+import json
+import logging
+import queue
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.middleware import add_request_id_middleware
+from src.core.request_context import get_request_id, reset_request_id, set_request_id
+from src.logging import EngineSamplingFilter, JsonFormatter, NonBlockingQueueHandler, RequestContextFilter
+
+
+def _record(name="src.services.stegano_dct_service", level=logging.DEBUG, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, "dct embed %s", ("done",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_context_and_extra_fields():
+    token = set_request_id("req-1")
+    try:
+        record = _record(total_bits=640, duration_ms=1.5)
+        RequestContextFilter().filter(record)
+    finally:
+        reset_request_id(token)
+
+    document = json.loads(JsonFormatter().format(record))
+
+    assert document["message"] == "dct embed done"
+    assert document["level"] == "DEBUG"
+    assert document["request_id"] == "req-1"
+    assert (document["total_bits"], document["duration_ms"]) == (640, 1.5)
+    assert "trace_id" not in document
+
+
+def test_engine_sampling_is_consistent_per_request():
+    sampler = EngineSamplingFilter(rate=0.5)
+    decisions = {request_id: sampler.filter(_record(request_id=request_id)) for request_id in map(str, range(200))}
+
+    assert 40 < sum(decisions.values()) < 160
+    assert all(sampler.filter(_record(request_id=rid)) == kept for rid, kept in decisions.items())
+    assert sampler.filter(_record(level=logging.WARNING, request_id="0")) is True
+    assert sampler.filter(_record(name="src.services.stego_service", request_id="0")) is True
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "dct embed done"
+
+
+def test_request_id_middleware_echoes_or_generates():
+    app = FastAPI()
+    add_request_id_middleware(app)
+
+    @app.get("/")
+    async def index():
+        return {"request_id": get_request_id()}
+
+    client = TestClient(app)
+    response = client.get("/", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["x-request-id"] == "abc-123" == response.json()["request_id"]
+
+    generated = client.get("/", headers={"X-Request-ID": "bad id\\n"})
+    assert generated.headers["x-request-id"] != "bad id\\n"
+    assert len(generated.headers["x-request-id"]) == 32
@@ -0,0 +1,131 @@
+import smtplib
+import socket
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.db.base import Base
+from src.models import EmailOutbox
+from src.repositories.email_outbox_repository import EmailOutboxRepository
+from src.services.mail_outbox_service import MailOutboxService, MailOutboxWorker
+from src.utils.mail import MemoryMailer, SMTPMailer
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def smtp_server():
+    """Serveur SMTP local (aiosmtpd) qui conserve les messages reçus."""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.messages = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope)
+            return "250 OK"
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = Handler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _enqueue(db, count: int):
+    repo = EmailOutboxRepository(db)
+    for i in range(count):
+        repo.enqueue(f"user{i}@example.com", "Confirm", "confirm_email.html",
+                     {"confirmation_link": f"http://localhost/confirm/{i}", "exp": 60}, commit=False)
+    db.commit()
+
+
+def test_outbox_is_drained_in_batches_over_one_smtp_connection(db, smtp_server):
+    controller, handler = smtp_server
+    _enqueue(db, 5)
+    mailer = SMTPMailer(controller.hostname, controller.port, security="none", user="")
+
+    report = MailOutboxService(db, mailer).drain(batch_size=2)
+
+    assert report.sent == 5
+    assert mailer.connections == 1
+    assert sorted(envelope.rcpt_tos[0] for envelope in handler.messages) == [f"user{i}@example.com" for i in range(5)]
+    assert b"http://localhost/confirm/3" in handler.messages[3].content
+    assert {row.status for row in db.query(EmailOutbox)} == {"sent"}
+    # Liens de confirmation effacés une fois l'email envoyé
+    assert [row.context for row in db.query(EmailOutbox)] == [{}] * 5
+    mailer.close()
+
+
+def test_mailer_reconnects_after_the_server_drops_the_connection(db, smtp_server):
+    controller, handler = smtp_server
+    _enqueue(db, 2)
+    mailer = SMTPMailer(controller.hostname, controller.port, security="none", user="")
+    service = MailOutboxService(db, mailer)
+    service.drain(batch_size=1)
+    mailer._server.sock.shutdown(socket.SHUT_RDWR)  # connexion coupée, sans QUIT
+
+    _enqueue(db, 1)
+    assert service.drain().sent == 1
+    assert mailer.connections == 2 and len(handler.messages) == 3
+
+
+def test_failed_deliveries_are_retried_then_abandoned(db):
+    class Down(MemoryMailer):
+        def send(self, msg):
+            raise smtplib.SMTPServerDisconnected("down")
+
+    _enqueue(db, 1)
+    service = MailOutboxService(db, Down())
+    assert service.drain().retried == 1
+    entry = db.query(EmailOutbox).one()
+    assert entry.status == "pending" and entry.attempts == 1 and "down" in entry.last_error
+    # Pas encore dû : la tentative suivante attend le délai
+    assert not service.drain()
+
+    entry.attempts = 7
+    entry.next_attempt_at = entry.created_at
+    db.commit()
+    assert service.drain().failed == 1
+    entry = db.query(EmailOutbox).one()
+    assert entry.status == "failed" and entry.context == {}
+
+
+def test_claimed_messages_are_not_delivered_twice(db):
+    _enqueue(db, 3)
+    first = EmailOutboxRepository(db).claim_batch("worker-a", 10, lease_seconds=300)
+    assert len(first) == 3
+    # Bail en cours : un autre worker ne reçoit rien
+    assert EmailOutboxRepository(db).claim_batch("worker-b", 10, lease_seconds=300) == []
+
+
+def test_finished_messages_are_purged_after_retention(db):
+    _enqueue(db, 3)
+    service = MailOutboxService(db, MemoryMailer())
+    service.drain()
+    old, recent, pending = db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    old.sent_at = datetime.now(timezone.utc) - timedelta(days=30)
+    pending.status, pending.sent_at = "pending", None
+    pending.next_attempt_at = datetime.now(timezone.utc) - timedelta(days=30)
+    db.commit()
+    old_id, recent_id, pending_id = old.id, recent.id, pending.id
+
+    report = MailOutboxWorker(lambda: db, interval_seconds=60, mailer=MemoryMailer()).run(db)
+
+    # Le message en attente, redevenu dû, est envoyé ; seul l'ancien message envoyé est purgé
+    assert report.purged == 1 and report.sent == 1
+    assert sorted(row.id for row in db.query(EmailOutbox)) == [recent_id, pending_id]
+    assert db.get(EmailOutbox, old_id) is None
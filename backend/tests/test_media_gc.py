@@ -0,0 +1,131 @@
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers, UploadFile
+
+from benchmarks import corpus
+from src.core import background
+
+from src.db.base import Base
+from src.models import Image, Signature
+from src.repositories.image_repository import ImageRepository
+from src.services.media_gc_service import MediaGCScheduler, MediaGCService
+from src.storage.local import LocalFileStorage
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _age(storage, key, seconds=3600):
+    past = time.time() - seconds
+    os.utime(storage.path_for(key), (past, past))
+
+
+def test_gc_removes_only_old_orphans(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+
+    image = Image(user_id=1, file_path="originals/kept.png", sha256_hash="kept")
+    db.add(image)
+    db.flush()
+    db.add(Signature(image_id=image.id, signer_id=1, signature_uuid="u1", output_storage_key="signed/u1.png"))
+    db.commit()
+
+    for key in ("originals/kept.png", "signed/u1.png", "signed/orphan.png", "originals/orphan.png", "signed/fresh.png"):
+        storage.put(key, b"12345")
+    for key in ("originals/kept.png", "signed/u1.png", "signed/orphan.png", "originals/orphan.png"):
+        _age(storage, key)
+
+    temp = os.path.join(storage.staging_dir(), ".incoming_stale")
+    # Préfixe de l'ancien save_temp hors de son dossier historique : fichier d'un autre programme
+    foreign = os.path.join(storage.staging_dir(), "temp_foreign")
+    for path in (temp, foreign):
+        with open(path, "wb") as f:
+            f.write(b"123")
+        os.utime(path, (time.time() - 3600,) * 2)
+
+    report = MediaGCService(db, storage).collect(grace_seconds=60, batch_size=2, io_concurrency=2)
+
+    assert (report.temp_files, report.signed_outputs, report.originals) == (1, 1, 1)
+    assert report.reclaimed_bytes == 13
+    assert not os.path.exists(temp) and os.path.exists(foreign)
+    assert not storage.exists("signed/orphan.png")
+    assert not storage.exists("originals/orphan.png")
+    for key in ("originals/kept.png", "signed/u1.png", "signed/fresh.png"):
+        assert storage.exists(key)
+
+
+def test_gc_dry_run_deletes_nothing(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    storage.put("signed/orphan.png", b"12345")
+    _age(storage, "signed/orphan.png")
+
+    report = MediaGCService(db, storage).collect(grace_seconds=60, dry_run=True)
+
+    assert report.signed_outputs == 1
+    assert storage.exists("signed/orphan.png")
+
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(BytesIO(data), filename="scan.png", headers=Headers({"content-type": "image/png"}))
+
+
+def test_gc_deletes_unreferenced_images_unless_reuploaded(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    repo = ImageRepository(db, storage)
+    stale = repo.save_or_get(_upload(corpus.encode(corpus.generate(0.01, "photo"), "png")), user_id=1)
+    reused = repo.save_or_get(_upload(corpus.encode(corpus.generate(0.01, "flat"), "png")), user_id=1)
+    stale_key, reused_id = stale.file_path, reused.id
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.query(Image).update({Image.upload_date: past, Image.last_uploaded_at: past})
+    db.commit()
+
+    # Même contenu téléversé à nouveau : la ligne est réutilisée et son délai de grâce repart
+    with open(storage.path_for(reused.file_path), "rb") as f:
+        assert repo.save_or_get(_upload(f.read()), user_id=2).id == reused_id
+
+    report = MediaGCService(db, storage).collect(grace_seconds=60)
+
+    assert report.image_rows == 1
+    assert [image.id for image in db.query(Image).all()] == [reused_id]
+    assert not storage.exists(stale_key)
+    assert storage.exists(db.get(Image, reused_id).file_path)
+
+
+def test_exclusive_job_is_skipped_when_lock_is_held(db, tmp_path, monkeypatch):
+    @contextmanager
+    def held_elsewhere(session, name):
+        assert name == "periodic-job:media-gc"
+        yield False
+    monkeypatch.setattr(background, "advisory_lock", held_elsewhere)
+    calls = []
+    monkeypatch.setattr(MediaGCScheduler, "run", lambda self, session: calls.append(session))
+
+    assert MediaGCScheduler(lambda: db, interval_seconds=60).run_once() is None
+    assert calls == []
+
+
+def test_gc_removes_legacy_absolute_path_of_unreferenced_image(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    legacy = tmp_path / "legacy.png"
+    legacy.write_bytes(b"12345")
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.add(Image(user_id=1, file_path=str(legacy), sha256_hash="legacy", upload_date=past, last_uploaded_at=past))
+    db.commit()
+
+    report = MediaGCService(db, storage).collect(grace_seconds=60)
+
+    assert report.image_rows == 1 and report.reclaimed_bytes == 5
+    assert not legacy.exists()
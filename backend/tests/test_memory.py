@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers, UploadFile
+
+from src.core import instrumentation, memory
+from src.core.config import settings
+from src.core.memory import MemoryBudget, estimate_bytes, image_workload
+from src.db.base import Base
+from src.exceptions.upload_exception import MemoryBudgetBusy, MemoryBudgetExceeded, UploadTooLarge
+from src.models import Verification
+from src.services.stego_service import StegoService
+from src.storage.local import LocalFileStorage
+
+
+def test_budget_refuses_oversized_workloads_immediately():
+    budget = MemoryBudget(total_bytes=100)
+    started = time.monotonic()
+    with pytest.raises(MemoryBudgetExceeded):
+        budget.acquire(101, timeout=5)
+    assert time.monotonic() - started < 1
+
+
+def test_budget_queues_then_times_out():
+    budget = MemoryBudget(total_bytes=100)
+    budget.acquire(80, timeout=0)
+    with pytest.raises(MemoryBudgetBusy):
+        budget.acquire(30, timeout=0.05)
+
+    threading.Timer(0.05, budget.release, args=(80,)).start()
+    budget.acquire(30, timeout=5)
+    assert budget.reserved == 30
+
+
+@pytest.fixture
+def small_budget(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_BUDGET_BYTES", estimate_bytes("lsb", 96 * 96) - 1)
+    memory.get_memory_budget.cache_clear()
+    yield
+    memory.get_memory_budget.cache_clear()
+
+
+def test_workload_releases_its_reservation_and_samples_peak(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_TRACEMALLOC_SAMPLE_RATE", 1.0)
+    memory.get_memory_budget.cache_clear()
+    before = instrumentation.MEMORY_PEAK.count(engine="dct", megapixels="lt1")
+
+    with image_workload("dct", 100, 100):
+        np.zeros((100, 100, 3), dtype=np.float32)
+        assert memory.get_memory_budget().reserved == estimate_bytes("dct", 100 * 100)
+
+    assert memory.get_memory_budget().reserved == 0
+    assert instrumentation.MEMORY_PEAK.count(engine="dct", megapixels="lt1") == before + 1
+    memory.get_memory_budget.cache_clear()
+
+
+def test_verification_is_refused_before_decoding(small_budget, tmp_path, monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    service = StegoService(db, LocalFileStorage(str(tmp_path / "media")))
+    monkeypatch.setattr(service.stegano_lsb, "_decode", lambda data: pytest.fail("image decoded"))
+
+    out = BytesIO()
+    PILImage.fromarray(np.zeros((96, 96, 3), dtype=np.uint8)).save(out, format="BMP")
+    out.seek(0)
+    upload = UploadFile(out, filename="scan.bmp", headers=Headers({"content-type": "image/bmp"}))
+
+    # Refus dès l'en-tête de l'upload : la limite de pixels est dérivée du budget du moteur
+    with pytest.raises(UploadTooLarge):
+        service.verify_signature(1, upload)
+    assert db.query(Verification).count() == 0
+    db.close()
+
+
+def test_pixel_limit_is_derived_from_the_budget_per_engine(small_budget):
+    assert memory.max_pixels("lsb") == 96 * 96 - 1
+    assert memory.max_pixels("dct") == (estimate_bytes("lsb", 96 * 96) - 1) // memory.ENGINE_BYTES_PER_PIXEL["dct"]
+    # Moteur inconnu : coût par pixel le plus élevé
+    assert memory.max_pixels() == memory.max_pixels("lsb")
+
+
+def test_signing_upload_over_the_engine_limit_is_refused_before_storage(small_budget, tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    service = StegoService(db, storage)
+
+    out = BytesIO()
+    PILImage.fromarray(np.zeros((96, 96, 3), dtype=np.uint8)).save(out, format="BMP")
+    out.seek(0)
+    upload = UploadFile(out, filename="scan.bmp", headers=Headers({"content-type": "image/bmp"}))
+
+    with pytest.raises(UploadTooLarge):
+        service.create_signature(1, upload, "hello")
+    assert list(storage.list("originals/")) == []
+    assert os.listdir(storage.staging_dir()) == []
+    db.close()
+
+
+def test_tracemalloc_is_not_started_alongside_other_workloads(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_TRACEMALLOC_SAMPLE_RATE", 1.0)
+    memory.get_memory_budget.cache_clear()
+    before = instrumentation.MEMORY_PEAK.count(engine="dct", megapixels="lt1")
+
+    with image_workload("lsb", 10, 10):
+        # Seul le premier traitement est mesuré ; le second, concurrent, ne l'est pas
+        with image_workload("dct", 100, 100):
+            pass
+
+    assert not tracemalloc.is_tracing()
+    assert instrumentation.MEMORY_PEAK.count(engine="dct", megapixels="lt1") == before
+    memory.get_memory_budget.cache_clear()
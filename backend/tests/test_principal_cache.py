@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+
+from src.cache import get_cache
+from src.core.config import settings
+from src.db.session import SessionLocal, engine
+from src.dependencies.roles import is_admin_token
+from src.main import app
+from src.repositories.role_repository import RoleRepository
+from src.repositories.user_role_repository import UserRoleRepository
+from src.repositories.user_status_repository import UserStatusRepository
+from src.schemas.role_schema import RoleEnum
+from src.services.principal_service import PrincipalService, check_cache_sharing
+from src.services.user_role_service import UserRoleService
+
+
+@pytest.fixture(scope="module")
+def client():
+    # HTTPS : le cookie du refresh token est « secure »
+    with TestClient(app, base_url="https://testserver") as client:
+        yield client
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+
+def _tokens(res) -> tuple[str, str]:
+    assert res.status_code == 200
+    return res.json()["access_token"], res.cookies["refresh_token"]
+
+
+def _get(client, url: str, tokens: tuple[str, str], method: str = "GET"):
+    access_token, refresh_token = tokens
+    client.cookies.set("refresh_token", refresh_token)
+    return client.request(method, url, headers={"Authorization": f"Bearer {access_token}"})
+
+
+def _admin_tokens(client) -> tuple[str, str]:
+    return _tokens(client.post("/api/auth/login", json={"email": settings.DEFAULT_ADMIN_EMAIL,
+                                                         "password": settings.DEFAULT_ADMIN_PASSWORD}))
+
+
+def _principal_service(db) -> PrincipalService:
+    return PrincipalService(db, UserStatusRepository(db), UserRoleRepository(db), get_cache())
+
+
+def test_cached_principal_authenticates_without_queries(client):
+    admin = _admin_tokens(client)
+    assert _get(client, "/api/admin/profiles", admin).status_code == 200
+
+    with _QueryCounter() as queries:
+        assert _get(client, "/api/admin/profiles", admin).status_code == 200
+    assert queries.count == 0
+
+
+def test_deactivation_invalidates_principal(client):
+    user = _tokens(client.get("/api/auth/google/callback", params={"code": "linus@example.com"}))
+    user_id = _get(client, "/api/auth/me", user).json()["id"]
+    admin = _admin_tokens(client)
+    assert _get(client, "/api/admin/profiles", user).status_code == 403
+
+    assert _get(client, f"/api/users/{user_id}/deactivate", admin, method="DELETE").status_code == 204
+
+    assert _get(client, "/api/auth/me", user).status_code == 403
+
+
+def test_role_assignment_invalidates_principal(client):
+    user = _tokens(client.get("/api/auth/google/callback", params={"code": "grace.hopper@example.com"}))
+    user_id = _get(client, "/api/auth/me", user).json()["id"]
+    assert _get(client, "/api/admin/profiles", user).status_code == 403
+
+    db = SessionLocal()
+    try:
+        admin_role = RoleRepository(db).get_by_name(RoleEnum.ADMIN)
+        UserRoleService(db, UserRoleRepository(db), _principal_service(db)).assign_role(user_id, admin_role.id)
+    finally:
+        db.close()
+
+    assert _get(client, "/api/admin/profiles", user).status_code == 200
+
+
+def test_tokens_of_different_users_are_rejected(client):
+    user = _tokens(client.get("/api/auth/google/callback", params={"code": "alan@example.com"}))
+    admin = _admin_tokens(client)
+    assert _get(client, "/api/auth/me", (user[0], admin[1])).status_code == 401
+
+
+def test_refresh_token_is_not_accepted_as_access_token(client):
+    user = _tokens(client.get("/api/auth/google/callback", params={"code": "ada@example.com"}))
+    assert _get(client, "/api/auth/me", (user[1], user[1])).status_code == 401
+    assert _get(client, "/api/auth/me", (user[0], user[0])).status_code == 401
+
+
+def test_tokens_issued_before_the_type_claim_stay_valid(client):
+    user = _tokens(client.get("/api/auth/google/callback", params={"code": "grace@example.com"}))
+    user_id = _get(client, "/api/auth/me", user).json()["id"]
+    expire = datetime.now() + timedelta(minutes=5)
+    legacy = jwt.encode({"sub": str(user_id), "exp": expire}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    assert _get(client, "/api/auth/me", (legacy, legacy)).json()["id"] == user_id
+    client.cookies.set("refresh_token", legacy)
+    assert client.post("/api/auth/refresh").status_code == 200
+
+
+def test_is_admin_token_checks_token_type_and_status(client):
+    admin = _admin_tokens(client)
+    assert is_admin_token(admin[0])
+    assert not is_admin_token(admin[1])
+    assert not is_admin_token("not-a-jwt")
+
+    user = _tokens(client.get("/api/auth/google/callback", params={"code": "barbara@example.com"}))
+    user_id = _get(client, "/api/auth/me", user).json()["id"]
+    db = SessionLocal()
+    try:
+        admin_role = RoleRepository(db).get_by_name(RoleEnum.ADMIN)
+        UserRoleService(db, UserRoleRepository(db), _principal_service(db)).assign_role(user_id, admin_role.id)
+    finally:
+        db.close()
+    assert is_admin_token(user[0])
+
+    assert _get(client, f"/api/users/{user_id}/deactivate", admin, method="DELETE").status_code == 204
+    assert not is_admin_token(user[0])
+
+
+def test_per_process_cache_with_several_workers_is_reported(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert not check_cache_sharing()
+
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "redis")
+    assert check_cache_sharing()
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert check_cache_sharing()
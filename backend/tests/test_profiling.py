@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core import profiling
+from src.core.config import settings
+from src.core.instrumentation import stage
+from src.core.middleware import add_profiling_middleware
+from src.core.profiling import ProfileSession, ProfileStore
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_session_samples_only_threads_inside_a_region():
+    session = ProfileSession(interval_seconds=1)
+    inside, done = threading.Event(), threading.Event()
+
+    def worker():
+        with profiling.activate(session), stage("embed"):
+            inside.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    inside.wait(5)
+    session.sample()
+    done.set()
+    thread.join()
+    session.sample()
+
+    assert session.samples == 1
+    (stack,) = session.stacks
+    assert stack.startswith("[embed];")
+    assert "test_profiling:worker" in stack
+
+
+def test_store_is_a_bounded_ring(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    ids = []
+    for index in range(3):
+        session = ProfileSession(0.01, metadata={"method": "GET", "path": f"/{index}"})
+        session.started_at = 1000 + index
+        session.stacks["[sign];a:b"] = index + 1
+        ids.append(store.save(session))
+
+    assert [summary["id"] for summary in store.list()] == [ids[2], ids[1]]
+    assert store.get(ids[0]) is None
+    assert store.get_collapsed(ids[2]) == "[sign];a:b 3\n"
+    assert store.get_collapsed("../../etc/passwd") is None
+
+
+@pytest.fixture
+def profile_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    profiling.get_profile_store.cache_clear()
+    yield profiling.get_profile_store()
+    profiling.get_profile_store.cache_clear()
+
+
+def _app():
+    app = FastAPI()
+    add_profiling_middleware(app, is_admin_token=lambda token: token == "admin-token")
+
+    @app.get("/work")
+    def work():
+        with stage("work"):
+            _busy(0.05)
+        return {}
+
+    return app
+
+
+def test_admin_header_profiles_the_request(profile_store, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL_SECONDS", 0.001)
+    client = TestClient(_app())
+
+    response = client.get("/work", headers={"X-Profile": "1", "Authorization": "Bearer admin-token"})
+
+    profile_id = response.headers["x-profile-id"]
+    (summary,) = profile_store.list()
+    assert summary["id"] == profile_id and summary["trigger"] == "header" and summary["status"] == 200
+    assert summary["samples"] > 0
+    assert all(line.startswith("[work];") for line in profile_store.get_collapsed(profile_id).splitlines())
+
+
+def test_header_is_ignored_for_non_admins(profile_store):
+    client = TestClient(_app())
+
+    response = client.get("/work", headers={"X-Profile": "1", "Authorization": "Bearer user-token"})
+
+    assert "x-profile-id" not in response.headers
+    assert profile_store.list() == []
@@ -0,0 +1,59 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from src.core.config import settings
+from src.db.query_stats import fingerprint, parameters_shape, record_queries, track_queries
+
+
+def test_fingerprint_normalizes_literals_and_lists():
+    assert fingerprint("SELECT *  FROM users\n WHERE id = 42 AND name = 'bob'") == \
+        "SELECT * FROM users WHERE id = ? AND name = ?"
+    assert fingerprint("SELECT * FROM images WHERE id IN (?, ?, ?)") == "SELECT * FROM images WHERE id IN (...)"
+    assert fingerprint("SELECT * FROM t WHERE a = %(a_1)s") == "SELECT * FROM t WHERE a = ?"
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape({"email": "a@b.c", "id": 3}) == {"email": "str[5]", "id": "int"}
+    assert parameters_shape([("x",), ("y",)], executemany=True) == {"rows": 2, "row": ["str[1]"]}
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    record_queries(engine)
+    return engine
+
+
+def test_track_queries_counts_repeated_statements():
+    engine = _engine()
+    with track_queries("/signatures") as stats, engine.connect() as conn:
+        for image_id in range(3):
+            conn.execute(text("SELECT :id"), {"id": image_id})
+        conn.execute(text("SELECT 'other'"))
+
+    assert stats.count == 4
+    assert stats.repeated() == [("SELECT ?", 4)]
+
+
+def test_slow_queries_are_logged_with_parameter_shape(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="src.db.query_stats"), _engine().connect() as conn:
+        conn.execute(text("SELECT :secret"), {"secret": "p4ssw0rd"})
+
+    (record,) = [r for r in caplog.records if r.getMessage() == "slow query"]
+    assert record.fingerprint == "SELECT ?"
+    assert record.params_shape == ["str[8]"]  # paramètres positionnels du DBAPI sqlite3
+    assert "p4ssw0rd" not in str(record.__dict__)
+
+
+def test_query_budget_warning_in_debug(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET", 2)
+    engine = _engine()
+    with caplog.at_level(logging.WARNING, logger="src.db.query_stats"):
+        with track_queries("/signatures"), engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+
+    (record,) = [r for r in caplog.records if r.getMessage() == "query budget exceeded"]
+    assert (record.label, record.query_count) == ("/signatures", 3)
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.db.base import Base
+from src.models import Image
+from src.core.config import settings
+from src.services.media_gc_service import MediaGCService
+from src.services.recompression_service import RecompressionService, Throttle
+from src.storage.local import LocalFileStorage
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _encode(array, fmt):
+    out = BytesIO()
+    PILImage.fromarray(array).save(out, format=fmt)
+    return out.getvalue()
+
+
+def test_bmp_original_is_recompressed_losslessly(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    pixels = np.zeros((64, 64, 3), dtype=np.uint8)
+    pixels[::2, ::3] = (200, 10, 90)
+    bmp = _encode(pixels, "BMP")
+    storage.put("originals/abc.bmp", bmp)
+    db.add(Image(user_id=1, file_path="originals/abc.bmp", original_filename="scan.bmp",
+                 mime_type="image/bmp", sha256_hash="abc", file_size=len(bmp)))
+    db.commit()
+
+    sleeps = []
+    throttle = Throttle(cpu_budget=0.5, io_bytes_per_second=0, sleep=sleeps.append)
+    report = RecompressionService(db, storage, throttle).run()
+
+    image = db.query(Image).one()
+    assert report.recompressed == 1
+    assert image.file_path == "originals/abc.png"
+    assert image.mime_type == "image/png"
+    assert image.file_size < len(bmp)
+    assert image.recompressed_at is not None
+    # Ancienne clé conservée pour les lecteurs en cours, jusqu'au GC après le délai de grâce
+    assert image.superseded_file_path == "originals/abc.bmp"
+    assert storage.exists("originals/abc.bmp")
+    with PILImage.open(BytesIO(storage.read(image.file_path))) as result:
+        assert np.array_equal(np.asarray(result), pixels)
+    assert len(sleeps) == 1
+
+    # Une seconde passe ne retraite pas l'image
+    assert RecompressionService(db, storage, throttle).run().scanned == 0
+
+
+def test_non_recompressible_original_is_left_untouched(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    jpeg = _encode(np.full((32, 32, 3), 128, dtype=np.uint8), "JPEG")
+    storage.put("originals/j.jpg", jpeg)
+    db.add(Image(user_id=1, file_path="originals/j.jpg", sha256_hash="j"))
+    db.commit()
+
+    report = RecompressionService(db, storage, Throttle(1, 0)).run()
+
+    assert report.skipped == 1
+    assert storage.read("originals/j.jpg") == jpeg
+    assert db.query(Image).one().file_path == "originals/j.jpg"
+
+
+def test_superseded_original_is_deleted_by_gc_after_grace(db, tmp_path):
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    storage.put("originals/s.bmp", _encode(np.zeros((32, 32, 3), dtype=np.uint8), "BMP"))
+    db.add(Image(user_id=1, file_path="originals/s.bmp", sha256_hash="s"))
+    db.commit()
+    RecompressionService(db, storage, Throttle(1, 0)).run()
+
+    MediaGCService(db, storage).collect(grace_seconds=60)
+    assert storage.exists("originals/s.bmp")
+
+    # Recompressée il y a une heure ; la ligne, téléversée récemment, est conservée
+    db.query(Image).update({Image.recompressed_at: datetime.now(timezone.utc) - timedelta(hours=1)})
+    db.commit()
+    report = MediaGCService(db, storage).collect(grace_seconds=60)
+    assert report.originals == 1
+    assert not storage.exists("originals/s.bmp")
+    assert db.query(Image).one().superseded_file_path is None
+
+
+def test_failed_image_is_retried_on_later_runs_until_max_attempts(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RECOMPRESS_MAX_ATTEMPTS", 2)
+    storage = LocalFileStorage(str(tmp_path / "media"))
+    db.add(Image(user_id=1, file_path="originals/missing.bmp", sha256_hash="missing"))
+    db.commit()
+    service = RecompressionService(db, storage, Throttle(1, 0))
+
+    # Erreur transitoire (fichier absent) : l'image n'est pas marquée traitée
+    assert service.run().errors == 1
+    image = db.query(Image).one()
+    assert image.recompressed_at is None and image.recompress_attempts == 1
+
+    storage.put("originals/missing.bmp", _encode(np.zeros((32, 32, 3), dtype=np.uint8), "BMP"))
+    assert service.run().recompressed == 1
+    assert db.query(Image).one().file_path == "originals/missing.png"
+
+
+def test_image_is_abandoned_after_max_attempts(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RECOMPRESS_MAX_ATTEMPTS", 2)
+    db.add(Image(user_id=1, file_path="originals/gone.bmp", sha256_hash="gone"))
+    db.commit()
+    service = RecompressionService(db, LocalFileStorage(str(tmp_path / "media")), Throttle(1, 0))
+
+    assert [service.run().errors for _ in range(3)] == [1, 1, 0]
+    assert db.query(Image).one().recompress_attempts == 2
+
+
+def test_throttle_respects_cpu_and_io_budgets():
+    throttle = Throttle(cpu_budget=0.25, io_bytes_per_second=1000, sleep=lambda s: None)
+    assert throttle.pause(busy_seconds=1.0, io_bytes=0) == pytest.approx(3.0)
+    assert throttle.pause(busy_seconds=0.1, io_bytes=10_000) == pytest.approx(9.9)
@@ -0,0 +1,70 @@
+import numpy as np
+
+from benchmarks import corpus, quality, robustness
+from benchmarks.attacks import ATTACKS_BY_NAME
+from benchmarks.cases import MESSAGE, dct_grid, select_cases
+
+
+def _row(case: str, cost: float, robust: float, eligible: bool = True) -> dict:
+    return {"case": case, "cost_per_mp": cost, "robustness": robust, "eligible": eligible}
+
+
+def test_attacks_alter_images_as_expected():
+    image = corpus.load_image(0.05, "photo", "png", cache_dir=None)
+    original = quality.decode(image.data)
+
+    assert np.array_equal(quality.decode(ATTACKS_BY_NAME["none"].apply(image.data)), original)
+    for name in ("jpeg75", "resize50", "blur3", "noise2"):
+        attacked = quality.decode(ATTACKS_BY_NAME[name].apply(image.data))
+        assert attacked.shape == original.shape
+        assert quality.psnr(original, attacked) is not None
+    cropped = quality.decode(ATTACKS_BY_NAME["crop10"].apply(image.data))
+    assert cropped.shape[0] < original.shape[0] and cropped.shape[1] < original.shape[1]
+    # Bruit reproductible d'une exécution à l'autre
+    assert ATTACKS_BY_NAME["noise5"].apply(image.data) == ATTACKS_BY_NAME["noise5"].apply(image.data)
+
+
+def test_quality_metrics():
+    image = quality.decode(corpus.load_image(0.05, "photo", "png", cache_dir=None).data)
+    assert quality.psnr(image, image) is None
+    assert quality.ssim(image, image) > 0.999
+    assert quality.ssim(image, ATTACKS_BY_NAME["blur5"].func(image)) < 0.999
+
+    assert quality.bit_error_rate("1010", "1010") == 0.0
+    assert quality.bit_error_rate("1010", "0110") == 0.5
+    assert quality.bit_error_rate("1010", "10") == 0.5
+
+
+def test_clean_signature_reads_back_reference_bits():
+    case = select_cases({"lsb"}, {"r5"})[0]
+    image = corpus.load_image(0.05, "photo", "png", cache_dir=None)
+
+    signature = robustness._sign(case, image)
+    assert "error" not in signature and signature["psnr"] > 40
+    assert len(signature["reference_bits"]) == case.payload_bits
+
+    clean = robustness._attack(case, signature["signed"], ATTACKS_BY_NAME["none"], signature["reference_bits"])
+    assert clean["ok"] and clean["ber"] == 0.0
+    blurred = robustness._attack(case, signature["signed"], ATTACKS_BY_NAME["blur3"], signature["reference_bits"])
+    assert not blurred["ok"] and blurred["ber"] > 0.1
+
+
+def test_dct_grid_cases_extract_at_production_size():
+    case = dct_grid([24], [30])[0]
+    assert case.name == "dct/s24-r30" and case.params["strength"] == 24.0
+    signed = case.embed(corpus.load_image(2, "photo", "png", cache_dir=None).data, ".png")
+    assert case.extract(signed) == MESSAGE
+    assert len(case.read_bits(signed)) == case.payload_bits
+
+
+def test_pareto_front_keeps_non_dominated_eligible_cases():
+    rows = [
+        _row("cheap", 0.1, 0.2),
+        _row("balanced", 0.5, 0.6),
+        _row("dominated", 0.6, 0.5),
+        _row("robust", 1.0, 0.9),
+        _row("visible", 0.05, 1.0, eligible=False),
+    ]
+    assert robustness.pareto_front(rows) == ["cheap", "balanced", "robust"]
+    assert "*cheap" in robustness.render([{**row, "psnr": None, "ssim": None, "ber": None, "success": {}}
+                                          for row in rows], ["cheap"])
@@ -0,0 +1,158 @@
+import uuid
+from io import BytesIO
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers, UploadFile
+
+from benchmarks import corpus, quality
+from src.db.base import Base
+from src.models import Signature, Verification
+from src.core.config import settings
+from src.services.stego_service import StegoService
+from src.storage.local import LocalFileStorage
+from src.utils.stego_utils import pack_signed_message, unpack_signed_message
+
+# 1 MP : capacité DCT suffisante pour l'UUID, le nonce, le tag et le message (redondance 30)
+_IMAGE = corpus.generate(1.0, "photo")
+_CONTENT_TYPES = {".png": "image/png", ".bmp": "image/bmp"}
+# Secrets DCT explicites : par défaut ils dérivent de l'identifiant de l'utilisateur courant
+_SECRETS = {"password": "sign-password", "key_positions_secret": "sign-positions"}
+
+
+@pytest.fixture
+def service(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    yield StegoService(db, LocalFileStorage(str(tmp_path / "media")))
+    db.close()
+
+
+def _upload(data: bytes, extension: str, name: str = "image") -> UploadFile:
+    return UploadFile(BytesIO(bytes(data)), filename=f"{name}{extension}",
+                      headers=Headers({"content-type": _CONTENT_TYPES[extension]}))
+
+
+def _original(extension: str) -> bytes:
+    return corpus.encode(_IMAGE, extension.lstrip("."))
+
+
+def _sign_and_load(service, extension: str) -> tuple[str, bytes]:
+    signed = service.create_signature(1, _upload(_original(extension), extension), "hello", **_SECRETS)
+    return signed.signature_uuid, service.load_signed_image(signed.signature_uuid).data
+
+
+@pytest.mark.parametrize("extension, engine", [(".png", "dct"), (".bmp", "lsb")])
+def test_sign_verify_round_trip_resolves_embedded_uuid(service, extension, engine):
+    signature_uuid, data = _sign_and_load(service, extension)
+    assert service.db.query(Signature).one().engine == engine
+
+    result = service.verify_signature(2, _upload(data, extension, "signed"), **_SECRETS)
+
+    assert result.valid and result.message == "hello"
+    assert result.signature_uuid == signature_uuid and result.author_id == 1
+    verification = service.db.query(Verification).one()
+    assert verification.verified and verification.signature_uuid == signature_uuid
+
+
+def test_dct_wrong_password_is_rejected(service):
+    _, data = _sign_and_load(service, ".png")
+
+    result = service.verify_signature(2, _upload(data, ".png", "signed"), password="wrong-password",
+                                      key_positions_secret=_SECRETS["key_positions_secret"])
+
+    assert not result.valid and "AES" in result.message
+    assert not service.db.query(Verification).one().verified
+
+
+def test_dct_tampered_ciphertext_is_rejected(service, monkeypatch):
+    encrypt = service.stegano_dct.aes_encrypt
+
+    def tampered(*args, **kwargs):
+        payload = bytearray(encrypt(*args, **kwargs))
+        payload[-1] ^= 0x01  # tag GCM altéré : le CRC du flux reste cohérent
+        return bytes(payload)
+    monkeypatch.setattr(service.stegano_dct, "aes_encrypt", tampered)
+    _, data = _sign_and_load(service, ".png")
+
+    result = service.verify_signature(2, _upload(data, ".png", "signed"), **_SECRETS)
+
+    assert not result.valid and "AES" in result.message
+
+
+def test_lsb_corrupted_stream_is_rejected(service):
+    _, data = _sign_and_load(service, ".bmp")
+    # Tous les bits de poids faible inversés : ni marqueur de fin ni flux zlib lisible
+    flipped = corpus.encode(quality.decode(data) ^ 1, "bmp")
+
+    result = service.verify_signature(2, _upload(flipped, ".bmp", "signed"))
+
+    assert not result.valid
+    assert service.db.query(Verification).one().signature_uuid is None
+
+
+def test_unknown_embedded_uuid_is_not_resolved(service):
+    unknown = str(uuid.uuid4())
+    lsb = service.stegano_lsb.hide_message_buffer(_original(".bmp"), pack_signed_message(unknown, "orphan"),
+                                                  repeat=10, image_format="BMP")
+    dct = service.stegano_dct.embed_message_aes_buffer(_original(".png"), "orphan", password="_2_",
+                                                       key_positions_secret="_2_", signature_uuid=unknown)
+
+    for data, extension in ((lsb, ".bmp"), (dct, ".png")):
+        result = service.verify_signature(2, _upload(data, extension, "foreign"))
+        # Message authentique mais rattaché à aucune signature connue
+        assert result.valid and result.message == "orphan"
+        assert result.signature_uuid is None and result.author_id is None
+    assert service.db.query(Verification).filter(Verification.signature_uuid.isnot(None)).count() == 0
+
+
+def test_forged_lsb_uuid_is_not_attributed(service, monkeypatch):
+    # L'UUID d'une signature DCT de la victime est public (URL de téléchargement)
+    victim_uuid, _ = _sign_and_load(service, ".png")
+    # Le faussaire intègre cet UUID sans connaître SECRET_KEY : l'étiquette ne correspond pas
+    monkeypatch.setattr(settings, "SECRET_KEY", "forger-secret")
+    forged = service.stegano_lsb.hide_message_buffer(_original(".bmp"), pack_signed_message(victim_uuid, "mine now"),
+                                                     repeat=10, image_format="BMP")
+    monkeypatch.undo()
+
+    result = service.verify_signature(2, _upload(forged, ".bmp", "forged"))
+
+    assert result.valid and result.message == "mine now"
+    assert result.signature_uuid is None and result.author_id is None and result.signed_at is None
+    assert service.db.query(Verification).one().signature_uuid is None
+
+
+def test_authentic_uuid_of_another_engine_is_not_attributed(service):
+    # Étiquette valide (UUID d'une signature DCT rejoué dans une image LSB) : le moteur ne correspond pas
+    victim_uuid, _ = _sign_and_load(service, ".png")
+    replayed = service.stegano_lsb.hide_message_buffer(_original(".bmp"), pack_signed_message(victim_uuid, "replay"),
+                                                       repeat=10, image_format="BMP")
+
+    result = service.verify_signature(2, _upload(replayed, ".bmp", "replayed"))
+
+    assert result.valid and result.signature_uuid is None and result.author_id is None
+
+
+def test_forged_dct_uuid_is_not_attributed(service):
+    # Le sel AES-GCM (UUID) est public : le faussaire chiffre avec ses propres secrets et l'UUID de la victime
+    victim_uuid, _ = _sign_and_load(service, ".png")
+    forged = service.stegano_dct.embed_message_aes_buffer(_original(".png"), "forged", password="_2_",
+                                                          key_positions_secret="_2_", signature_uuid=victim_uuid)
+
+    result = service.verify_signature(2, _upload(forged, ".png", "forged"))
+
+    assert result.valid and result.message == "forged"
+    assert result.signature_uuid is None and result.author_id is None
+
+
+def test_unpack_ignores_missing_or_corrupted_uuid_prefix():
+    signature_uuid = str(uuid.uuid4())
+    assert unpack_signed_message(pack_signed_message(signature_uuid, "msg")) == (signature_uuid, "msg")
+    assert unpack_signed_message("legacy message") == (None, "legacy message")
+    corrupted = "\x1e" + "!" * 38 + "msg"
+    assert unpack_signed_message(corrupted) == (None, corrupted)
+    # Message modifié après signature : l'étiquette ne couvre plus le texte
+    packed = pack_signed_message(signature_uuid, "msg")
+    assert unpack_signed_message(packed[:-3] + "gsm") == (None, "gsm")
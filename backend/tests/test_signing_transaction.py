@@ -0,0 +1,90 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers, UploadFile
+
+from src.db.base import Base
+from src.models import Image, Signature, Verification
+from src.services.stego_service import StegoService
+from src.storage.local import LocalFileStorage
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _bmp_upload(name="scan.bmp") -> UploadFile:
+    pixels = (np.random.default_rng(0).random((96, 96, 3)) * 255).astype(np.uint8)
+    out = BytesIO()
+    PILImage.fromarray(pixels).save(out, format="BMP")
+    out.seek(0)
+    return UploadFile(out, filename=name, headers=Headers({"content-type": "image/bmp"}))
+
+
+def _count(db, statement_prefix):
+    calls = []
+
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(statement_prefix):
+            calls.append(statement)
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    return calls, commits
+
+
+def test_signing_commits_once_and_reuses_known_images(db, tmp_path):
+    service = StegoService(db, LocalFileStorage(str(tmp_path / "media")))
+    selects, commits = _count(db, "SELECT")
+
+    first = service.create_signature(1, _bmp_upload(), "hello")
+    assert len(commits) == 1
+    # Ni SELECT-avant-INSERT sur l'image, ni refresh après commit
+    assert selects == []
+
+    second = service.create_signature(1, _bmp_upload("copy.bmp"), "hello again")
+    assert len(commits) == 2
+    assert first.image_id == second.image_id
+    assert db.query(Image).count() == 1
+    assert db.query(Signature).count() == 2
+    # Une sortie par signature : l'UUID intégré rend chaque image signée unique
+    assert {key for (key,) in db.query(Signature.output_storage_key)} == {first.file_path, second.file_path}
+    assert first.file_path != second.file_path
+
+
+def test_failed_signing_rolls_back_everything(db, tmp_path, monkeypatch):
+    service = StegoService(db, LocalFileStorage(str(tmp_path / "media")))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("embed failed")
+    monkeypatch.setattr(service, "_embed", fail)
+
+    with pytest.raises(RuntimeError):
+        service.create_signature(1, _bmp_upload(), "hello")
+
+    assert db.query(Image).count() == 0
+    assert db.query(Signature).count() == 0
+
+
+def test_verification_is_recorded_in_one_commit(db, tmp_path):
+    service = StegoService(db, LocalFileStorage(str(tmp_path / "media")))
+    signed = service.create_signature(1, _bmp_upload(), "hello")
+    data = service.load_signed_image(signed.signature_uuid).data
+    _, commits = _count(db, "SELECT")
+
+    result = service.verify_signature(
+        2, UploadFile(BytesIO(data), filename="signed.bmp", headers=Headers({"content-type": "image/bmp"}))
+    )
+
+    assert result.valid and result.signature_uuid == signed.signature_uuid
+    assert len(commits) == 1
+    assert db.query(Verification).one().signature_uuid == signed.signature_uuid
@@ -0,0 +1,106 @@
+import base64
+import os
+from hashlib import sha256
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks import corpus
+from src.core.config import settings
+from src.db.session import SessionLocal
+from src.dependencies.injection import get_media_storage
+from src.main import app
+from src.models import Signature, Verification
+from src.storage import SIGNED_PREFIX
+from src.storage.local import LocalFileStorage
+
+_PNG = corpus.load_image(0.05, "photo", "png", cache_dir=None)
+_BMP = corpus.load_image(0.05, "photo", "bmp", cache_dir=None)
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    storage = LocalFileStorage(str(tmp_path_factory.mktemp("media")))
+    app.dependency_overrides[get_media_storage] = lambda: storage
+    # HTTPS : le cookie du refresh token est « secure »
+    with TestClient(app, base_url="https://testserver") as client:
+        res = client.get("/api/auth/google/callback", params={"code": "stego.api@example.com"})
+        client.headers["Authorization"] = f"Bearer {res.json()['access_token']}"
+        yield client
+    app.dependency_overrides.pop(get_media_storage)
+
+
+def _verification_count() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Verification).count()
+    finally:
+        db.close()
+
+
+def test_oversized_upload_returns_413(client, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", len(_PNG.data) - 1)
+
+    res = client.post("/api/stego/upload-signature", data={"message": "hello"},
+                      files={"file": ("big.png", _PNG.data, "image/png")})
+    assert res.status_code == 413
+    res = client.post("/api/stego/verify", files={"file": ("big.png", _PNG.data, "image/png")})
+    assert res.status_code == 413
+
+
+def test_unreadable_upload_returns_400_without_recording_a_verification(client):
+    before = _verification_count()
+
+    res = client.post("/api/stego/verify", files={"file": ("broken.png", b"\x89PNG garbage", "image/png")})
+    assert res.status_code == 400
+    res = client.post("/api/stego/upload-signature", data={"message": "hello"},
+                      files={"file": ("empty.png", b"", "image/png")})
+    assert res.status_code == 400
+    # Rejeté avant toute extraction : aucune vérification enregistrée
+    assert _verification_count() == before
+
+
+def _sign(client, message: str = "hello") -> dict:
+    res = client.post("/api/stego/upload-signature", data={"message": message},
+                      files={"file": ("scan.bmp", _BMP.data, "image/bmp")})
+    assert res.status_code == 201
+    return res.json()
+
+
+def test_sign_response_exposes_storage_key_and_download_url(client):
+    body = _sign(client)
+
+    # Clé de stockage relative (plus de chemin absolu du serveur)
+    assert body["file_path"].startswith(SIGNED_PREFIX) and body["file_path"].endswith(".bmp")
+    assert not os.path.isabs(body["file_path"])
+    assert body["download_url"].endswith(f"/api/stego/download/{body['signature_uuid']}")
+
+    db = SessionLocal()
+    try:
+        signature = db.query(Signature).filter_by(signature_uuid=body["signature_uuid"]).one()
+        assert signature.output_storage_key == body["file_path"]
+        assert (signature.output_format, signature.engine) == ("bmp", "lsb")
+        assert signature.engine_params == {"repeat": 10}
+    finally:
+        db.close()
+    listed = {item["signature_uuid"]: item for item in client.get("/api/stego/signatures").json()}
+    assert listed[body["signature_uuid"]]["image_id"] == body["image_id"]
+
+
+def test_download_returns_content_addressed_etag_and_honours_if_none_match(client):
+    body = _sign(client, "etag")
+
+    res = client.get(f"/api/stego/download/{body['signature_uuid']}")
+    assert res.status_code == 200
+    data = base64.b64decode(res.json()["base64_data"])
+    assert res.headers["etag"] == f'"{sha256(data).hexdigest()}"'
+    assert res.headers["cache-control"] == "private, max-age=31536000, immutable"
+    assert res.json()["filename"] == os.path.basename(body["file_path"])
+    assert res.json()["media_type"] == "image/bmp"
+
+    res = client.get(f"/api/stego/download/{body['signature_uuid']}",
+                     headers={"If-None-Match": f'"other", {res.headers["etag"]}'})
+    assert res.status_code == 304 and res.content == b""
+    assert res.headers["etag"] == f'"{sha256(data).hexdigest()}"'
+
+    assert client.get("/api/stego/download/00000000-0000-4000-8000-000000000000").status_code == 404
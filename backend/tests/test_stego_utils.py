@@ -0,0 +1,82 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.utils import stego_utils
+from src.utils.stego_utils import embed_data_into_image, extract_data_from_image
+
+
+@pytest.fixture(scope="module")
+def rsa_pems():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return public_pem, private_pem
+
+
+def _blank_png(size=(160, 160)) -> bytes:
+    out = BytesIO()
+    Image.new("RGB", size, (120, 130, 140)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_rsa_hybrid_roundtrip_large_message(rsa_pems):
+    public_pem, private_pem = rsa_pems
+    # incompressible message bigger than the raw RSA-OAEP limit
+    message = Fernet.generate_key().decode() * 20
+
+    out, signature_uuid = embed_data_into_image(
+        _blank_png(), author_id=7, message=message,
+        mode="rsa-hybrid", rsa_public_pem=public_pem,
+    )
+    payload = extract_data_from_image(out.getvalue(), rsa_private_pem=private_pem)
+
+    assert payload["message"] == message
+    assert payload["signature_uuid"] == signature_uuid
+    assert payload["author_id"] == 7
+
+
+def test_raw_rsa_rejects_oversized_payload(rsa_pems):
+    public_pem, _ = rsa_pems
+    with pytest.raises(ValueError, match="rsa-hybrid"):
+        stego_utils._encrypt_payload(b"x" * 400, "rsa", rsa_public_pem=public_pem)
+
+
+def test_key_objects_are_cached_and_evictable(rsa_pems, monkeypatch):
+    _, private_pem = rsa_pems
+    stego_utils.clear_key_cache()
+    calls = []
+    real_loader = stego_utils.serialization.load_pem_private_key
+
+    def counting_loader(pem, password=None):
+        calls.append(pem)
+        return real_loader(pem, password=password)
+
+    monkeypatch.setattr(stego_utils.serialization, "load_pem_private_key", counting_loader)
+
+    first = stego_utils._get_rsa_private_key(private_pem)
+    second = stego_utils._get_rsa_private_key(private_pem.decode())
+    assert first is second
+    assert len(calls) == 1
+
+    assert stego_utils.evict_key_material(private_pem)
+    stego_utils._get_rsa_private_key(private_pem)
+    assert len(calls) == 2
+
+
+def test_key_cache_is_bounded():
+    stego_utils.clear_key_cache()
+    for _ in range(stego_utils.KEY_CACHE_MAX_ENTRIES + 5):
+        stego_utils._get_fernet(Fernet.generate_key())
+    assert len(stego_utils._KEY_CACHE) == stego_utils.KEY_CACHE_MAX_ENTRIES
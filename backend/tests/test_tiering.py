@@ -0,0 +1,143 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.db.base import Base
+from src.repositories.media_access_repository import MediaAccessRepository
+from src.services.tiering_service import TieringService
+from src.storage.disk_cache import DiskLRUCache
+from src.storage.local import LocalFileStorage
+from src.storage.tiered import TieredStorage
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def tiered(tmp_path):
+    return TieredStorage(
+        hot=LocalFileStorage(str(tmp_path / "hot")),
+        cold=LocalFileStorage(str(tmp_path / "cold")),
+        cache=DiskLRUCache(str(tmp_path / "cache"), max_bytes=2048),
+    )
+
+
+def _age(storage, key, days):
+    past = time.time() - days * 86400
+    os.utime(storage.path_for(key), (past, past))
+
+
+def test_demoted_object_is_read_through_the_cache(tiered):
+    data = b"pixel" * 100
+    tiered.put("signed/a.png", data)
+
+    assert tiered.demote("signed/a.png") < len(data)
+    assert not tiered.hot.exists("signed/a.png")
+    assert tiered.exists("signed/a.png")
+
+    assert tiered.read("signed/a.png") == data
+    assert "signed/a.png" in tiered.cache
+    assert tiered.read_range("signed/a.png", 5, 5) == b"pixel"
+    with tiered.open_buffer("signed/a.png") as view:
+        assert bytes(view) == data
+
+    # Une réécriture remet l'objet dans le niveau chaud et purge la copie froide
+    tiered.put("signed/a.png", b"new")
+    assert tiered.read("signed/a.png") == b"new"
+    assert not tiered.cold.exists("signed/a.png")
+    assert "signed/a.png" not in tiered.cache
+
+
+def test_disk_cache_is_bounded(tmp_path):
+    cache = DiskLRUCache(str(tmp_path / "cache"), max_bytes=100)
+    cache.put("a", b"x" * 40)
+    cache.put("b", b"x" * 40)
+    cache.get_path("a")
+    cache.put("c", b"x" * 40)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.size == 80
+    assert len(os.listdir(cache.root)) == 2
+    assert len(DiskLRUCache(cache.root, max_bytes=100)) == 2
+
+
+def test_disk_cache_budget_and_evictions_are_shared_between_workers(tmp_path):
+    root = str(tmp_path / "cache")
+    first, second = DiskLRUCache(root, max_bytes=100), DiskLRUCache(root, max_bytes=100)
+    first.put("a", b"x" * 40)
+    second.put("b", b"x" * 40)
+    second.put("c", b"x" * 40)
+
+    # Budget global : l'écriture du second worker évince le fichier le plus ancien du premier
+    assert first.get_path("a") is None and "a" not in second
+    assert first.size <= 100 and second.size == 80
+
+
+def test_object_evicted_by_another_worker_is_read_from_the_cold_tier(tmp_path):
+    root = str(tmp_path / "cache")
+    cold = LocalFileStorage(str(tmp_path / "cold"))
+    workers = [
+        TieredStorage(hot=LocalFileStorage(str(tmp_path / "hot")), cold=cold, cache=DiskLRUCache(root, 4096))
+        for _ in range(2)
+    ]
+    workers[0].put("signed/a.png", b"pixel" * 100)
+    workers[0].demote("signed/a.png")
+    assert workers[0].read("signed/a.png") == b"pixel" * 100
+
+    workers[1].cache.discard("signed/a.png")
+
+    assert workers[0].read("signed/a.png") == b"pixel" * 100
+    with workers[0].open_buffer("signed/a.png") as view:
+        assert bytes(view) == b"pixel" * 100
+
+
+def test_only_inactive_objects_are_demoted(db, tiered):
+    for key in ("originals/old.png", "originals/read.png", "originals/new.png"):
+        tiered.put(key, b"content")
+    _age(tiered.hot, "originals/old.png", days=40)
+    _age(tiered.hot, "originals/read.png", days=40)
+    tiered.read("originals/read.png")
+
+    service = TieringService(db, tiered)
+    report = service.demote_inactive(cold_after_days=30)
+
+    assert report.demoted == 1
+    assert tiered.cold.exists("originals/old.png")
+    assert tiered.hot.exists("originals/read.png")
+    assert tiered.hot.exists("originals/new.png")
+    assert len(tiered.tracker) == 0
+    assert "originals/read.png" in service.access_repo.last_accessed(["originals/read.png"])
+
+
+def test_concurrent_flushes_of_the_same_key_keep_the_latest_access(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'access.db'}")
+    Base.metadata.create_all(engine)
+    first, second = sessionmaker(bind=engine)(), sessionmaker(bind=engine)()
+    now = time.time()
+
+    # Un autre worker vide la même clé, inconnue jusque-là, juste avant l'écriture de ce worker
+    def concurrent_flush(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT") and not concurrent_flush.done:
+            concurrent_flush.done = True
+            MediaAccessRepository(first).record_many({"signed/a.png": now, "signed/b.png": now - 10})
+    concurrent_flush.done = False
+    event.listen(engine, "before_cursor_execute", concurrent_flush)
+    try:
+        MediaAccessRepository(second).record_many({"signed/a.png": now - 60, "signed/b.png": now})
+    finally:
+        event.remove(engine, "before_cursor_execute", concurrent_flush)
+
+    # Ni conflit de clé primaire ni recul de date
+    accessed = MediaAccessRepository(second).last_accessed(["signed/a.png", "signed/b.png"])
+    assert accessed == {"signed/a.png": pytest.approx(now), "signed/b.png": pytest.approx(now)}
+    first.close()
+    second.close()
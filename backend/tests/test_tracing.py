@@ -0,0 +1,150 @@
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src.core import tracing
+from src.core.config import settings
+from src.core.instrumentation import stage
+from src.core.middleware import add_tracing_middleware
+from src.db.query_tracing import trace_queries
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SAMPLED = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+class _Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def by_name(self, name):
+        return next(span for span in self.spans if span.name == name)
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    collector = _Collector()
+    monkeypatch.setattr(tracing, "get_exporter", lambda: collector)
+    return collector
+
+
+def test_parse_traceparent():
+    assert tracing.parse_traceparent(SAMPLED) == (TRACE_ID, "00f067aa0ba902b7", True)
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-00")[2] is False
+    assert tracing.parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert tracing.parse_traceparent("garbage") is None
+
+
+def test_unsampled_trace_records_nothing(collector, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0.0)
+    with tracing.start_trace("root"):
+        assert tracing.span("child") is tracing._NOOP
+    assert collector.spans == []
+
+
+def test_spans_nest_and_cross_threads(collector):
+    with tracing.start_trace("root", traceparent=SAMPLED):
+        with stage("dct"):
+            task = tracing.bind(lambda: None, name="background")
+    thread = threading.Thread(target=task)
+    thread.start()
+    thread.join()
+
+    root, dct, background = (collector.by_name(name) for name in ("root", "dct", "background"))
+    assert {span.trace_id for span in collector.spans} == {TRACE_ID}
+    assert root.parent_id == "00f067aa0ba902b7"
+    assert dct.parent_id == root.span_id
+    assert background.parent_id == dct.span_id
+
+
+def test_errors_mark_the_span(collector):
+    with pytest.raises(ValueError):
+        with tracing.start_trace("root", traceparent=SAMPLED), tracing.span("failing"):
+            raise ValueError()
+    assert collector.by_name("failing").status == "ERROR"
+
+
+def test_sql_queries_become_spans(collector):
+    engine = create_engine("sqlite://")
+    trace_queries(engine)
+    with tracing.start_trace("root", traceparent=SAMPLED), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    query = collector.by_name("db.query")
+    assert query.attributes == {"db.system": "sqlite", "db.statement": "SELECT 1"}
+    assert query.parent_id == collector.by_name("root").span_id
+
+
+def test_middleware_continues_incoming_trace(collector):
+    app = FastAPI()
+    add_tracing_middleware(app)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with stage("lookup"):
+            return {"id": item_id}
+
+    response = TestClient(app).get("/items/1", headers={"traceparent": SAMPLED})
+
+    root = collector.by_name("HTTP GET /items/{item_id}")
+    assert root.trace_id == TRACE_ID and root.attributes["http.status_code"] == 200
+    assert collector.by_name("lookup").parent_id == root.span_id
+    assert response.headers["traceparent"] == root.traceparent
+
+
+def test_jsonl_exporter_writes_otlp_fields(tmp_path):
+    exporter = tracing.JsonlSpanExporter(str(tmp_path / "spans.jsonl"), max_bytes=1024)
+    span = tracing.Span(TRACE_ID, None, True, "root", {"k": "v"})
+    span.end_ns = span.start_ns + 10
+    exporter._queue.put(span)
+    exporter.flush()
+
+    (line,) = (tmp_path / "spans.jsonl").read_text().splitlines()
+    record = json.loads(line)
+    assert record["traceId"] == TRACE_ID and record["name"] == "root" and record["attributes"] == {"k": "v"}
+
+
+def test_jsonl_exporter_rotates_into_numbered_backups(tmp_path):
+    exporter = tracing.JsonlSpanExporter(str(tmp_path / "spans.jsonl"), max_bytes=0, backup_count=2)
+    for name in ("first", "second", "third", "fourth"):
+        span = tracing.Span(TRACE_ID, None, True, name)
+        span.end_ns = span.start_ns + 10
+        exporter._queue.put(span)
+        exporter.flush()
+
+    names = [json.loads((tmp_path / f).read_text())["name"] for f in ("spans.jsonl", "spans.jsonl.1", "spans.jsonl.2")]
+    assert names == ["fourth", "third", "second"]
+    assert not (tmp_path / "spans.jsonl.3").exists()
+
+
+@pytest.mark.parametrize("exporter, expected", [
+    ("none", tracing.NullSpanExporter),
+    ("log", tracing.LogSpanExporter),
+    ("jsonl", tracing.JsonlSpanExporter),
+])
+def test_exporter_selection(monkeypatch, tmp_path, exporter, expected):
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", exporter)
+    monkeypatch.setattr(settings, "TRACING_EXPORT_PATH", str(tmp_path / "spans.jsonl"))
+    tracing.get_exporter.cache_clear()
+    try:
+        assert isinstance(tracing.get_exporter(), expected)
+    finally:
+        tracing.get_exporter.cache_clear()
+
+
+@pytest.mark.parametrize("path", [None, "traces/spans.jsonl"])
+def test_file_export_requires_an_absolute_path(monkeypatch, path):
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "jsonl")
+    monkeypatch.setattr(settings, "TRACING_EXPORT_PATH", path)
+    tracing.get_exporter.cache_clear()
+    try:
+        with pytest.raises(ValueError):
+            tracing.get_exporter()
+    finally:
+        tracing.get_exporter.cache_clear()
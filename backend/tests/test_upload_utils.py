@@ -0,0 +1,67 @@
+import os
+from hashlib import sha256
+from io import BytesIO
+
+import pytest
+
+from benchmarks import corpus
+from src.core.config import settings
+from src.exceptions.upload_exception import InvalidImageUpload, UploadTooLarge
+from src.utils.upload_utils import image_dimensions, ingest_upload, read_upload
+
+_PNG = corpus.load_image(0.05, "photo", "png", cache_dir=None)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Plusieurs blocs par upload : les limites sont appliquées au fil de l'eau
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4096)
+
+
+def test_ingest_hashes_incrementally_and_reads_dimensions(tmp_path):
+    upload = ingest_upload(BytesIO(_PNG.data), str(tmp_path))
+
+    with open(upload.temp_path, "rb") as f:
+        stored = f.read()
+    assert stored == _PNG.data
+    assert upload.sha256_hash == sha256(_PNG.data).hexdigest()
+    assert upload.size == len(_PNG.data)
+    assert (upload.width, upload.height) == (_PNG.width, _PNG.height)
+    assert os.path.basename(upload.temp_path).startswith(".incoming_")
+
+
+def test_oversized_upload_is_rejected_without_leftover(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", len(_PNG.data) - 1)
+
+    with pytest.raises(UploadTooLarge):
+        ingest_upload(BytesIO(_PNG.data), str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_pixel_limit_is_enforced_from_header_before_body(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_PIXELS", _PNG.width * _PNG.height - 1)
+    stream = BytesIO(_PNG.data)
+
+    with pytest.raises(UploadTooLarge):
+        ingest_upload(stream, str(tmp_path))
+    # Refus au premier bloc : le reste du corps n'est jamais lu
+    assert stream.tell() == settings.UPLOAD_CHUNK_SIZE < len(_PNG.data)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("data", [b"", b"not an image at all" * 100], ids=["empty", "unreadable"])
+def test_empty_or_unreadable_upload_is_invalid(tmp_path, data):
+    with pytest.raises(InvalidImageUpload):
+        ingest_upload(BytesIO(data), str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(InvalidImageUpload):
+        read_upload(BytesIO(data))
+
+
+def test_read_upload_applies_the_same_limits(monkeypatch):
+    assert bytes(read_upload(BytesIO(_PNG.data))) == _PNG.data
+    assert image_dimensions(_PNG.data) == (_PNG.width, _PNG.height)
+
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+    with pytest.raises(UploadTooLarge):
+        read_upload(BytesIO(_PNG.data))